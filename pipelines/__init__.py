@@ -0,0 +1,6 @@
+"""Offline data jobs for the Sun Motors ads dashboard.
+
+Each module is a standalone batch job run from the repository root, e.g.
+``python -m pipelines.cubo_metricas atualizar``. They talk to Supabase through
+``pipelines.supabase_rest`` and keep their local state under ``dados/``.
+"""
@@ -0,0 +1,273 @@
+"""Columnar archive of the raw exports kept in the topstack-analytics repository.
+
+The ``upload-to-github`` edge function stores raw CSVs under ``planilhas/meta``
+and ``planilhas/google``. This job converts a local checkout of those folders
+into zstd-compressed Parquet files partitioned as
+``plataforma=<p>/marca=<m>/semana=<YYYY-MM-DD>/``, with pt-BR numbers already
+converted to floats and dates to ``date32``. Google rows also get
+``periodo_inicio``/``periodo_fim`` from the report period header.
+``_manifesto.json`` records the column schema per platform and which source
+files were converted, so re-runs only touch new or changed exports.
+
+    python -m pipelines.arquivo_colunar ../topstack-analytics --destino dados/arquivo
+
+Requires ``pyarrow``.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipelines.datas import parse_data, parse_periodo, segunda_feira
+from pipelines.formatos import marca_em, nome_coluna, parse_numero_br
+from pipelines.supabase_rest import caminho_dados
+
+PLATAFORMAS = {'meta': 'planilhas/meta', 'google': 'planilhas/google'}
+MANIFESTO = '_manifesto.json'  # leading underscore: ignored by pyarrow dataset discovery
+SEM_MARCA = 'multimarcas'
+COLUNAS_ID = ('identificacao', 'id_', 'codigo')
+COLUNAS_PERIODO = ('periodo_inicio', 'periodo_fim')
+# Google columns that name what a row is about; empty on the export's summary rows.
+COLUNAS_IDENTIFICACAO_GOOGLE = ('Campanha', 'Grupo de anúncios', 'Anúncio', 'Palavra-chave')
+# None: only empty values seen so far; written as a null column, which readers cast to the later type.
+TIPOS_ARROW = {'date': pa.date32(), 'float': pa.float64(), 'string': pa.string(), None: pa.null()}
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def ler_exportacao(path, plataforma):
+    """Returns ``(header, rows, periodo)`` for a Meta or Google export.
+
+    Google exports start with a title line and a period line before the real
+    header, and end with summary rows ("Total: conta", "Total: campanhas"...)
+    whose identifying cells are empty; both are dropped here.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        linhas = list(csv.reader(f))
+    periodo = None
+    inicio = 0
+    if plataforma == 'google':
+        for i, linha in enumerate(linhas[:5]):
+            if len(linha) >= 5:
+                inicio = i
+                break
+            if linha and periodo is None:
+                periodo = parse_periodo(linha[0])
+    header = [h.strip() for h in linhas[inicio]]
+    identificadores = [i for i, h in enumerate(header) if h in COLUNAS_IDENTIFICACAO_GOOGLE]
+    rows = []
+    for linha in linhas[inicio + 1:]:
+        if not any(linha):
+            continue
+        if plataforma == 'google' and _linha_total(linha, identificadores):
+            continue
+        rows.append(linha + [''] * (len(header) - len(linha)))
+    return header, rows, periodo
+
+
+def _linha_total(linha, identificadores):
+    """A Google summary row: "Total: ..." in the first cell and no campaign, ad group or ad named."""
+    if not linha or not linha[0].strip().lower().startswith('total:'):
+        return False
+    return all(i >= len(linha) or linha[i].strip() in ('', '--') for i in identificadores if i != 0)
+
+
+def tipar_coluna(coluna, valores):
+    """Infers the column type from its non-empty values: 'date', 'float', 'string' or None if all empty.
+
+    Identifier columns stay strings: Meta IDs have 18 digits and would lose
+    precision as floats.
+    """
+    if coluna.startswith(COLUNAS_ID):
+        return 'string'
+    preenchidos = [v for v in valores if v and v.strip() and v.strip() != '--']
+    if not preenchidos:
+        return None
+    if all(parse_data(v) for v in preenchidos):
+        return 'date'
+    if all(parse_numero_br(v) is not None for v in preenchidos):
+        return 'float'
+    return 'string'
+
+
+def converter_coluna(valores, tipo):
+    if tipo is None:
+        return pa.nulls(len(valores))
+    if tipo == 'date':
+        return pa.array([parse_data(v) for v in valores], type=pa.date32())
+    if tipo == 'float':
+        return pa.array([parse_numero_br(v) for v in valores], type=pa.float64())
+    return pa.array([v if v != '' else None for v in valores], type=pa.string())
+
+
+def particionar(header, rows, periodo, plataforma, nome_arquivo):
+    """Groups rows by (marca, semana) using the row date or, for Google, the period header."""
+    idx_inicio = header.index('Início dos relatórios') if 'Início dos relatórios' in header else None
+    idx_conta = header.index('Nome da conta') if 'Nome da conta' in header else None
+    idx_campanha = next((header.index(c) for c in ('Nome da campanha', 'Campanha') if c in header), None)
+    marca_arquivo = marca_em(nome_arquivo)
+    grupos = {}
+    for row in rows:
+        data = parse_data(row[idx_inicio]) if idx_inicio is not None else None
+        if data is None and periodo:
+            data = periodo[0]
+        if data is None:
+            continue
+        marca = (marca_em(row[idx_conta] if idx_conta is not None else None,
+                          row[idx_campanha] if idx_campanha is not None else None)
+                 or marca_arquivo or SEM_MARCA)
+        grupos.setdefault((marca.lower(), segunda_feira(data).isoformat()), []).append(row)
+    return grupos
+
+
+class ArquivoColunar:
+    def __init__(self, destino):
+        self.destino = destino
+        self.manifesto_path = os.path.join(destino, MANIFESTO)
+        try:
+            with open(self.manifesto_path, 'r', encoding='utf-8') as f:
+                self.manifesto = json.load(f)
+        except FileNotFoundError:
+            self.manifesto = {'esquemas': {}, 'fontes': {}}
+
+    def salvar_manifesto(self):
+        os.makedirs(self.destino, exist_ok=True)
+        with open(self.manifesto_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifesto, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def _registrar_esquema(self, plataforma, header, tipos):
+        """Merges the file's column types into the platform schema; returns the resolved types and the widened columns.
+
+        All-empty columns take the type already known for the platform, or stay
+        untyped (``None``) until a file brings real values; only a column seen
+        with two different non-null types is widened to string.
+        """
+        esquema = self.manifesto['esquemas'].setdefault(plataforma, {})
+        resolvidos = []
+        alargadas = set()
+        for original, tipo in zip(header, tipos):
+            coluna = nome_coluna(original)
+            atual = esquema.get(coluna)
+            if tipo is None:
+                tipo = atual['tipo'] if atual else None
+            elif atual and atual['tipo'] is not None and atual['tipo'] != tipo:
+                print(f"Aviso: coluna '{coluna}' ({plataforma}) aparece como {atual['tipo']} e {tipo}; gravando como string")
+                tipo = 'string'
+                alargadas.add(coluna)
+            esquema[coluna] = {'original': original, 'tipo': tipo}
+            resolvidos.append(tipo)
+        return resolvidos, alargadas
+
+    def _alargar(self, plataforma, colunas):
+        """Rewrites the platform's partitions already written so ``colunas`` are strings, as in the manifest.
+
+        Otherwise older files keep the narrower type and the archive can no
+        longer be read as one dataset.
+        """
+        for fonte in self.manifesto['fontes'].values():
+            if fonte['plataforma'] != plataforma:
+                continue
+            for relativo in fonte['arquivos']:
+                arquivo = os.path.join(self.destino, relativo)
+                if not os.path.exists(arquivo):
+                    continue
+                tabela = pq.read_table(arquivo)
+                afetadas = [c for c in colunas
+                            if c in tabela.column_names and tabela.schema.field(c).type != pa.string()]
+                if not afetadas:
+                    continue
+                for coluna in afetadas:
+                    i = tabela.column_names.index(coluna)
+                    tabela = tabela.set_column(i, coluna, tabela.column(coluna).cast(pa.string()))
+                pq.write_table(tabela, arquivo, compression='zstd')
+
+    def esquema_arrow(self, plataforma):
+        """The platform's manifest schema as a pyarrow schema, for reading its partitions as one dataset."""
+        return pa.schema([(coluna, TIPOS_ARROW[campo['tipo']])
+                          for coluna, campo in self.manifesto['esquemas'].get(plataforma, {}).items()])
+
+    def converter(self, path, plataforma, relativo):
+        fonte = self.manifesto['fontes'].get(relativo)
+        sha = _sha256(path)
+        if fonte and fonte['sha256'] == sha:
+            return 0
+        if fonte:
+            for antigo in fonte['arquivos']:
+                try:
+                    os.remove(os.path.join(self.destino, antigo))
+                except FileNotFoundError:
+                    pass
+
+        header, rows, periodo = ler_exportacao(path, plataforma)
+        colunas = list(zip(*rows)) if rows else [[] for _ in header]
+        tipos, alargadas = self._registrar_esquema(plataforma, header,
+                                                   [tipar_coluna(nome_coluna(h), c) for h, c in zip(header, colunas)])
+        if alargadas:
+            self._alargar(plataforma, alargadas)
+        if periodo:
+            esquema = self.manifesto['esquemas'][plataforma]
+            for coluna in COLUNAS_PERIODO:
+                esquema[coluna] = {'original': None, 'tipo': 'date'}
+
+        nomes = [nome_coluna(h) for h in header]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        gerados = []
+        for (marca, semana), grupo in sorted(particionar(header, rows, periodo, plataforma, stem).items()):
+            tabela = pa.table({
+                nome: converter_coluna([r[i] for r in grupo], tipos[i]) for i, nome in enumerate(nomes)
+            })
+            if periodo:
+                # Google rows carry no date of their own; keep the header period queryable.
+                for coluna, valor in zip(COLUNAS_PERIODO, periodo):
+                    tabela = tabela.append_column(coluna, pa.array([valor] * len(grupo), type=pa.date32()))
+            particao = os.path.join(f"plataforma={plataforma}", f"marca={marca}", f"semana={semana}")
+            os.makedirs(os.path.join(self.destino, particao), exist_ok=True)
+            saida = os.path.join(particao, f"{nome_coluna(stem)}.parquet")
+            pq.write_table(tabela, os.path.join(self.destino, saida), compression='zstd')
+            gerados.append(saida)
+
+        self.manifesto['fontes'][relativo] = {'sha256': sha, 'plataforma': plataforma, 'linhas': len(rows),
+                                              'arquivos': gerados}
+        return len(gerados)
+
+    def converter_repositorio(self, origem):
+        total = 0
+        for plataforma, pasta in PLATAFORMAS.items():
+            base = os.path.join(origem, pasta)
+            if not os.path.isdir(base):
+                continue
+            for nome in sorted(os.listdir(base)):
+                if not nome.lower().endswith('.csv'):
+                    continue
+                relativo = f"{pasta}/{nome}"
+                try:
+                    total += self.converter(os.path.join(base, nome), plataforma, relativo)
+                except (ValueError, IndexError, csv.Error) as e:
+                    print(f"Erro ao converter {relativo}: {e}")
+        self.salvar_manifesto()
+        return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Converte planilhas/meta e planilhas/google em Parquet particionado')
+    parser.add_argument('origem', help='Checkout local do repositório topstack-analytics')
+    parser.add_argument('--destino', default=None)
+    args = parser.parse_args()
+
+    destino = args.destino or os.path.dirname(caminho_dados('arquivo', MANIFESTO))
+    total = ArquivoColunar(destino).converter_repositorio(args.origem)
+    print(f"{total} partição(ões) gravada(s) em {destino}")
+
+
+if __name__ == "__main__":
+    main()
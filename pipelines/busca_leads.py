@@ -0,0 +1,362 @@
+"""Trigram search index over ``leads``, served by a small local HTTP service.
+
+``LeadsFilters.jsx``/``leads.js`` load every lead and filter by substring in
+the browser. This module keeps a local copy of the searchable columns
+(nome, email, telefone, whatsapp, proprietario, rotulos) and an inverted
+index from each 3-character sequence to the sorted list of leads containing
+it. A query intersects the posting lists of its trigrams, rarest first, and
+confirms each candidate with a real substring test.
+
+Leads are numbered in display order (``criado_em`` desc, then ``id``, the
+order of ``buscarLeadsComFiltros``), so posting lists are already sorted the
+way results are shown. A page is produced by walking the intersection from
+the cursor and stopping as soon as it is full, which keeps the first page
+fast however large the table is. The cursor is the ``criado_em|id`` of the
+last lead returned (keyset pagination), so it stays valid across syncs.
+
+Phones are also indexed as bare digits, which is how a phone-like query is
+normalized, so "(51) 99999-1234", "99999-1234" and "51999991234" all find a
+lead stored in any of those forms.
+
+A sync pulls new leads by ``(importado_em, id)`` and, for leads created in
+the app (no ``importado_em``), by ``(criado_em, id)``. The table has no
+update timestamp, so every sync also re-reads the filter columns of all
+leads by id (a narrow scan), which picks up stage changes and deletions;
+edits to the searchable text need ``reconstruir``.
+
+    python -m pipelines.busca_leads sincronizar
+    python -m pipelines.busca_leads buscar "silva"
+    python -m pipelines.busca_leads servir --porta 8765 --intervalo 300
+
+    GET /leads?q=silva&limite=50&apos=<cursor>&estagio=Em%20análise
+
+The index holds every lead, read with the service-role key, so the service
+only listens on 127.0.0.1, answers CORS for the app origin alone
+(``BUSCA_LEADS_ORIGEM``, the Vite dev server by default) and requires the
+``X-Busca-Token`` header: ``BUSCA_LEADS_TOKEN``, or a token generated and
+printed at each start.
+"""
+import argparse
+import bisect
+import copy
+import hmac
+import json
+import os
+import re
+import secrets
+import threading
+import time
+import unicodedata
+from array import array
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+ARQUIVO_PADRAO = 'busca_leads.json'
+CAMPOS_BUSCA = ('nome', 'email', 'telefone', 'whatsapp', 'proprietario', 'rotulos')
+CAMPOS_FILTRO = ('estagio', 'formulario_id', 'conta_de_anuncio_id', 'marca_id')
+CAMPOS_TELEFONE = ('telefone', 'whatsapp')
+# Where new leads come from: (keyset column, filters). App-created leads have no importado_em.
+ORIGENS = (('importado_em', None), ('criado_em', [('importado_em', 'is', None)]))
+COLUNAS = ','.join(('id', 'criado_em', 'importado_em', 'nome_formulario') + CAMPOS_BUSCA + CAMPOS_FILTRO)
+LIMITE_PADRAO = 50
+HOST = '127.0.0.1'
+ORIGEM_APP = os.environ.get('BUSCA_LEADS_ORIGEM', 'http://localhost:5173')
+CABECALHO_TOKEN = 'X-Busca-Token'
+LIMITE_MAXIMO = 500
+# Fields are joined with a separator that never appears in a query, so no
+# trigram spans two fields.
+SEPARADOR = '\x1f'
+_PONTUACAO_TELEFONE = re.compile(r'[\s()+\-.]')
+_NAO_DIGITO = re.compile(r'\D')
+
+
+def normalizar(texto):
+    """Lowercases and strips accents, so "João" matches "joao"."""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def normalizar_consulta(consulta):
+    """Normalizes a query; phone-like input ("(51) 99999-1234") is reduced to its digits."""
+    consulta = normalizar(consulta.strip())
+    digitos = _PONTUACAO_TELEFONE.sub('', consulta)
+    return digitos if digitos.isdigit() else consulta
+
+
+def texto_indexado(lead):
+    """The searchable fields, normalized, plus the phones as bare digits (the form phone-like queries take)."""
+    campos = [normalizar(lead.get(campo) or '') for campo in CAMPOS_BUSCA]
+    campos += [_NAO_DIGITO.sub('', lead.get(campo) or '') for campo in CAMPOS_TELEFONE]
+    return SEPARADOR.join(campos)
+
+
+def _marcas_dagua(marca_dagua):
+    """Watermarks per origin column; a string from older index files is the ``importado_em`` one."""
+    if isinstance(marca_dagua, str):
+        return {'importado_em': [marca_dagua, None]}
+    return dict(marca_dagua or {})
+
+
+def trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _chave_ordem(lead):
+    # Sorted in reverse: criado_em desc with nulls ('') last, then id desc.
+    return (lead.get('criado_em') or '', lead['id'])
+
+
+class IndiceBusca:
+    def __init__(self, leads=None, marca_dagua=None):
+        self.marca_dagua = marca_dagua
+        self._construir(list(leads or []))
+
+    def __len__(self):
+        return len(self.leads)
+
+    def _construir(self, leads):
+        leads.sort(key=_chave_ordem, reverse=True)
+        self.leads = leads
+        self.ordem = [_chave_ordem(lead) for lead in leads]
+        self.textos = [texto_indexado(lead) for lead in leads]
+        postings = defaultdict(list)
+        for posicao, texto in enumerate(self.textos):
+            for trigrama in trigramas(texto):
+                postings[trigrama].append(posicao)
+        # Positions are appended in increasing order, so every list is already sorted.
+        self.postings = {trigrama: array('I', posicoes) for trigrama, posicoes in postings.items()}
+
+    @classmethod
+    def carregar(cls, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        return cls(dados['leads'], dados['marca_dagua'])
+
+    def salvar(self, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'marca_dagua': self.marca_dagua, 'leads': self.leads}, f, ensure_ascii=False)
+
+    def sincronizar(self, cliente, completo=False):
+        """Pulls new leads and refreshes the filter columns of the known ones; returns how many changed.
+
+        With ``completo`` every lead is read again.
+        """
+        marcas = {} if completo else _marcas_dagua(self.marca_dagua)
+        por_id = {} if completo else {lead['id']: lead for lead in self.leads}
+        alterados = 0
+        for coluna, filtros in ORIGENS:
+            apos = marcas.get(coluna)
+            for lead in cliente.select_desde('leads', COLUNAS, filtros, coluna, tuple(apos) if apos else None):
+                por_id[lead['id']] = lead
+                marcas[coluna] = [lead[coluna], lead['id']]
+                alterados += 1
+        if not completo:
+            alterados += self._atualizar_filtros(cliente, por_id)
+        self.marca_dagua = marcas
+        if alterados:
+            self._construir(list(por_id.values()))
+        return alterados
+
+    def _atualizar_filtros(self, cliente, por_id):
+        """Applies the current filter columns of every lead to ``por_id`` and drops deleted leads; returns the count.
+
+        Changed leads are replaced by copies, never mutated: the index being
+        served shares these dicts until the new one is swapped in.
+        """
+        alterados, vistos = 0, set()
+        for atual in cliente.select_keyset('leads', ','.join(('id',) + CAMPOS_FILTRO)):
+            vistos.add(atual['id'])
+            lead = por_id.get(atual['id'])
+            if lead is not None and any(lead.get(campo) != atual.get(campo) for campo in CAMPOS_FILTRO):
+                por_id[atual['id']] = {**lead, **atual}
+                alterados += 1
+        for lead_id in set(por_id) - vistos:
+            del por_id[lead_id]
+            alterados += 1
+        return alterados
+
+    def _posicao_apos(self, chave):
+        """First position whose key sorts after ``chave`` in display order (``self.ordem`` is descending)."""
+        baixo, alto = 0, len(self.ordem)
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self.ordem[meio] >= chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        return baixo
+
+    def _candidatos(self, consulta, inicio):
+        """Yields positions >= ``inicio`` that contain every trigram of ``consulta``, in order."""
+        if len(consulta) < 3:
+            # Too short for trigrams: scan, still stopping once the page is full.
+            yield from range(inicio, len(self.leads))
+            return
+        listas = []
+        for trigrama in trigramas(consulta):
+            lista = self.postings.get(trigrama)
+            if lista is None:
+                return
+            listas.append(lista)
+        listas.sort(key=len)
+        menor, outras = listas[0], listas[1:]
+        for i in range(bisect.bisect_left(menor, inicio), len(menor)):
+            posicao = menor[i]
+            for lista in outras:
+                j = bisect.bisect_left(lista, posicao)
+                if j == len(lista) or lista[j] != posicao:
+                    break
+            else:
+                yield posicao
+
+    def buscar(self, consulta='', filtros=None, limite=LIMITE_PADRAO, apos=None):
+        """Returns ``(leads, proximo)``: one page of matches and the cursor of the next page, or None."""
+        consulta = normalizar_consulta(consulta or '')
+        filtros = {campo: valor for campo, valor in (filtros or {}).items() if valor}
+        inicio = 0
+        if apos:
+            criado_em, _, lead_id = apos.partition('|')
+            inicio = self._posicao_apos((criado_em, lead_id))
+        pagina = []
+        for posicao in self._candidatos(consulta, inicio):
+            # Trigram hits may be false positives ("abcd" has "abc" and "bcd" but
+            # so does "abc bcd"), so every candidate gets an exact substring test.
+            if consulta and consulta not in self.textos[posicao]:
+                continue
+            lead = self.leads[posicao]
+            if any(lead.get(campo) != valor for campo, valor in filtros.items()):
+                continue
+            pagina.append(lead)
+            if len(pagina) > limite:
+                break
+        proximo = None
+        if len(pagina) > limite:
+            pagina = pagina[:limite]
+            proximo = f"{pagina[-1].get('criado_em') or ''}|{pagina[-1]['id']}"
+        return pagina, proximo
+
+
+class _Servico(BaseHTTPRequestHandler):
+    indice = None
+    token = None
+    origem = ORIGEM_APP
+
+    def _cors(self):
+        # The Vite dev server runs on another port; no other site gets a readable response.
+        if self.headers.get('Origin') == type(self).origem:
+            self.send_header('Access-Control-Allow-Origin', type(self).origem)
+        self.send_header('Vary', 'Origin')
+
+    def _responder(self, status, corpo):
+        payload = json.dumps(corpo, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self._cors()
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _autorizado(self):
+        recebido = self.headers.get(CABECALHO_TOKEN) or ''
+        return hmac.compare_digest(recebido.encode('utf-8'), type(self).token.encode('utf-8'))
+
+    def do_OPTIONS(self):
+        # Preflight of the token header.
+        self.send_response(204)
+        self._cors()
+        self.send_header('Access-Control-Allow-Methods', 'GET')
+        self.send_header('Access-Control-Allow-Headers', CABECALHO_TOKEN)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        if not self._autorizado():
+            self._responder(401, {'erro': f'Envie o cabeçalho {CABECALHO_TOKEN}'})
+            return
+        url = urlparse(self.path)
+        parametros = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+        indice = type(self).indice
+        if url.path == '/saude':
+            self._responder(200, {'leads': len(indice), 'marca_dagua': indice.marca_dagua})
+            return
+        if url.path != '/leads':
+            self._responder(404, {'erro': 'Rota não encontrada'})
+            return
+        try:
+            limite = min(int(parametros.get('limite', LIMITE_PADRAO)), LIMITE_MAXIMO)
+        except ValueError:
+            self._responder(400, {'erro': 'limite inválido'})
+            return
+        inicio = time.perf_counter()
+        filtros = {campo: parametros.get(campo) for campo in CAMPOS_FILTRO}
+        dados, proximo = indice.buscar(parametros.get('q', ''), filtros, limite, parametros.get('apos'))
+        self._responder(200, {
+            'dados': dados,
+            'proximo': proximo,
+            'tempo_ms': round((time.perf_counter() - inicio) * 1000, 2),
+        })
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def _sincronizar_periodicamente(path, intervalo):
+    cliente = SupabaseREST()
+    while True:
+        time.sleep(intervalo)
+        try:
+            # sincronizar rebinds attributes rather than mutating them, so a shallow
+            # copy leaves the index being served untouched until the swap.
+            indice = copy.copy(_Servico.indice)
+            if indice.sincronizar(cliente):
+                indice.salvar(path)
+                # Swapping the reference is atomic; requests in flight keep the old index.
+                _Servico.indice = indice
+        except Exception as e:
+            print(f"Erro ao sincronizar leads: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Busca por trigramas nos leads')
+    parser.add_argument('acao', choices=['sincronizar', 'reconstruir', 'buscar', 'servir'])
+    parser.add_argument('consulta', nargs='?', default='')
+    parser.add_argument('--arquivo', default=None)
+    parser.add_argument('--limite', type=int, default=LIMITE_PADRAO)
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--intervalo', type=int, default=0, help='Sincroniza a cada N segundos ao servir')
+    args = parser.parse_args()
+
+    indice = IndiceBusca.carregar(args.arquivo)
+    if args.acao in ('sincronizar', 'reconstruir'):
+        total = indice.sincronizar(SupabaseREST(), completo=args.acao == 'reconstruir')
+        indice.salvar(args.arquivo)
+        print(f"{total} lead(s) sincronizado(s); índice com {len(indice)} lead(s).")
+    elif args.acao == 'buscar':
+        inicio = time.perf_counter()
+        dados, proximo = indice.buscar(args.consulta, limite=args.limite)
+        for lead in dados:
+            print(json.dumps(lead, ensure_ascii=False))
+        print(f"{len(dados)} resultado(s) em {(time.perf_counter() - inicio) * 1000:.1f} ms; próximo: {proximo}")
+    else:
+        _Servico.indice = indice
+        _Servico.token = os.environ.get('BUSCA_LEADS_TOKEN') or secrets.token_urlsafe(32)
+        if args.intervalo:
+            threading.Thread(target=_sincronizar_periodicamente, args=(args.arquivo, args.intervalo),
+                             daemon=True).start()
+        servidor = ThreadingHTTPServer((HOST, args.porta), _Servico)
+        print(f"Servindo {len(indice)} lead(s) em http://{HOST}:{args.porta}/leads para {_Servico.origem}")
+        if not os.environ.get('BUSCA_LEADS_TOKEN'):
+            print(f"{CABECALHO_TOKEN}: {_Servico.token}")
+        servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
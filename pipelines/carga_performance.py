@@ -0,0 +1,206 @@
+"""Streaming loader of Meta breakdown exports (age, gender, placement...) into ``relatorio_performance``.
+
+Breakdown exports are wide (dozens of columns) and repeat the same ad once per
+day and demographic slice. The loader:
+
+* reads the CSV row by row with ``csv.reader`` and resolves the position of
+  each mapped column once from the header, so only those cells are parsed;
+* stores in ``dados_brutos_plataforma`` only the non-empty fields that have
+  no column of their own;
+* upserts in batches on a deterministic ``id`` (UUIDv5 of day, ad, age,
+  gender and placement), so loading the same export twice updates the rows
+  instead of duplicating them.
+
+``campanha_id`` is resolved through the local external_id index
+(``pipelines.indice_external_id``) and only sent when found, so rows whose
+campaign the index does not know keep the ``campanha_id`` they already have.
+
+    python -m pipelines.carga_performance planilhas/meta/breakdown_idade_genero.csv
+    python -m pipelines.carga_performance export.csv --lote 1000 --simular
+"""
+import argparse
+import csv
+import time
+import uuid
+
+from pipelines.datas import parse_data
+from pipelines.formatos import nome_coluna, parse_numero_br
+from pipelines.indice_external_id import IndiceExternalId
+from pipelines.supabase_rest import SupabaseREST
+
+TAMANHO_LOTE = 500
+NAMESPACE = uuid.UUID('6f1c2b1e-3d4a-5b6c-8d9e-0a1b2c3d4e5f')
+
+# nome_coluna(header) -> (relatorio_performance column, type)
+MAPEAMENTO = {
+    'dia': ('data_relatorio', 'data'),
+    'inicio_dos_relatorios': ('data_relatorio', 'data'),
+    'nome_da_conta': ('nome_conta', 'texto'),
+    'identificacao_da_conta': ('external_conta_id', 'texto'),
+    'nome_da_campanha': ('nome_campanha', 'texto'),
+    'identificacao_da_campanha': ('external_campanha_id', 'texto'),
+    'nome_do_conjunto_de_anuncios': ('nome_conjunto_anuncios', 'texto'),
+    'identificacao_do_conjunto_de_anuncios': ('external_grupo_id', 'texto'),
+    'nome_do_anuncio': ('nome_anuncio', 'texto'),
+    'identificacao_do_anuncio': ('external_criativo_id', 'texto'),
+    'idade': ('idade', 'texto'),
+    'genero': ('genero', 'texto'),
+    'impressoes': ('impressoes', 'inteiro'),
+    'alcance': ('alcance', 'inteiro'),
+    'frequencia': ('frequencia', 'numero'),
+    'valor_usado_brl': ('custo', 'numero'),
+    'cliques_no_link': ('cliques', 'inteiro'),
+    'cliques_todos': ('cliques_todos', 'inteiro'),
+    'cpc_custo_por_clique_no_link_brl': ('cpc_link', 'numero'),
+    'cpc_todos_brl': ('cpc_todos', 'numero'),
+    'ctr_todos': ('ctr_todos', 'numero'),
+    'cpm_custo_por_1_000_impressoes_brl': ('cpm', 'numero'),
+    'resultados': ('conversoes', 'inteiro'),
+    'custo_por_lead_brl': ('custo_por_lead', 'numero'),
+    'leads_no_site': ('leads_site', 'inteiro'),
+    'leads_offline': ('leads_offline', 'inteiro'),
+    'leads_no_meta': ('leads_meta', 'inteiro'),
+    'valor_de_conversao_de_leads_offline': ('valor_conversao_leads_offline', 'numero'),
+    'objetivo': ('objetivo_campanha', 'texto'),
+    'lance': ('lance', 'texto'),
+    'tipo_de_lance': ('tipo_lance', 'texto'),
+    'configuracao_de_atribuicao': ('configuracao_atribuicao', 'texto'),
+    'titulo': ('headline_criativo', 'texto'),
+    'corpo': ('descricao_criativo', 'texto'),
+    'url_do_site': ('url_site_criativo', 'texto'),
+    'chamada_para_acao': ('call_to_action', 'texto'),
+    'hash_da_imagem': ('hash_imagem_criativo', 'texto'),
+    'nome_da_imagem': ('nome_imagem_criativo', 'texto'),
+    'nome_do_video': ('nome_video_criativo', 'texto'),
+    'identificacao_do_video': ('external_video_id_criativo', 'texto'),
+    'moeda': ('moeda', 'texto'),
+}
+# Columns that identify a row, plus the breakdowns that have no column of their
+# own (they stay in dados_brutos_plataforma but still tell rows apart).
+CHAVE = ('data_relatorio', 'external_criativo_id', 'external_campanha_id', 'idade', 'genero')
+DIMENSOES_EXTRAS = {'plataforma', 'posicionamento', 'posicionamento_da_plataforma', 'dispositivo',
+                    'dispositivo_de_impressao', 'pais', 'regiao', 'cidade'}
+# Derived from the period columns, not worth keeping in the raw payload.
+IGNORADAS = {'termino_dos_relatorios'}
+
+
+def _converter(valor, tipo):
+    if tipo == 'data':
+        d = parse_data(valor)
+        return d.isoformat() if d else None
+    if tipo == 'numero':
+        return parse_numero_br(valor)
+    if tipo == 'inteiro':
+        numero = parse_numero_br(valor)
+        return int(round(numero)) if numero is not None else None
+    return valor or None
+
+
+class CargaPerformance:
+    def __init__(self, cabecalho, indice=None):
+        self.indice = indice
+        self.projecao = []
+        self.brutos = []
+        self.dimensoes = []
+        for posicao, header in enumerate(cabecalho):
+            chave = nome_coluna(header)
+            if chave in MAPEAMENTO:
+                coluna, tipo = MAPEAMENTO[chave]
+                # The first header mapped to a column wins ("Dia" over "Início dos relatórios").
+                if all(c != coluna for _, c, _ in self.projecao):
+                    self.projecao.append((posicao, coluna, tipo))
+            elif chave not in IGNORADAS:
+                self.brutos.append((posicao, header))
+                if chave in DIMENSOES_EXTRAS:
+                    self.dimensoes.append(posicao)
+        if all(c != 'data_relatorio' for _, c, _ in self.projecao):
+            raise ValueError('Exportação sem coluna de data ("Dia" ou "Início dos relatórios")')
+
+    def linha(self, valores):
+        """Projects one CSV row into a buffered record."""
+        registro = {'_dimensoes': [valores[p].strip() for p in self.dimensoes if p < len(valores)]}
+        for posicao, coluna, tipo in self.projecao:
+            valor = valores[posicao].strip() if posicao < len(valores) else ''
+            registro[coluna] = _converter(valor, tipo)
+        brutos = {header: valores[posicao] for posicao, header in self.brutos
+                  if posicao < len(valores) and valores[posicao].strip()}
+        registro['dados_brutos_plataforma'] = brutos or None
+        return registro
+
+    def finalizar(self, registro):
+        """Resolves the campaign and sets the deterministic id."""
+        if self.indice is not None:
+            campanha = self.indice.resolver(registro.get('external_campanha_id'))
+            if campanha:
+                registro['campanha_id'] = campanha['id']
+        chave = [str(registro.get(c) or '') for c in CHAVE] + registro.pop('_dimensoes')
+        registro['id'] = str(uuid.uuid5(NAMESPACE, '|'.join(chave)))
+        return registro
+
+
+def carregar_arquivo(path, cliente=None, indice=None, tamanho_lote=TAMANHO_LOTE):
+    """Streams ``path`` into relatorio_performance; returns a summary dict. With no ``cliente``, only parses."""
+    resumo = {'linhas': 0, 'enviadas': 0, 'sem_data': 0, 'lotes': 0, 'sem_campanha': 0}
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        leitor = csv.reader(f)
+        carga = CargaPerformance(next(leitor), indice)
+        lote = []
+
+        def enviar():
+            registros = [carga.finalizar(r) for r in lote]
+            # Every row of a bulk upsert must carry the same keys, so rows without a
+            # resolved campaign go in a request of their own instead of sending a null.
+            grupos = {}
+            for r in registros:
+                grupos.setdefault('campanha_id' in r, {})[r['id']] = r
+            if cliente is not None:
+                # Rows repeated inside one batch would make the upsert fail ("cannot affect row a second time").
+                for grupo in grupos.values():
+                    cliente.upsert('relatorio_performance', list(grupo.values()), 'id')
+            resumo['enviadas'] += len(registros)
+            resumo['sem_campanha'] += sum(1 for r in registros if 'campanha_id' not in r)
+            resumo['lotes'] += 1
+            lote.clear()
+
+        for valores in leitor:
+            if not any(v.strip() for v in valores):
+                continue
+            resumo['linhas'] += 1
+            registro = carga.linha(valores)
+            if registro['data_relatorio'] is None:
+                # Meta appends a totals row without a date.
+                resumo['sem_data'] += 1
+                continue
+            lote.append(registro)
+            if len(lote) >= tamanho_lote:
+                enviar()
+        if lote:
+            enviar()
+    resumo['colunas_mapeadas'] = len(carga.projecao)
+    resumo['colunas_brutas'] = len(carga.brutos)
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carrega exportações com detalhamento do Meta em relatorio_performance')
+    parser.add_argument('arquivos', nargs='+')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+    parser.add_argument('--simular', action='store_true', help='Só lê e converte, sem enviar')
+    args = parser.parse_args()
+
+    cliente = None if args.simular else SupabaseREST()
+    indice = IndiceExternalId.carregar()
+    if not len(indice):
+        print("aviso: índice de external_id vazio; campanha_id não será preenchido "
+              "(rode `python -m pipelines.indice_external_id atualizar`)")
+    for path in args.arquivos:
+        inicio = time.perf_counter()
+        resumo = carregar_arquivo(path, cliente, indice, args.lote)
+        print(f"{path}: {resumo['enviadas']} linha(s) em {resumo['lotes']} lote(s), "
+              f"{resumo['sem_campanha']} sem campanha no índice, "
+              f"{resumo['colunas_mapeadas']} coluna(s) mapeada(s) e {resumo['colunas_brutas']} em dados brutos "
+              f"({time.perf_counter() - inicio:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
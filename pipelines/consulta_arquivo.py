@@ -0,0 +1,201 @@
+"""Partition-pruned queries over the Parquet archive written by ``arquivo_colunar``.
+
+Each partition file gets a zone map (min/max of its dates, spend and account
+columns) built from the Parquet footer statistics and cached in
+``_zonas.json``. A query first drops partitions by path (plataforma, marca)
+and zone map, and only then opens the surviving files, streaming matching
+rows as a generator.
+
+Filters follow ``buscarRelatoriosComFiltros``: ``plataforma``, ``marca``,
+``conta``, ``data_inicio`` (row start >= value) and ``data_fim`` (row end <=
+value), plus ``spend_min``. Brands and platforms are the archive's partition
+names (``kia``, ``meta``), since the exports carry names rather than UUIDs.
+
+    python -m pipelines.consulta_arquivo --marca kia --plataforma meta --semanas 8
+
+Requires ``pyarrow``.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from pipelines.supabase_rest import caminho_dados
+
+ZONAS = '_zonas.json'
+
+# Column roles per platform: (start date, end date, spend, account)
+COLUNAS = {
+    'meta': ('inicio_dos_relatorios', 'termino_dos_relatorios', 'valor_usado_brl', 'nome_da_conta'),
+    'google': ('periodo_inicio', 'periodo_fim', 'custo', 'conta'),
+}
+
+
+def _particao(relativo):
+    """Parses 'plataforma=meta/marca=kia/semana=2025-06-02/x.parquet' into a dict."""
+    partes = relativo.replace(os.sep, '/').split('/')[:-1]
+    return dict(p.split('=', 1) for p in partes if '=' in p)
+
+
+def _estatisticas(arquivo, colunas):
+    """Combines the row-group min/max of ``colunas`` from the Parquet footer, without reading data pages."""
+    meta = pq.ParquetFile(arquivo).metadata
+    nomes = [meta.schema.column(i).name for i in range(meta.num_columns)]
+    zona = {'linhas': meta.num_rows}
+    for coluna in colunas:
+        if coluna not in nomes:
+            continue
+        idx = nomes.index(coluna)
+        minimo = maximo = None
+        for rg in range(meta.num_row_groups):
+            stats = meta.row_group(rg).column(idx).statistics
+            if stats is None or not stats.has_min_max:
+                minimo = maximo = None
+                break
+            lo, hi = stats.min, stats.max
+            lo = lo.isoformat() if isinstance(lo, date) else lo
+            hi = hi.isoformat() if isinstance(hi, date) else hi
+            minimo = lo if minimo is None or lo < minimo else minimo
+            maximo = hi if maximo is None or hi > maximo else maximo
+        if minimo is not None:
+            zona[coluna] = [minimo, maximo]
+    return zona
+
+
+class ConsultaArquivo:
+    def __init__(self, raiz=None):
+        self.raiz = raiz or os.path.dirname(caminho_dados('arquivo', ZONAS))
+        self.zonas_path = os.path.join(self.raiz, ZONAS)
+        try:
+            with open(self.zonas_path, 'r', encoding='utf-8') as f:
+                self.zonas = json.load(f)
+        except FileNotFoundError:
+            self.zonas = {}
+
+    def indexar(self):
+        """Builds zone maps for new or rewritten partition files and drops removed ones."""
+        vistos = set()
+        alterado = False
+        for pasta, _, arquivos in os.walk(self.raiz):
+            for nome in arquivos:
+                if not nome.endswith('.parquet'):
+                    continue
+                caminho = os.path.join(pasta, nome)
+                relativo = os.path.relpath(caminho, self.raiz).replace(os.sep, '/')
+                vistos.add(relativo)
+                mtime = os.path.getmtime(caminho)
+                if self.zonas.get(relativo, {}).get('mtime') == mtime:
+                    continue
+                plataforma = _particao(relativo).get('plataforma')
+                zona = _estatisticas(caminho, COLUNAS.get(plataforma, ()))
+                zona['mtime'] = mtime
+                self.zonas[relativo] = zona
+                alterado = True
+        for relativo in set(self.zonas) - vistos:
+            del self.zonas[relativo]
+            alterado = True
+        if alterado:
+            with open(self.zonas_path, 'w', encoding='utf-8') as f:
+                json.dump(self.zonas, f, ensure_ascii=False, sort_keys=True)
+        return self
+
+    def particoes(self, filtros):
+        """Returns the partition files that may hold rows matching ``filtros``."""
+        marca = (filtros.get('marca') or '').lower() or None
+        plataforma = (filtros.get('plataforma') or '').lower() or None
+        conta = filtros.get('conta')
+        data_inicio = filtros.get('data_inicio')
+        data_fim = filtros.get('data_fim')
+        spend_min = filtros.get('spend_min')
+        candidatas = []
+        for relativo, zona in sorted(self.zonas.items()):
+            particao = _particao(relativo)
+            if plataforma and particao.get('plataforma') != plataforma:
+                continue
+            if marca and particao.get('marca') != marca:
+                continue
+            col_inicio, col_fim, col_spend, col_conta = COLUNAS.get(particao.get('plataforma'), (None,) * 4)
+            # A partition can be skipped only when its zone map proves no row can match.
+            if data_inicio and col_inicio in zona and zona[col_inicio][1] < data_inicio:
+                continue
+            if data_fim and col_fim in zona and zona[col_fim][0] > data_fim:
+                continue
+            if spend_min is not None and col_spend in zona and zona[col_spend][1] < spend_min:
+                continue
+            # Exports without an account column (or with it all empty) cannot match an account filter.
+            if conta and (col_conta not in zona or not zona[col_conta][0] <= conta <= zona[col_conta][1]):
+                continue
+            candidatas.append((relativo, particao))
+        return candidatas
+
+    def consultar(self, filtros=None, colunas=None, tamanho_lote=10_000):
+        """Lazily yields matching rows as dicts, adding the partition keys to each row."""
+        filtros = filtros or {}
+        for relativo, particao in self.particoes(filtros):
+            col_inicio, col_fim, col_spend, col_conta = COLUNAS.get(particao.get('plataforma'), (None,) * 4)
+            arquivo = pq.ParquetFile(os.path.join(self.raiz, relativo))
+            nomes = arquivo.schema_arrow.names
+            leitura = None
+            if colunas:
+                extras = [c for c in (col_inicio, col_fim, col_spend, col_conta) if c in nomes]
+                leitura = list(dict.fromkeys([c for c in colunas if c in nomes] + extras))
+            for lote in arquivo.iter_batches(batch_size=tamanho_lote, columns=leitura):
+                mascara = None
+                condicoes = []
+                if filtros.get('data_inicio') and col_inicio in nomes:
+                    condicoes.append(pc.greater_equal(lote[col_inicio], date.fromisoformat(filtros['data_inicio'])))
+                if filtros.get('data_fim') and col_fim in nomes:
+                    condicoes.append(pc.less_equal(lote[col_fim], date.fromisoformat(filtros['data_fim'])))
+                if filtros.get('spend_min') is not None and col_spend in nomes:
+                    condicoes.append(pc.greater_equal(lote[col_spend], filtros['spend_min']))
+                if filtros.get('conta') and col_conta in nomes:
+                    condicoes.append(pc.equal(lote[col_conta], filtros['conta']))
+                for condicao in condicoes:
+                    mascara = condicao if mascara is None else pc.and_(mascara, condicao)
+                if mascara is not None:
+                    lote = lote.filter(pc.fill_null(mascara, False))
+                for linha in lote.to_pylist():
+                    if colunas:
+                        linha = {c: linha.get(c) for c in colunas}
+                    linha.update(particao)
+                    yield linha
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consulta o arquivo colunar com poda de partições')
+    parser.add_argument('--raiz', default=None)
+    parser.add_argument('--marca')
+    parser.add_argument('--plataforma')
+    parser.add_argument('--conta')
+    parser.add_argument('--data-inicio')
+    parser.add_argument('--data-fim')
+    parser.add_argument('--semanas', type=int, help='Atalho para data_inicio = hoje - N semanas')
+    parser.add_argument('--spend-min', type=float)
+    parser.add_argument('--colunas', help='Lista separada por vírgulas')
+    args = parser.parse_args()
+
+    data_inicio = args.data_inicio
+    if args.semanas:
+        data_inicio = (date.today() - timedelta(weeks=args.semanas)).isoformat()
+    filtros = {
+        'marca': args.marca,
+        'plataforma': args.plataforma,
+        'conta': args.conta,
+        'data_inicio': data_inicio,
+        'data_fim': args.data_fim,
+        'spend_min': args.spend_min,
+    }
+    consulta = ConsultaArquivo(args.raiz).indexar()
+    particoes = consulta.particoes(filtros)
+    print(f"{len(particoes)} de {len(consulta.zonas)} partição(ões) lidas", file=sys.stderr)
+    colunas = args.colunas.split(',') if args.colunas else None
+    for linha in consulta.consultar(filtros, colunas):
+        print(json.dumps(linha, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Column-wise normalization of lead contacts (emails and Brazilian phones) with pandas."""
+
+EMAIL_VALIDO = r'^[^@\s]+@[^@\s]+\.[a-z]{2,}$'
+
+
+def normalizar_telefones(serie):
+    """Digits only, without the +55 country code or trunk zero; '' when not 10-11 digits.
+
+    Meta exports come as "p:+5551999999999" or "(51) 99999-9999".
+    """
+    digitos = serie.astype('string').fillna('').str.replace(r'\D', '', regex=True)
+    digitos = digitos.where(~(digitos.str.len().isin([12, 13]) & digitos.str.startswith('55')), digitos.str[2:])
+    digitos = digitos.where(~(digitos.str.len().isin([11, 12]) & digitos.str.startswith('0')), digitos.str[1:])
+    return digitos.where(digitos.str.len().isin([10, 11]), '')
+
+
+def normalizar_emails(serie):
+    emails = serie.astype('string').fillna('').str.strip().str.lower()
+    return emails.where(emails.str.match(EMAIL_VALIDO), '')
@@ -0,0 +1,258 @@
+"""Weekly metric cube over ``relatorio_anuncios``.
+
+Materializes spend, conversions, clicks and impressions at
+marca x plataforma x conta x semana granularity into ``dados/cubo_metricas.json``
+so the filters used by ``buscarRelatoriosComFiltros`` can be answered without
+rescanning raw report rows. Each cell also keeps its sub-totals per
+``(data_inicio, data_fim)`` of its rows, so a bound inside a week sums only
+the rows starting on or after ``data_inicio`` and ending on or before
+``data_fim``, like the ``gte('data_inicio')``/``lte('data_fim')`` of the JS.
+
+``atualizar`` re-aggregates the weeks with rows created or updated after the
+watermark, plus the weeks whose row count or spend no longer matches the
+cube, found by a narrow scan of ``id,data_inicio,spend``; the latter catches
+rows deleted through ``deletarRelatorioAnuncio``.
+
+    python -m pipelines.cubo_metricas reconstruir
+    python -m pipelines.cubo_metricas atualizar
+    python -m pipelines.cubo_metricas consultar --marca <uuid> --data-inicio 2025-06-02
+"""
+import argparse
+import bisect
+import json
+from datetime import date, timedelta
+
+from pipelines.datas import semana_de
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+MEDIDAS = ('spend', 'conversao', 'cliques', 'impressoes')
+COLUNAS = ('id,marca_id,plataforma_id,conta_de_anuncio_id,data_inicio,data_fim,atualizado_em,criado_em,'
+           + ','.join(MEDIDAS))
+ARQUIVO_PADRAO = 'cubo_metricas.json'
+
+
+class CuboMetricas:
+    def __init__(self, celulas=None, marca_dagua=None, linhas_por_semana=None):
+        # (marca_id, plataforma_id, conta_id, semana)
+        #   -> [spend, conversao, cliques, impressoes, data_fim_max,
+        #       {'data_inicio|data_fim': [spend, conversao, cliques, impressoes]}]
+        self.celulas = celulas or {}
+        self.marca_dagua = marca_dagua
+        # semana -> number of raw rows aggregated into its cells
+        self.linhas_por_semana = linhas_por_semana or {}
+        self._reindexar()
+
+    def _reindexar(self):
+        por_semana = {}
+        for chave in self.celulas:
+            por_semana.setdefault(chave[3], []).append(chave)
+        self.semanas = sorted(por_semana)
+        self._por_semana = por_semana
+
+    @classmethod
+    def carregar(cls, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        celulas = {tuple(c['chave']): c['valores'] for c in raw['celulas']}
+        return cls(celulas, raw.get('marca_dagua'), raw.get('linhas_por_semana'))
+
+    def salvar(self, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        raw = {
+            'marca_dagua': self.marca_dagua,
+            'medidas': MEDIDAS,
+            'linhas_por_semana': self.linhas_por_semana,
+            'celulas': [{'chave': list(k), 'valores': v}
+                        for k, v in sorted(self.celulas.items(), key=lambda kv: kv[0][3])],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, separators=(',', ':'))
+
+    def substituir_semanas(self, linhas, semanas):
+        """Recomputes every cell of ``semanas`` from ``linhas`` (all raw rows of those weeks)."""
+        semanas = set(semanas)
+        self.celulas = {k: v for k, v in self.celulas.items() if k[3] not in semanas}
+        self.linhas_por_semana = {s: n for s, n in self.linhas_por_semana.items() if s not in semanas}
+        for linha in linhas:
+            semana = semana_de(linha['data_inicio'])
+            if semana not in semanas:
+                continue
+            self.linhas_por_semana[semana] = self.linhas_por_semana.get(semana, 0) + 1
+            chave = (linha.get('marca_id'), linha.get('plataforma_id'), linha.get('conta_de_anuncio_id'), semana)
+            celula = self.celulas.setdefault(chave, [0.0, 0.0, 0, 0, linha['data_fim'], {}])
+            parcial = celula[5].setdefault(f"{linha['data_inicio']}|{linha['data_fim']}", [0.0, 0.0, 0, 0])
+            for i, medida in enumerate(MEDIDAS):
+                celula[i] += linha.get(medida) or 0
+                parcial[i] += linha.get(medida) or 0
+            celula[4] = max(celula[4], linha['data_fim'])
+            carimbo = linha.get('atualizado_em') or linha.get('criado_em')
+            if carimbo and (self.marca_dagua is None or carimbo > self.marca_dagua):
+                self.marca_dagua = carimbo
+        self._reindexar()
+
+    def semanas_divergentes(self, linhas):
+        """Weeks whose row count or spend in ``linhas`` (``data_inicio``, ``spend``) differs from the cube.
+
+        Weeks of cubes written before the row counts are compared by spend only.
+        """
+        resumo = {}
+        for linha in linhas:
+            contagem = resumo.setdefault(semana_de(linha['data_inicio']), [0, 0.0])
+            contagem[0] += 1
+            contagem[1] += linha.get('spend') or 0
+        divergentes = set()
+        for semana in set(resumo) | set(self.semanas):
+            n, spend = resumo.get(semana, (0, 0.0))
+            no_cubo = sum(celula[0] for _, celula in self.celulas_da_semana(semana))
+            contado = self.linhas_por_semana.get(semana)
+            if abs(spend - no_cubo) >= 0.005 or (contado is not None and contado != n):
+                divergentes.add(semana)
+        return divergentes
+
+    def celulas_da_semana(self, semana):
+        """Yields ``(chave, celula)`` for every cell of ``semana``."""
+        for chave in self._por_semana.get(semana, ()):
+            yield chave, self.celulas[chave]
+
+    def _celulas_filtradas(self, filtros):
+        marca = filtros.get('marca_id')
+        plataforma = filtros.get('plataforma_id')
+        conta = filtros.get('conta_de_anuncio_id')
+        data_inicio = filtros.get('data_inicio')
+        data_fim = filtros.get('data_fim')
+        inicio = bisect.bisect_left(self.semanas, semana_de(data_inicio)) if data_inicio else 0
+        for semana in self.semanas[inicio:]:
+            if data_fim and semana > data_fim:
+                break
+            # Only the week holding data_inicio can have rows that start before it.
+            corte_inicio = data_inicio if data_inicio and semana < data_inicio else None
+            for chave in self._por_semana[semana]:
+                if marca and chave[0] != marca:
+                    continue
+                if plataforma and chave[1] != plataforma:
+                    continue
+                if conta and chave[2] != conta:
+                    continue
+                celula = self.celulas[chave]
+                if corte_inicio or (data_fim and celula[4] > data_fim):
+                    celula = _restrita(celula, corte_inicio, data_fim)
+                    if celula is None:
+                        continue
+                yield chave, celula
+
+    def consultar(self, filtros=None):
+        """Totals for the same filters accepted by buscarRelatoriosComFiltros (except modelo_id)."""
+        totais = dict.fromkeys(MEDIDAS, 0)
+        for _, celula in self._celulas_filtradas(filtros or {}):
+            for i, medida in enumerate(MEDIDAS):
+                totais[medida] += celula[i]
+        return totais
+
+    def tendencia_semanal(self, filtros=None):
+        """Per-week totals ordered by week, like buscarTendenciaSemanal."""
+        por_semana = {}
+        for chave, celula in self._celulas_filtradas(filtros or {}):
+            totais = por_semana.setdefault(chave[3], dict.fromkeys(MEDIDAS, 0))
+            for i, medida in enumerate(MEDIDAS):
+                totais[medida] += celula[i]
+        return [{'semana': s, **t} for s, t in sorted(por_semana.items())]
+
+
+def _restrita(celula, data_inicio, data_fim):
+    """The cell restricted to its rows starting on or after ``data_inicio`` and ending on or before ``data_fim``.
+
+    Either bound may be None. Returns None when no row qualifies. Cells written
+    without per-row sub-totals are kept whole before ``data_inicio`` and dropped
+    whole past ``data_fim``, as before; ``reconstruir`` adds the sub-totals.
+    """
+    if len(celula) <= 5 or any('|' not in periodo for periodo in celula[5]):
+        return None if data_fim and celula[4] > data_fim else celula
+    partes = {}
+    for periodo, valores in celula[5].items():
+        inicio, _, fim = periodo.partition('|')
+        if (data_inicio and inicio < data_inicio) or (data_fim and fim > data_fim):
+            continue
+        partes[periodo] = valores
+    if not partes:
+        return None
+    totais = [sum(v[i] for v in partes.values()) for i in range(len(MEDIDAS))]
+    return totais + [max(p.partition('|')[2] for p in partes), partes]
+
+
+def _linhas_das_semanas(cliente, semanas):
+    # Rows are normalized to Monday on import, but older rows may not be, so match whole weeks.
+    intervalos = ','.join(
+        f"and(data_inicio.gte.{s},data_inicio.lte.{(date.fromisoformat(s) + timedelta(days=6)).isoformat()})"
+        for s in sorted(semanas)
+    )
+    return cliente.select_keyset('relatorio_anuncios', COLUNAS, [('or', None, f"({intervalos})")])
+
+
+def reconstruir(cliente, cubo=None):
+    cubo = cubo or CuboMetricas()
+    linhas = list(cliente.select_keyset('relatorio_anuncios', COLUNAS))
+    cubo.celulas = {}
+    cubo.marca_dagua = None
+    cubo.substituir_semanas(linhas, {semana_de(l['data_inicio']) for l in linhas})
+    return cubo
+
+
+def atualizar(cliente, cubo):
+    """Re-aggregates the weeks touched since the cube's watermark and those whose rows were deleted."""
+    if cubo.marca_dagua is None:
+        return reconstruir(cliente, cubo), None
+    marca = cubo.marca_dagua
+    filtros = [('or', None, f'(atualizado_em.gt."{marca}",criado_em.gt."{marca}")')]
+    tocadas = cliente.select_keyset('relatorio_anuncios', 'id,data_inicio', filtros)
+    alteradas = {semana_de(l['data_inicio']) for l in tocadas}
+    # Deleted rows leave no timestamp behind; they show up as a week that no longer adds up.
+    alteradas |= cubo.semanas_divergentes(cliente.select_keyset('relatorio_anuncios', 'id,data_inicio,spend'))
+    if alteradas:
+        cubo.substituir_semanas(list(_linhas_das_semanas(cliente, alteradas)), alteradas)
+    return cubo, sorted(alteradas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cubo semanal de métricas de relatorio_anuncios')
+    parser.add_argument('acao', choices=['reconstruir', 'atualizar', 'consultar'])
+    parser.add_argument('--arquivo', default=None)
+    parser.add_argument('--marca')
+    parser.add_argument('--plataforma')
+    parser.add_argument('--conta')
+    parser.add_argument('--data-inicio')
+    parser.add_argument('--data-fim')
+    parser.add_argument('--semanal', action='store_true', help='Mostra a tendência semanal em vez dos totais')
+    args = parser.parse_args()
+
+    cubo = CuboMetricas.carregar(args.arquivo)
+    if args.acao == 'consultar':
+        filtros = {
+            'marca_id': args.marca,
+            'plataforma_id': args.plataforma,
+            'conta_de_anuncio_id': args.conta,
+            'data_inicio': args.data_inicio,
+            'data_fim': args.data_fim,
+        }
+        resultado = cubo.tendencia_semanal(filtros) if args.semanal else cubo.consultar(filtros)
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return
+
+    cliente = SupabaseREST()
+    if args.acao == 'reconstruir':
+        reconstruir(cliente, cubo)
+        print(f"Cubo reconstruído com {len(cubo.celulas)} células.")
+    else:
+        cubo, alteradas = atualizar(cliente, cubo)
+        if alteradas is None:
+            print(f"Cubo vazio: reconstruído com {len(cubo.celulas)} células.")
+        else:
+            print(f"{len(alteradas)} semana(s) atualizada(s): {', '.join(alteradas) or '-'}")
+    cubo.salvar(args.arquivo)
+
+
+if __name__ == "__main__":
+    main()
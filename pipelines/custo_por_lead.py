@@ -0,0 +1,243 @@
+"""Weekly cost per lead: leads per form joined with ad spend per account and brand.
+
+Spend lives in ``relatorio_anuncios`` and leads in ``leads``; nothing joins
+them. This job keeps weekly lead counts per (marca, conta, formulario) and
+takes weekly spend per (marca, conta) from the metric cube
+(``pipelines.cubo_metricas``). For each week it builds a hash table of spend
+keyed by (marca, conta) and probes it with the lead counts, splitting an
+account's spend across its forms by their share of the week's leads.
+
+Only weeks that received new leads or whose spend changed are recomputed.
+New leads are paged by ``(importado_em, id)`` and, for leads created in the
+app (no ``importado_em``), by ``(criado_em, id)``, each with its own
+watermark; the result is kept in ``dados/custo_por_lead.json``
+as a compact column/row table. Spend changes are found by a fingerprint of
+each week's spend per (marca, conta), stored here and compared with the
+cube after it is refreshed, so weeks the cube picked up in a standalone
+``cubo_metricas atualizar`` run are not missed.
+
+    python -m pipelines.custo_por_lead atualizar
+    python -m pipelines.custo_por_lead reconstruir
+    python -m pipelines.custo_por_lead consultar --marca <uuid> --data-inicio 2025-06-02
+"""
+import argparse
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date, timedelta
+
+from pipelines import cubo_metricas
+from pipelines.datas import semana_de
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+ARQUIVO_PADRAO = 'custo_por_lead.json'
+COLUNAS_LEADS = 'id,marca_id,conta_de_anuncio_id,formulario_id,criado_em,importado_em'
+# Where new leads come from: (keyset column, filters). App-created leads have no importado_em.
+ORIGENS = (('importado_em', None), ('criado_em', [('importado_em', 'is', None)]))
+# Result rows; formulario_id is None for account-weeks with spend but no leads.
+COLUNAS_RESULTADO = ('semana', 'marca_id', 'conta_de_anuncio_id', 'formulario_id', 'leads', 'spend', 'custo_por_lead')
+
+
+class CustoPorLead:
+    def __init__(self, contagens=None, resultado=None, marca_dagua=None, gasto=None):
+        # (marca_id, conta_id, formulario_id, semana) -> number of leads
+        self.contagens = contagens or {}
+        # semana -> result rows, in COLUNAS_RESULTADO order
+        self.resultado = resultado or {}
+        self.marca_dagua = marca_dagua
+        # semana -> fingerprint of the spend the week's rows were computed from
+        self.gasto = gasto or {}
+
+    @classmethod
+    def carregar(cls, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        contagens = {tuple(chave): n for chave, n in raw['contagens']}
+        resultado = defaultdict(list)
+        for linha in raw['linhas']:
+            resultado[linha[0]].append(linha)
+        return cls(contagens, dict(resultado), raw.get('marca_dagua'), raw.get('gasto'))
+
+    def salvar(self, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        raw = {
+            'marca_dagua': self.marca_dagua,
+            'gasto': self.gasto,
+            'colunas': COLUNAS_RESULTADO,
+            'linhas': [linha for semana in sorted(self.resultado) for linha in self.resultado[semana]],
+            'contagens': [[list(chave), n] for chave, n in self.contagens.items()],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, separators=(',', ':'))
+
+    def substituir_contagens(self, leads, semanas):
+        """Recounts ``semanas`` from ``leads`` (every lead created in those weeks)."""
+        semanas = set(semanas)
+        self.contagens = {k: n for k, n in self.contagens.items() if k[3] not in semanas}
+        for lead in leads:
+            semana = semana_de(lead['criado_em'])
+            if semana not in semanas:
+                continue
+            chave = (lead.get('marca_id'), lead.get('conta_de_anuncio_id'), lead.get('formulario_id'), semana)
+            self.contagens[chave] = self.contagens.get(chave, 0) + 1
+
+    def recalcular(self, cubo, semanas):
+        """Rebuilds the result rows of ``semanas`` by joining lead counts with the cube's spend."""
+        leads_por_semana = defaultdict(list)
+        for (marca, conta, formulario, semana), n in self.contagens.items():
+            if semana in semanas:
+                leads_por_semana[semana].append((marca, conta, formulario, n))
+
+        for semana in semanas:
+            # Build side: spend per (marca, conta), summed over platforms.
+            gasto = defaultdict(float)
+            for chave, celula in cubo.celulas_da_semana(semana):
+                gasto[(chave[0], chave[2])] += celula[0] or 0
+            total_leads = defaultdict(int)
+            for marca, conta, _, n in leads_por_semana[semana]:
+                total_leads[(marca, conta)] += n
+
+            # Probe side: each form gets the account's spend in proportion to its leads.
+            linhas = []
+            for marca, conta, formulario, n in leads_por_semana[semana]:
+                spend = gasto.get((marca, conta), 0.0) * n / total_leads[(marca, conta)]
+                linhas.append([semana, marca, conta, formulario, n, round(spend, 2), round(spend / n, 2)])
+            for (marca, conta), spend in gasto.items():
+                if (marca, conta) not in total_leads and spend:
+                    linhas.append([semana, marca, conta, None, 0, round(spend, 2), None])
+            if linhas:
+                self.resultado[semana] = linhas
+            else:
+                self.resultado.pop(semana, None)
+
+    def consultar(self, filtros=None):
+        """Result rows as dicts, filtered by marca_id, conta_de_anuncio_id, formulario_id and week range."""
+        filtros = filtros or {}
+        inicio = semana_de(filtros['data_inicio']) if filtros.get('data_inicio') else None
+        fim = filtros.get('data_fim')
+        campos = ('marca_id', 'conta_de_anuncio_id', 'formulario_id')
+        for semana in sorted(self.resultado):
+            if (inicio and semana < inicio) or (fim and semana > fim):
+                continue
+            for linha in self.resultado[semana]:
+                registro = dict(zip(COLUNAS_RESULTADO, linha))
+                if all(not filtros.get(c) or registro[c] == filtros[c] for c in campos):
+                    yield registro
+
+
+def impressoes_gasto(cubo):
+    """Fingerprint per week of the cube's spend per (marca, conta), the only part of the cube the join reads."""
+    gastos = defaultdict(lambda: defaultdict(float))
+    for (marca, _, conta, semana), celula in cubo.celulas.items():
+        gastos[semana][(marca or '', conta or '')] += celula[0] or 0
+    return {
+        semana: hashlib.blake2b(json.dumps(sorted((k, round(v, 2)) for k, v in gasto.items())).encode('utf-8'),
+                                digest_size=8).hexdigest()
+        for semana, gasto in gastos.items()
+    }
+
+
+def _marcas_dagua(marca_dagua):
+    """Watermarks per origin column; a string from older state files is the ``importado_em`` one."""
+    if isinstance(marca_dagua, str):
+        return {'importado_em': [marca_dagua, None]}
+    return dict(marca_dagua or {})
+
+
+def _marcas_dos_leads(leads):
+    """The last ``(timestamp, id)`` of each origin among ``leads``."""
+    marcas = {}
+    for lead in leads:
+        coluna = 'importado_em' if lead.get('importado_em') else 'criado_em'
+        if lead.get(coluna):
+            ultimo = [lead[coluna], lead['id']]
+            if coluna not in marcas or ultimo > marcas[coluna]:
+                marcas[coluna] = ultimo
+    return marcas
+
+
+def _leads_das_semanas(cliente, semanas):
+    intervalos = ','.join(
+        f"and(criado_em.gte.{s},criado_em.lt.{(date.fromisoformat(s) + timedelta(days=7)).isoformat()})"
+        for s in sorted(semanas)
+    )
+    return cliente.select_keyset('leads', COLUNAS_LEADS, [('or', None, f"({intervalos})")])
+
+
+def atualizar(cliente, custo, cubo, completo=False):
+    """Refreshes the cube and recomputes only the weeks with new spend or new leads; returns those weeks."""
+    if completo:
+        cubo = cubo_metricas.reconstruir(cliente, cubo)
+    else:
+        cubo, _ = cubo_metricas.atualizar(cliente, cubo)
+    # The cube's own list of changed weeks is not enough: its watermark also moves when
+    # cubo_metricas runs on its own, so compare the spend itself.
+    gasto = impressoes_gasto(cubo)
+    semanas_gasto = {s for s in set(gasto) | set(custo.gasto) if gasto.get(s) != custo.gasto.get(s)}
+    custo.gasto = gasto
+
+    primeira = completo or custo.marca_dagua is None
+    if primeira:
+        leads = list(cliente.select_keyset('leads', COLUNAS_LEADS))
+        semanas_leads = {semana_de(l['criado_em']) for l in leads if l.get('criado_em')}
+        custo.contagens = {}
+        custo.marca_dagua = _marcas_dos_leads(leads)
+    else:
+        marcas = _marcas_dagua(custo.marca_dagua)
+        semanas_leads = set()
+        for coluna, filtros in ORIGENS:
+            apos = marcas.get(coluna)
+            for lead in cliente.select_desde('leads', 'id,criado_em,importado_em', filtros, coluna,
+                                             tuple(apos) if apos else None):
+                if lead.get('criado_em'):
+                    semanas_leads.add(semana_de(lead['criado_em']))
+                marcas[coluna] = [lead[coluna], lead['id']]
+        custo.marca_dagua = marcas
+        leads = list(_leads_das_semanas(cliente, semanas_leads)) if semanas_leads else []
+    custo.substituir_contagens(leads, semanas_leads)
+
+    if primeira:
+        # Nothing computed yet, or every lead was recounted: recompute every week.
+        semanas_gasto = set(cubo.semanas) | {chave[3] for chave in custo.contagens}
+        custo.resultado = {}
+    semanas = semanas_gasto | semanas_leads
+    custo.recalcular(cubo, semanas)
+    return cubo, sorted(semanas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo por lead semanal por formulário, conta e marca')
+    parser.add_argument('acao', choices=['atualizar', 'reconstruir', 'consultar'])
+    parser.add_argument('--arquivo', default=None)
+    parser.add_argument('--marca')
+    parser.add_argument('--conta')
+    parser.add_argument('--formulario')
+    parser.add_argument('--data-inicio')
+    parser.add_argument('--data-fim')
+    args = parser.parse_args()
+
+    custo = CustoPorLead.carregar(args.arquivo)
+    if args.acao == 'consultar':
+        filtros = {
+            'marca_id': args.marca,
+            'conta_de_anuncio_id': args.conta,
+            'formulario_id': args.formulario,
+            'data_inicio': args.data_inicio,
+            'data_fim': args.data_fim,
+        }
+        print(json.dumps(list(custo.consultar(filtros)), ensure_ascii=False, indent=2))
+        return
+
+    cubo = cubo_metricas.CuboMetricas.carregar()
+    cubo, semanas = atualizar(SupabaseREST(), custo, cubo, completo=args.acao == 'reconstruir')
+    cubo.salvar()
+    custo.salvar(args.arquivo)
+    print(f"{len(semanas)} semana(s) recalculada(s): {', '.join(semanas) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
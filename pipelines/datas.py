@@ -0,0 +1,95 @@
+"""Shared pt-BR date and period parsing for report ingestion.
+
+Weekly exports repeat only a handful of distinct dates across thousands of
+rows, so every parser is memoized on the raw string: each distinct value is
+parsed once per process. ``para_datetime64`` applies the same idea to whole
+columns, parsing the unique values and scattering them back with numpy.
+"""
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+# Also accept the unaccented spelling and the 3-letter abbreviations ("jun.", "set.").
+MESES.update({'marco': 3})
+MESES.update({nome[:3]: numero for nome, numero in list(MESES.items())})
+
+_DATA_BR = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+_DATA_ISO = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+_DATA_EXTENSO = re.compile(r'^(\d{1,2}) de (' + '|'.join(sorted(MESES, key=len, reverse=True)) + r')\.? de (\d{4})$')
+
+TAMANHO_CACHE = 4096
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def parse_data(texto):
+    """Parses DD/MM/YYYY, YYYY-MM-DD (with or without time) or "1 de junho de 2025" into a date.
+
+    Returns None when the text is empty or not a date; the same rules as
+    parseDataBrasileira in the frontend, plus the long form used by Google Ads.
+    """
+    if not texto:
+        return None
+    texto = texto.strip()
+    try:
+        match = _DATA_ISO.match(texto)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        match = _DATA_BR.match(texto)
+        if match:
+            return date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        match = _DATA_EXTENSO.match(texto.lower())
+        if match:
+            return date(int(match.group(3)), MESES[match.group(2)], int(match.group(1)))
+    except ValueError:
+        # Out-of-range day or month, e.g. 31/02/2025
+        return None
+    return None
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def parse_periodo(texto):
+    """Parses a report period such as "1 de junho de 2025 - 30 de junho de 2025".
+
+    Returns ``(inicio, fim)`` dates, or None when the text is not a period.
+    """
+    if not texto or ' - ' not in texto:
+        return None
+    inicio, fim = (parse_data(parte) for parte in texto.split(' - ', 1))
+    if inicio is None or fim is None:
+        return None
+    return inicio, fim
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def semana_de(texto):
+    """Returns the ISO Monday of the week containing ``texto`` (same rule as normalizeToMonday)."""
+    d = parse_data(texto)
+    if d is None:
+        return None
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+def segunda_feira(d):
+    return d - timedelta(days=d.weekday())
+
+
+def para_datetime64(valores):
+    """Converts a column of date strings to a ``datetime64[D]`` array (NaT where unparseable).
+
+    Accepts any sequence or pandas Series; only the distinct values are parsed.
+    Requires numpy.
+    """
+    import numpy as np
+
+    valores = np.asarray(valores, dtype=object)
+    unicos, inverso = np.unique(valores.astype(str), return_inverse=True)
+    convertidos = np.array(
+        [np.datetime64(d, 'D') if (d := parse_data(u)) else np.datetime64('NaT', 'D') for u in unicos],
+        dtype='datetime64[D]',
+    )
+    # None/NaN become the strings 'None'/'nan', which parse to NaT like any other junk.
+    return convertidos[inverso]
@@ -0,0 +1,202 @@
+"""Persistent dedupe index for leads across historical imports.
+
+Each lead contributes one key per contact: ``marca|formulario|email`` and
+``marca|formulario|telefone`` (also for ``whatsapp``). A lead whose keys were
+already seen, in the table or earlier in the same file, is a duplicate. Keys
+are stored as 64-bit BLAKE2 fingerprints in a sorted ``uint64`` array, the
+exact store, with a Bloom filter in front of it. Most keys in a fresh export
+are new, and the filter rejects those without a binary search.
+
+The index is seeded from the ``leads`` table and consulted by
+``preprocessador_leads`` before submission, so re-running an import only
+sends leads that were not imported yet.
+
+    python -m pipelines.dedupe_leads
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import struct
+from array import array
+
+import pandas as pd
+
+from pipelines.contatos import normalizar_emails, normalizar_telefones
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+ARQUIVO_PADRAO = 'dedupe_leads.bin'
+MAGICO = b'DEDUP1'
+TAXA_FALSO_POSITIVO = 0.01
+CAPACIDADE_MINIMA = 1 << 16
+CAMPOS_CONTATO = ('email', 'telefone', 'whatsapp')
+COLUNAS_SYNC = 'id,marca_id,nome_formulario,email,telefone,whatsapp,importado_em,criado_em'
+# Where new leads come from: (keyset column, filters). App-created leads have no importado_em.
+ORIGENS = (('importado_em', None), ('criado_em', [('importado_em', 'is', None)]))
+
+
+def impressao_digital(texto):
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class FiltroBloom:
+    def __init__(self, capacidade, bits=None, k=None):
+        self.capacidade = capacidade
+        self.m = max(64, int(-capacidade * math.log(TAXA_FALSO_POSITIVO) / math.log(2) ** 2))
+        self.k = k or max(1, round(self.m / capacidade * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.m + 7) // 8)
+
+    def _posicoes(self, chave):
+        # Double hashing from the two halves of the 64-bit fingerprint.
+        h1, h2 = chave & 0xFFFFFFFF, (chave >> 32) | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def adicionar(self, chave):
+        for p in self._posicoes(chave):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, chave):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._posicoes(chave))
+
+
+class IndiceDedupe:
+    def __init__(self, capacidade=CAPACIDADE_MINIMA):
+        self.chaves = array('Q')
+        self.pendentes = set()
+        self.bloom = FiltroBloom(capacidade)
+        self.marca_dagua = None
+
+    def __len__(self):
+        return len(self.chaves) + len(self.pendentes)
+
+    @classmethod
+    def carregar(cls, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(MAGICO)) != MAGICO:
+                    raise ValueError(f"{path} não é um índice de deduplicação")
+                (tamanho,) = struct.unpack('<I', f.read(4))
+                cabecalho = json.loads(f.read(tamanho))
+                chaves = array('Q')
+                chaves.fromfile(f, cabecalho['n'])
+                bits = bytearray(f.read())
+        except FileNotFoundError:
+            return cls()
+        indice = cls()
+        indice.chaves = chaves
+        indice.bloom = FiltroBloom(cabecalho['capacidade'], bits, cabecalho['k'])
+        indice.marca_dagua = cabecalho['marca_dagua']
+        return indice
+
+    def _consolidar(self):
+        """Merges pending keys into the sorted store, growing the Bloom filter when it is full."""
+        if self.pendentes:
+            self.chaves = array('Q', sorted(set(self.chaves).union(self.pendentes)))
+            self.pendentes = set()
+        if len(self.chaves) > self.bloom.capacidade:
+            self.bloom = FiltroBloom(max(CAPACIDADE_MINIMA, 2 * len(self.chaves)))
+            for chave in self.chaves:
+                self.bloom.adicionar(chave)
+
+    def salvar(self, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        self._consolidar()
+        cabecalho = json.dumps({
+            'n': len(self.chaves),
+            'capacidade': self.bloom.capacidade,
+            'k': self.bloom.k,
+            'marca_dagua': self.marca_dagua,
+        }).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(MAGICO)
+            f.write(struct.pack('<I', len(cabecalho)))
+            f.write(cabecalho)
+            self.chaves.tofile(f)
+            f.write(self.bloom.bits)
+
+    @staticmethod
+    def chaves_do_lead(lead, marca_id):
+        """Fingerprints for a lead whose email/phones are already normalized."""
+        formulario = (lead.get('nome_formulario') or '').strip().lower()
+        prefixo = f"{marca_id or ''}|{formulario}|"
+        chaves = []
+        for campo in CAMPOS_CONTATO:
+            valor = lead.get(campo)
+            if valor:
+                # telefone and whatsapp share the 't:' namespace: the same number often fills both.
+                chaves.append(impressao_digital(prefixo + ('e:' if campo == 'email' else 't:') + valor))
+        return chaves
+
+    def _existe(self, chave):
+        if chave in self.pendentes:
+            return True
+        if chave not in self.bloom:
+            return False
+        pos = bisect.bisect_left(self.chaves, chave)
+        return pos < len(self.chaves) and self.chaves[pos] == chave
+
+    def adicionar(self, lead, marca_id):
+        for chave in self.chaves_do_lead(lead, marca_id):
+            self.pendentes.add(chave)
+            self.bloom.adicionar(chave)
+
+    def filtrar_novos(self, registros, marca_id):
+        """Splits ``registros`` into ``(novos, duplicados)``; repeats inside the file count as duplicates.
+
+        New leads are not added to the index here, only after a successful
+        submission, so a failed import can simply be re-run.
+        """
+        novos, duplicados, vistos = [], [], set()
+        for registro in registros:
+            chaves = self.chaves_do_lead(registro, marca_id)
+            if any(c in vistos or self._existe(c) for c in chaves):
+                duplicados.append(registro)
+                continue
+            vistos.update(chaves)
+            novos.append(registro)
+        return novos, duplicados
+
+    def sincronizar(self, cliente):
+        """Adds the leads inserted since the last sync; returns how many.
+
+        Imported leads are paged by ``(importado_em, id)`` and leads created in
+        the app, which have no ``importado_em``, by ``(criado_em, id)``.
+        """
+        marcas = self.marca_dagua
+        if isinstance(marcas, str):
+            # Index files written before the per-origin watermarks.
+            marcas = {'importado_em': [marcas, None]}
+        marcas = dict(marcas or {})
+        novos = []
+        for coluna, filtros in ORIGENS:
+            apos = marcas.get(coluna)
+            for lead in cliente.select_desde('leads', COLUNAS_SYNC, filtros, coluna, tuple(apos) if apos else None):
+                novos.append(lead)
+                marcas[coluna] = [lead[coluna], lead['id']]
+        self.marca_dagua = marcas
+        if not novos:
+            return 0
+        linhas = pd.DataFrame(novos, columns=COLUNAS_SYNC.split(','))
+        linhas['email'] = normalizar_emails(linhas['email'])
+        for campo in ('telefone', 'whatsapp'):
+            linhas[campo] = normalizar_telefones(linhas[campo])
+        for lead in linhas.to_dict('records'):
+            self.adicionar(lead, lead['marca_id'])
+        return len(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sincroniza o índice de deduplicação com a tabela leads')
+    parser.add_argument('--indice', default=None)
+    args = parser.parse_args()
+
+    indice = IndiceDedupe.carregar(args.indice)
+    total = indice.sincronizar(SupabaseREST())
+    indice.salvar(args.indice)
+    print(f"{total} lead(s) sincronizado(s); índice com {len(indice)} chave(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Parsing helpers for the pt-BR numbers and names found in Meta and Google Ads exports.
+
+Dates and report periods are handled by ``pipelines.datas``.
+"""
+import re
+import unicodedata
+
+MARCAS = ('Haojue', 'Kia', 'Suzuki', 'Zontes')
+
+_SIMBOLOS = re.compile(r'[R$\s% ]')
+
+
+def parse_numero_br(value):
+    """Parses "R$ 1.234,56", "8,58%" or "1234.56" like parseMetricValue in the Google importer.
+
+    Returns None for empty or non-numeric values instead of 0 so callers can
+    tell a missing metric from a zero.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = _SIMBOLOS.sub('', value)
+    if not cleaned or cleaned == '--':
+        return None
+    if ',' in cleaned and '.' in cleaned:
+        cleaned = cleaned.replace('.', '').replace(',', '.')
+    elif ',' in cleaned:
+        cleaned = cleaned.replace(',', '.')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def nome_coluna(header):
+    """Turns an export header into a snake_case column name: "Valor usado (BRL)" -> "valor_usado_brl"."""
+    ascii_ = unicodedata.normalize('NFKD', header).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', ascii_.lower()).strip('_') or 'coluna'
+
+
+def marca_em(*textos):
+    """Returns the first known brand mentioned in any of ``textos`` (account, campaign or file name)."""
+    for texto in textos:
+        if not texto:
+            continue
+        texto = texto.lower()
+        for marca in MARCAS:
+            if marca.lower() in texto:
+                return marca
+    return None
@@ -0,0 +1,100 @@
+"""Form pre-resolution for bulk lead imports.
+
+``importar_leads_em_massa`` looks up (or creates) the ``formularios`` row of
+every lead by ``nome_formulario``, so a 50k-row file with 10 forms costs 50k
+lookups on the server, and a form the user may not create (RLS ``42501``)
+aborts the call partway through a batch. This pass resolves the ad account
+once, then each distinct form once, before anything is sent:
+
+* the account comes from ``relatorio_completo_marcas`` (marca + plataforma),
+  the same rule the RPC uses;
+* existing forms of the account are read in a single query;
+* missing forms are created one by one, so a permission error rejects only
+  the leads of that form.
+
+``preprocessador_leads`` uses it to insert each form's leads with
+``formulario_id`` already set.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from pipelines.supabase_rest import SupabaseError
+
+STATUS_FORMULARIO = 'Ativo'
+ERRO_PERMISSAO = '42501'
+
+
+class ContaNaoLocalizada(Exception):
+    pass
+
+
+def _chave_nome(nome):
+    # Names are compared trimmed and case-insensitively so "Cadastro Site" and
+    # "cadastro site " do not become two forms.
+    return (nome or '').strip().lower()
+
+
+def resolver_conta(cliente, marca_id, plataforma_id):
+    """Returns the ad account of the brand on the platform, as ``importar_leads_em_massa`` does."""
+    # Only the first row is used, so one is read.
+    conta = next(iter(cliente.select('relatorio_completo_marcas', 'conta_id', [
+        ('marca_id', 'eq', marca_id),
+        ('plataforma_id', 'eq', plataforma_id),
+    ], page_size=1)), None)
+    if not conta or not conta.get('conta_id'):
+        raise ContaNaoLocalizada(f"Conta não localizada para a marca {marca_id} na plataforma {plataforma_id}")
+    return conta['conta_id']
+
+
+def agrupar_por_formulario(registros):
+    """Groups lead dicts by ``nome_formulario``, keeping the first spelling seen of each name."""
+    grupos = defaultdict(list)
+    nomes = {}
+    for registro in registros:
+        chave = _chave_nome(registro.get('nome_formulario'))
+        nomes.setdefault(chave, (registro.get('nome_formulario') or '').strip())
+        grupos[chave].append(registro)
+    return {nomes[chave]: leads for chave, leads in grupos.items()}
+
+
+def resolver_formularios(cliente, conta_id, marca_id, plataforma_id, nomes):
+    """Maps each form name to ``{'id': ...}`` or, when it cannot be created, ``{'erro', 'codigo'}``."""
+    existentes = {
+        _chave_nome(f['nome']): f['id']
+        for f in cliente.select('formularios', 'id,nome', [('conta_de_anuncio_id', 'eq', conta_id)], order='id')
+    }
+    resolvidos = {}
+    for nome in nomes:
+        formulario_id = existentes.get(_chave_nome(nome))
+        if formulario_id:
+            resolvidos[nome] = {'id': formulario_id, 'criado': False}
+            continue
+        try:
+            criado = cliente.insert('formularios', [{
+                'nome': nome,
+                'status': STATUS_FORMULARIO,
+                'conta_de_anuncio_id': conta_id,
+                'marca_id': marca_id,
+                'plataforma_id': plataforma_id,
+            }], returning=True)
+        except SupabaseError as e:
+            if e.code != ERRO_PERMISSAO:
+                raise
+            resolvidos[nome] = {'erro': 'Sem permissão para criar o formulário', 'codigo': e.code}
+            continue
+        existentes[_chave_nome(nome)] = criado[0]['id']
+        resolvidos[nome] = {'id': criado[0]['id'], 'criado': True}
+    return resolvidos
+
+
+def vincular(registros, formulario_id, conta_id, marca_id):
+    """Returns ``leads`` rows ready for insertion: ids set, blanks as NULL."""
+    importado_em = datetime.now(timezone.utc).isoformat()
+    return [
+        {**{campo: (valor or None) for campo, valor in registro.items()},
+         'formulario_id': formulario_id,
+         'conta_de_anuncio_id': conta_id,
+         'marca_id': marca_id,
+         'importado_em': importado_em}
+        for registro in registros
+    ]
@@ -0,0 +1,187 @@
+"""Before/after impact of each entry in ``historico_otimizacoes``.
+
+For every optimization, compares the N days before ``data_alteracao`` with the
+N days after it on the entity that was changed. Instead of scanning the
+metrics around each change separately, the metrics are loaded once and laid
+out per entity as a sorted array of days plus prefix sums of each measure:
+
+* ``relatorio_performance`` (daily) feeds the campanha, grupo and criativo
+  series;
+* ``relatorio_anuncios`` (weekly) feeds the anuncio and conta series, with
+  each weekly row spread evenly over its days.
+
+A window total is then two ``bisect`` lookups and a subtraction, so m
+optimizations over n metric rows cost O((n + m) log n). The change day
+itself is left out of both windows. The entity used is the most specific one
+set on the entry (anuncio, criativo, grupo, campanha, then conta).
+
+    python -m pipelines.impacto_otimizacoes --dias 7
+    python -m pipelines.impacto_otimizacoes --dias 14 --saida public/impacto_otimizacoes.json
+"""
+import argparse
+import bisect
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from pipelines.datas import parse_data
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+ARQUIVO_PADRAO = 'impacto_otimizacoes.json'
+MEDIDAS = ('custo', 'impressoes', 'cliques', 'conversoes')
+COLUNAS_PERFORMANCE = 'id,data_relatorio,campanha_id,grupo_de_anuncio_id,criativo_id,' + ','.join(MEDIDAS)
+COLUNAS_ANUNCIOS = 'id,anuncio_id,conta_de_anuncio_id,data_inicio,data_fim,spend,impressoes,cliques,conversao'
+COLUNAS_OTIMIZACOES = ('id,descricao,tipo_alteracao,status,data_alteracao,criado_em,'
+                       'anuncio_id,criativo_id,grupo_de_anuncio_id,campanha_id,conta_de_anuncio_id')
+# Most specific entity first; (column in historico_otimizacoes, series name)
+ENTIDADES = (
+    ('anuncio_id', 'anuncio'),
+    ('criativo_id', 'criativo'),
+    ('grupo_de_anuncio_id', 'grupo'),
+    ('campanha_id', 'campanha'),
+    ('conta_de_anuncio_id', 'conta'),
+)
+
+
+class Serie:
+    """Daily values of one entity: sorted day ordinals and a prefix sum per measure."""
+
+    def __init__(self, por_dia):
+        self.dias = sorted(por_dia)
+        self.acumulados = [
+            [0.0] + list(accumulate(por_dia[d][i] for d in self.dias))
+            for i in range(len(MEDIDAS))
+        ]
+
+    def somar(self, inicio, fim):
+        """Totals of each measure over the days ``inicio <= dia < fim`` (ordinals)."""
+        a = bisect.bisect_left(self.dias, inicio)
+        b = bisect.bisect_left(self.dias, fim)
+        return {medida: acumulado[b] - acumulado[a] for medida, acumulado in zip(MEDIDAS, self.acumulados)}
+
+
+def montar_series(performance, anuncios):
+    """Builds ``{(entidade, id): Serie}`` from daily performance rows and weekly ad rows."""
+    por_entidade = defaultdict(lambda: defaultdict(lambda: [0.0] * len(MEDIDAS)))
+    for linha in performance:
+        dia = parse_data(linha['data_relatorio'])
+        if dia is None:
+            continue
+        valores = [float(linha.get(m) or 0) for m in MEDIDAS]
+        for coluna, entidade in (('campanha_id', 'campanha'), ('grupo_de_anuncio_id', 'grupo'),
+                                 ('criativo_id', 'criativo')):
+            if linha.get(coluna):
+                celula = por_entidade[(entidade, linha[coluna])][dia.toordinal()]
+                for i, valor in enumerate(valores):
+                    celula[i] += valor
+
+    for linha in anuncios:
+        inicio, fim = parse_data(linha['data_inicio']), parse_data(linha['data_fim'])
+        if inicio is None:
+            continue
+        fim = fim if fim and fim >= inicio else inicio
+        dias = (fim - inicio).days + 1
+        valores = [float(linha.get(c) or 0) / dias for c in ('spend', 'impressoes', 'cliques', 'conversao')]
+        for coluna, entidade in (('anuncio_id', 'anuncio'), ('conta_de_anuncio_id', 'conta')):
+            if not linha.get(coluna):
+                continue
+            serie = por_entidade[(entidade, linha[coluna])]
+            for ordinal in range(inicio.toordinal(), fim.toordinal() + 1):
+                celula = serie[ordinal]
+                for i, valor in enumerate(valores):
+                    celula[i] += valor
+
+    return {chave: Serie(por_dia) for chave, por_dia in por_entidade.items()}
+
+
+def _indicadores(totais, dias):
+    custo, impressoes, cliques, conversoes = (totais[m] for m in MEDIDAS)
+    return {
+        **{m: round(totais[m], 2) for m in MEDIDAS},
+        'dias': dias,
+        'custo_diario': round(custo / dias, 2) if dias else None,
+        'ctr': round(cliques / impressoes * 100, 3) if impressoes else None,
+        'cpc': round(custo / cliques, 2) if cliques else None,
+        'custo_por_conversao': round(custo / conversoes, 2) if conversoes else None,
+        'taxa_conversao': round(conversoes / cliques * 100, 3) if cliques else None,
+    }
+
+
+def _variacao(antes, depois):
+    """Percent change of each rate and daily average; None when the 'before' value is zero or missing."""
+    variacao = {}
+    for chave in ('custo_diario', 'ctr', 'cpc', 'custo_por_conversao', 'taxa_conversao'):
+        a, d = antes[chave], depois[chave]
+        variacao[chave] = round((d - a) / a * 100, 1) if a and d is not None else None
+    return variacao
+
+
+def analisar(otimizacoes, series, dias):
+    """Yields one result per optimization with a dated entity that has metrics."""
+    for otimizacao in otimizacoes:
+        data = parse_data(otimizacao.get('data_alteracao') or otimizacao.get('criado_em'))
+        if data is None:
+            continue
+        escolhida = next(
+            ((entidade, otimizacao[coluna]) for coluna, entidade in ENTIDADES
+             if otimizacao.get(coluna) and (entidade, otimizacao[coluna]) in series),
+            None,
+        )
+        if escolhida is None:
+            continue
+        serie = series[escolhida]
+        dia = data.toordinal()
+        # Windows are clipped to the days the series covers, so daily averages
+        # are not diluted by days before the first or after the last report.
+        dias_antes = max(0, min(dias, dia - serie.dias[0]))
+        dias_depois = max(0, min(dias, serie.dias[-1] - dia))
+        antes = _indicadores(serie.somar(dia - dias_antes, dia), dias_antes)
+        depois = _indicadores(serie.somar(dia + 1, dia + 1 + dias_depois), dias_depois)
+        yield {
+            'otimizacao_id': otimizacao['id'],
+            'descricao': otimizacao.get('descricao'),
+            'tipo_alteracao': otimizacao.get('tipo_alteracao'),
+            'data_alteracao': data.isoformat(),
+            'entidade': escolhida[0],
+            'entidade_id': escolhida[1],
+            'janela_dias': dias,
+            'janela_completa': dias_antes == dias_depois == dias,
+            'antes': antes,
+            'depois': depois,
+            'variacao': _variacao(antes, depois),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Impacto antes/depois das otimizações registradas')
+    parser.add_argument('--dias', type=int, default=7, help='Tamanho de cada janela (antes e depois)')
+    parser.add_argument('--desde', help='Só otimizações a partir desta data (AAAA-MM-DD)')
+    parser.add_argument('--saida', default=None)
+    args = parser.parse_args()
+
+    cliente = SupabaseREST()
+    filtros = [('data_alteracao', 'gte', args.desde)] if args.desde else None
+    otimizacoes = list(cliente.select_keyset('historico_otimizacoes', COLUNAS_OTIMIZACOES, filtros))
+    datas = [d for o in otimizacoes if (d := parse_data(o.get('data_alteracao') or o.get('criado_em')))]
+    resultados = []
+    if datas:
+        # Only metrics that can fall inside some window are loaded.
+        inicio = (min(datas) - timedelta(days=args.dias)).isoformat()
+        fim = (max(datas) + timedelta(days=args.dias + 1)).isoformat()
+        performance = cliente.select_keyset('relatorio_performance', COLUNAS_PERFORMANCE,
+                                            [('data_relatorio', 'gte', inicio), ('data_relatorio', 'lte', fim)])
+        anuncios = cliente.select_keyset('relatorio_anuncios', COLUNAS_ANUNCIOS,
+                                         [('data_fim', 'gte', inicio), ('data_inicio', 'lte', fim)])
+        series = montar_series(performance, anuncios)
+        resultados = list(analisar(otimizacoes, series, args.dias))
+
+    saida = args.saida or caminho_dados(ARQUIVO_PADRAO)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump({'gerado_em': datetime.now(timezone.utc).isoformat(), 'janela_dias': args.dias,
+                   'resultados': resultados}, f, ensure_ascii=False, indent=2)
+    print(f"{len(resultados)} de {len(otimizacoes)} otimização(ões) analisada(s); gravado em {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Content-addressed index of creative assets with per-asset performance.
+
+The same image or video appears in thousands of ``relatorio_performance``
+rows and in the ``urls_criativo`` of many ``criativos``. This job gives each
+distinct asset, keyed on ``hash_imagem_criativo`` (images) or
+``external_video_id_criativo`` (videos), a small integer ID that never
+changes between runs, and aggregates its metrics in a single streaming pass
+over ``relatorio_performance``:
+
+* spend, impressions, clicks and conversions, plus CTR, CPC and cost per
+  conversion;
+* first and last day seen, number of report rows;
+* the ``criativos`` that used it and their distinct asset URLs, fetched once
+  for all assets.
+
+The output, ``dados/indice_criativos.json``, is what ``Midias.jsx`` needs to
+show per-creative performance without grouping the whole table in the page.
+
+    python -m pipelines.indice_criativos
+    python -m pipelines.indice_criativos --saida public/indice_criativos.json
+"""
+import argparse
+import json
+from datetime import datetime, timezone
+
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+ARQUIVO_PADRAO = 'indice_criativos.json'
+MEDIDAS = ('custo', 'impressoes', 'cliques', 'conversoes')
+COLUNAS = ('id,criativo_id,hash_imagem_criativo,external_video_id_criativo,nome_imagem_criativo,'
+           'nome_video_criativo,data_relatorio,' + ','.join(MEDIDAS))
+LOTE_CRIATIVOS = 200
+
+
+def chave_do_ativo(linha):
+    """``'img:<hash>'`` or ``'vid:<id>'``; None for rows without a known asset."""
+    if linha.get('hash_imagem_criativo'):
+        return 'img:' + linha['hash_imagem_criativo'].strip()
+    if linha.get('external_video_id_criativo'):
+        return 'vid:' + str(linha['external_video_id_criativo']).strip()
+    return None
+
+
+class IndiceCriativos:
+    def __init__(self, ids=None):
+        # Asset key -> stable integer ID; IDs are only ever appended.
+        self.ids = ids or {}
+        self.ativos = {}
+
+    @classmethod
+    def carregar(cls, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        return cls({ativo['chave']: ativo['id'] for ativo in raw['ativos']} | raw.get('aposentados', {}))
+
+    def identificar(self, chave):
+        ativo_id = self.ids.get(chave)
+        if ativo_id is None:
+            ativo_id = self.ids[chave] = len(self.ids) + 1
+        return ativo_id
+
+    def agregar(self, linhas):
+        """One pass over report rows: per-asset totals, date range and the creatives that used it."""
+        self.ativos = {}
+        sem_ativo = 0
+        for linha in linhas:
+            chave = chave_do_ativo(linha)
+            if chave is None:
+                sem_ativo += 1
+                continue
+            ativo = self.ativos.get(chave)
+            if ativo is None:
+                ativo = self.ativos[chave] = {
+                    'id': self.identificar(chave),
+                    'chave': chave,
+                    'tipo': 'imagem' if chave.startswith('img:') else 'video',
+                    'nome': None,
+                    'linhas': 0,
+                    'primeiro_dia': None,
+                    'ultimo_dia': None,
+                    'criativo_ids': set(),
+                    **dict.fromkeys(MEDIDAS, 0),
+                }
+            ativo['linhas'] += 1
+            for medida in MEDIDAS:
+                ativo[medida] += linha.get(medida) or 0
+            ativo['nome'] = ativo['nome'] or linha.get('nome_imagem_criativo') or linha.get('nome_video_criativo')
+            dia = linha.get('data_relatorio')
+            if dia:
+                if ativo['primeiro_dia'] is None or dia < ativo['primeiro_dia']:
+                    ativo['primeiro_dia'] = dia
+                if ativo['ultimo_dia'] is None or dia > ativo['ultimo_dia']:
+                    ativo['ultimo_dia'] = dia
+            if linha.get('criativo_id'):
+                ativo['criativo_ids'].add(linha['criativo_id'])
+        return sem_ativo
+
+    def anexar_urls(self, cliente):
+        """Adds the distinct ``urls_criativo`` of the creatives behind each asset (one query per 200 creatives)."""
+        criativo_ids = sorted({c for ativo in self.ativos.values() for c in ativo['criativo_ids']})
+        urls = {}
+        for i in range(0, len(criativo_ids), LOTE_CRIATIVOS):
+            lote = criativo_ids[i:i + LOTE_CRIATIVOS]
+            for criativo in cliente.select('criativos', 'id,urls_criativo', [('id', 'in', lote)]):
+                urls[criativo['id']] = criativo.get('urls_criativo') or []
+        for ativo in self.ativos.values():
+            vistas = {}
+            for criativo_id in sorted(ativo['criativo_ids']):
+                vistas.update(dict.fromkeys(urls.get(criativo_id, [])))
+            ativo['urls'] = list(vistas)
+
+    def salvar(self, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        ativos = []
+        for ativo in sorted(self.ativos.values(), key=lambda a: a['id']):
+            custo, impressoes, cliques, conversoes = (ativo[m] for m in MEDIDAS)
+            ativos.append({
+                **ativo,
+                'custo': round(custo, 2),
+                'criativo_ids': sorted(ativo['criativo_ids']),
+                'ctr': round(cliques / impressoes * 100, 3) if impressoes else None,
+                'cpc': round(custo / cliques, 2) if cliques else None,
+                'custo_por_conversao': round(custo / conversoes, 2) if conversoes else None,
+            })
+        por_criativo = {c: ativo['id'] for ativo in ativos for c in ativo['criativo_ids']}
+        # Assets no longer in the table keep their IDs so they are not reused.
+        aposentados = {chave: i for chave, i in self.ids.items() if chave not in self.ativos}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'gerado_em': datetime.now(timezone.utc).isoformat(),
+                'ativos': ativos,
+                'por_criativo': por_criativo,
+                'aposentados': aposentados,
+            }, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Índice de imagens e vídeos de criativos com métricas agregadas')
+    parser.add_argument('--saida', default=None)
+    args = parser.parse_args()
+
+    cliente = SupabaseREST()
+    indice = IndiceCriativos.carregar(args.saida)
+    sem_ativo = indice.agregar(cliente.select_keyset('relatorio_performance', COLUNAS))
+    indice.anexar_urls(cliente)
+    indice.salvar(args.saida)
+    print(f"{len(indice.ativos)} ativo(s) indexado(s); {sem_ativo} linha(s) sem imagem ou vídeo.")
+
+
+if __name__ == "__main__":
+    main()
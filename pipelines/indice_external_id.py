@@ -0,0 +1,248 @@
+"""Persistent external_id -> campaign resolution index for report imports.
+
+``processarDadosCSV`` resolves "Identificação da campanha" through
+``buscarCampanhasPorExternalId``, which queries every ID of the file on each
+import. This index keeps the mapping locally in a compact sorted-array layout:
+
+* ``ids``: sorted ``uint64`` external IDs (Meta IDs are numeric)
+* ``campanhas``: 16-byte campaign UUIDs, parallel to ``ids``
+* ``marcas`` / ``contas``: ``uint16`` indexes into small UUID tables
+
+That is 28 bytes per campaign, so millions of IDs fit in a few tens of MB.
+Lookups are a binary search. Non-numeric IDs, which are rare, go to a small
+side dictionary.
+
+    python -m pipelines.indice_external_id atualizar
+    python -m pipelines.indice_external_id resolver --csv relatorio.csv
+"""
+import argparse
+import bisect
+import csv
+import json
+import struct
+import uuid
+from array import array
+
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+ARQUIVO_PADRAO = 'indice_external_id.bin'
+MAGICO = b'EXID1'
+COLUNAS = 'id,external_id,marca_id,conta_de_anuncio_id,criado_em,atualizado_em'
+SEM_VALOR = 0xFFFF
+
+
+def _uuid_bytes(valor):
+    # bytes.fromhex is several times faster than uuid.UUID for bulk loads.
+    return bytes.fromhex(valor.replace('-', ''))
+
+
+def _chave_numerica(external_id):
+    """Returns the uint64 key for a numeric external_id, or None if it must go to the side dictionary."""
+    if external_id.isascii() and external_id.isdigit() and int(external_id) < 1 << 64:
+        return int(external_id)
+    return None
+
+
+class _Tabela:
+    """Dictionary encoding of a small set of UUIDs (brands, accounts) into uint16 codes."""
+
+    def __init__(self, valores=None):
+        self.valores = list(valores or [])
+        self.codigos = {v: i for i, v in enumerate(self.valores)}
+
+    def codificar(self, valor):
+        if valor is None:
+            return SEM_VALOR
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            if codigo >= SEM_VALOR:
+                raise ValueError('Tabela de UUIDs excedeu 65535 valores')
+            self.valores.append(valor)
+            self.codigos[valor] = codigo
+        return codigo
+
+    def decodificar(self, codigo):
+        return None if codigo == SEM_VALOR else self.valores[codigo]
+
+
+class IndiceExternalId:
+    def __init__(self):
+        self.ids = array('Q')
+        self.campanhas = bytearray()
+        self.marcas_idx = array('H')
+        self.contas_idx = array('H')
+        self.marcas = _Tabela()
+        self.contas = _Tabela()
+        self.extras = {}
+        self.marca_dagua = None
+
+    def __len__(self):
+        return len(self.ids) + len(self.extras)
+
+    @classmethod
+    def carregar(cls, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        indice = cls()
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(MAGICO)) != MAGICO:
+                    raise ValueError(f"{path} não é um índice de external_id")
+                (tamanho,) = struct.unpack('<I', f.read(4))
+                cabecalho = json.loads(f.read(tamanho))
+                n = cabecalho['n']
+                indice.ids.fromfile(f, n)
+                indice.campanhas = bytearray(f.read(16 * n))
+                indice.marcas_idx.fromfile(f, n)
+                indice.contas_idx.fromfile(f, n)
+        except FileNotFoundError:
+            return indice
+        indice.marcas = _Tabela(cabecalho['marcas'])
+        indice.contas = _Tabela(cabecalho['contas'])
+        indice.extras = cabecalho['extras']
+        indice.marca_dagua = cabecalho['marca_dagua']
+        return indice
+
+    def salvar(self, path=None):
+        path = path or caminho_dados(ARQUIVO_PADRAO)
+        cabecalho = json.dumps({
+            'n': len(self.ids),
+            'marcas': self.marcas.valores,
+            'contas': self.contas.valores,
+            'extras': self.extras,
+            'marca_dagua': self.marca_dagua,
+        }).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(MAGICO)
+            f.write(struct.pack('<I', len(cabecalho)))
+            f.write(cabecalho)
+            self.ids.tofile(f)
+            f.write(self.campanhas)
+            self.marcas_idx.tofile(f)
+            self.contas_idx.tofile(f)
+
+    def resolver(self, external_id):
+        """Returns ``{'id', 'marca_id', 'conta_de_anuncio_id'}`` for ``external_id``, or None."""
+        if external_id is None:
+            return None
+        external_id = str(external_id).strip()
+        chave = _chave_numerica(external_id)
+        if chave is None:
+            return self.extras.get(external_id)
+        pos = bisect.bisect_left(self.ids, chave)
+        if pos == len(self.ids) or self.ids[pos] != chave:
+            return None
+        return {
+            'id': str(uuid.UUID(bytes=bytes(self.campanhas[16 * pos:16 * pos + 16]))),
+            'marca_id': self.marcas.decodificar(self.marcas_idx[pos]),
+            'conta_de_anuncio_id': self.contas.decodificar(self.contas_idx[pos]),
+        }
+
+    def resolver_lote(self, external_ids):
+        """Same shape as buscarCampanhasPorExternalId: ``{external_id: info}`` for the IDs found."""
+        mapa = {}
+        for external_id in set(i for i in external_ids if i and str(i).strip()):
+            info = self.resolver(external_id)
+            if info:
+                mapa[external_id] = info
+        return mapa
+
+    def mesclar(self, campanhas):
+        """Merges campaign rows into the index; rows for known IDs replace the old entry.
+
+        New keys are sorted and spliced into the existing arrays in one pass,
+        so an incremental refresh of k campaigns costs O(k log n) searches plus
+        a linear copy. Returns the number of rows merged.
+        """
+        novos = {}
+        total = 0
+        for campanha in campanhas:
+            external_id = (campanha.get('external_id') or '').strip()
+            if not external_id:
+                continue
+            total += 1
+            info = {'id': campanha['id'], 'marca_id': campanha.get('marca_id'),
+                    'conta_de_anuncio_id': campanha.get('conta_de_anuncio_id')}
+            chave = _chave_numerica(external_id)
+            if chave is None:
+                self.extras[external_id] = info
+            else:
+                novos[chave] = info
+            carimbo = campanha.get('atualizado_em') or campanha.get('criado_em')
+            if carimbo and (self.marca_dagua is None or carimbo > self.marca_dagua):
+                self.marca_dagua = carimbo
+        if not novos:
+            return total
+
+        if not self.ids:
+            ordenados = sorted(novos.items())
+            self.ids = array('Q', [chave for chave, _ in ordenados])
+            self.campanhas = bytearray(b''.join(_uuid_bytes(info['id']) for _, info in ordenados))
+            self.marcas_idx = array('H', [self.marcas.codificar(info['marca_id']) for _, info in ordenados])
+            self.contas_idx = array('H', [self.contas.codificar(info['conta_de_anuncio_id']) for _, info in ordenados])
+            return total
+
+        ids, campanhas_uuid = array('Q'), bytearray()
+        marcas_idx, contas_idx = array('H'), array('H')
+
+        def copiar(inicio, fim):
+            # Untouched runs of the old arrays are copied as slices, not element by element.
+            ids.extend(self.ids[inicio:fim])
+            campanhas_uuid.extend(self.campanhas[16 * inicio:16 * fim])
+            marcas_idx.extend(self.marcas_idx[inicio:fim])
+            contas_idx.extend(self.contas_idx[inicio:fim])
+
+        i = 0
+        for chave in sorted(novos):
+            pos = bisect.bisect_left(self.ids, chave, i)
+            copiar(i, pos)
+            i = pos + 1 if pos < len(self.ids) and self.ids[pos] == chave else pos
+            info = novos[chave]
+            ids.append(chave)
+            campanhas_uuid.extend(_uuid_bytes(info['id']))
+            marcas_idx.append(self.marcas.codificar(info['marca_id']))
+            contas_idx.append(self.contas.codificar(info['conta_de_anuncio_id']))
+        copiar(i, len(self.ids))
+
+        self.ids, self.campanhas, self.marcas_idx, self.contas_idx = ids, campanhas_uuid, marcas_idx, contas_idx
+        return total
+
+    def atualizar(self, cliente):
+        """Pulls campaigns created or changed since the last refresh (all of them on the first run)."""
+        filtros = [('external_id', 'not.is', 'null')]
+        if self.marca_dagua:
+            marca = self.marca_dagua
+            filtros.append(('or', None, f'(atualizado_em.gt."{marca}",criado_em.gt."{marca}")'))
+        return self.mesclar(cliente.select_keyset('campanhas', COLUNAS, filtros))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Índice local external_id -> campanha')
+    parser.add_argument('acao', choices=['atualizar', 'reconstruir', 'resolver'])
+    parser.add_argument('ids', nargs='*', help='external_ids a resolver')
+    parser.add_argument('--csv', help='CSV do Meta com a coluna "Identificação da campanha"')
+    parser.add_argument('--arquivo', default=None)
+    args = parser.parse_args()
+
+    if args.acao == 'reconstruir':
+        indice = IndiceExternalId()
+    else:
+        indice = IndiceExternalId.carregar(args.arquivo)
+
+    if args.acao == 'resolver':
+        ids = list(args.ids)
+        if args.csv:
+            with open(args.csv, 'r', encoding='utf-8-sig', newline='') as f:
+                ids.extend(linha.get('Identificação da campanha') for linha in csv.DictReader(f))
+        mapa = indice.resolver_lote(ids)
+        faltando = sorted({i for i in ids if i and i.strip()} - set(mapa))
+        print(json.dumps({'resolvidos': mapa, 'nao_encontrados': faltando}, ensure_ascii=False, indent=2))
+        return
+
+    total = indice.atualizar(SupabaseREST())
+    indice.salvar(args.arquivo)
+    print(f"{total} campanha(s) mesclada(s); índice com {len(indice)} external_id(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Bulk leads preprocessor for ``importar_leads_em_massa``.
+
+``ImportadorLeads.jsx`` sends the whole spreadsheet to the RPC in one JSONB
+call, which hits request-size and statement timeouts on event dumps of 100k+
+rows. This job does the same column mapping, then:
+
+* normalizes ``telefone``/``whatsapp``/``telefone_secundario`` to Brazilian
+  digits-only numbers (DDD + number) and lowercases emails, column-wise with
+  pandas string operations;
+* drops rows with no usable contact and writes a compact error report;
+* skips leads already imported, using the ``dedupe_leads`` index;
+* resolves each distinct form once (``formularios_leads``) and inserts the
+  leads of each form with ``formulario_id`` set; ``--via-rpc`` keeps sending
+  through ``importar_leads_em_massa`` instead;
+* splits the payload into chunks bounded by rows and JSON bytes and submits
+  them concurrently. Inserts are not idempotent, so only failures that happen
+  before the server could commit (refused connection, 429/503) are retried;
+  a timeout, other 5xx or truncated response marks the chunk ``incerto``,
+  since it may have been written, and it is left for the next run, after a
+  ``dedupe_leads`` sync.
+
+    python -m pipelines.preprocessador_leads leads.csv --marca-id <uuid> --plataforma-id <uuid>
+    python -m pipelines.preprocessador_leads leads.xlsx --marca-id <uuid> --plataforma-id <uuid> --simular
+
+Requires ``pandas`` (and ``openpyxl`` for .xlsx files).
+"""
+import argparse
+import http.client
+import json
+import random
+import socket
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from pipelines.contatos import normalizar_emails, normalizar_telefones
+from pipelines.dedupe_leads import IndiceDedupe
+from pipelines.formularios_leads import (ContaNaoLocalizada, agrupar_por_formulario, resolver_conta,
+                                        resolver_formularios, vincular)
+from pipelines.supabase_rest import SupabaseError, SupabaseREST, caminho_dados
+
+# Same aliases as the mapping in ImportadorLeads.jsx
+ALIASES = {
+    'nome': ('Nome', 'nome', 'Name'),
+    'email': ('Email', 'email'),
+    'telefone': ('Telefone', 'telefone', 'Phone'),
+    'whatsapp': ('WhatsApp', 'whatsapp'),
+    'nome_formulario': ('Formulário', 'formulario', 'Nome do Formulário', 'nome_formulario', 'Form Name'),
+    'fonte': ('Fonte', 'fonte'),
+    'canal': ('Canal', 'canal'),
+    'estagio': ('Estágio', 'estagio', 'Stage'),
+    'proprietario': ('Proprietário', 'proprietario', 'Owner'),
+    'rotulos': ('Rótulos', 'rotulos', 'Labels'),
+    'telefone_secundario': ('Telefone Secundário', 'telefone_secundario'),
+}
+COLUNAS_TELEFONE = ('telefone', 'whatsapp', 'telefone_secundario')
+FORMULARIO_PADRAO = 'Importação Geral'
+ESTAGIO_PADRAO = 'Em análise'
+
+MAX_LINHAS_LOTE = 2000
+MAX_BYTES_LOTE = 512 * 1024
+# Rejected by the gateway or PostgREST before the request reached the database.
+STATUS_ANTES_DO_COMMIT = {429, 503}
+# Failed after the request may have been executed: the chunk may or may not be in the table.
+STATUS_INCERTOS = {408, 500, 502, 504}
+# What a worker can raise while sending a chunk. A response cut short (IncompleteRead, or
+# a JSON body that does not parse) comes after the request reached the server.
+ERROS_DE_ENVIO = (SupabaseError, OSError, http.client.HTTPException, json.JSONDecodeError)
+
+
+def carregar_planilha(path):
+    if path.lower().endswith(('.xlsx', '.xls')):
+        return pd.read_excel(path, dtype=str, keep_default_na=False)
+    return pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig', sep=None, engine='python')
+
+
+def mapear_colunas(bruto):
+    """Maps spreadsheet headers to ``leads`` fields, using the first alias present."""
+    df = pd.DataFrame(index=bruto.index)
+    for campo, aliases in ALIASES.items():
+        presentes = [a for a in aliases if a in bruto.columns]
+        serie = pd.Series('', index=bruto.index, dtype='string')
+        for alias in presentes:
+            # Like `row['A'] || row['b']` in the JSX: fill blanks from the next alias.
+            coluna = bruto[alias].astype('string').str.strip().fillna('')
+            serie = serie.where(serie != '', coluna)
+        df[campo] = serie
+    padrao = df['nome_formulario'].iloc[0] if len(df) and df['nome_formulario'].iloc[0] else FORMULARIO_PADRAO
+    df['nome_formulario'] = df['nome_formulario'].where(df['nome_formulario'] != '', padrao)
+    df['estagio'] = df['estagio'].where(df['estagio'] != '', ESTAGIO_PADRAO)
+    return df
+
+
+def preprocessar(bruto, max_exemplos=20):
+    """Returns ``(leads, relatorio)``: the clean DataFrame and a compact error report.
+
+    A row is kept when it has a valid email or at least one valid phone.
+    Invalid values in a kept row are blanked and counted as warnings. Line
+    numbers in the report are spreadsheet lines (header is line 1).
+    """
+    df = mapear_colunas(bruto)
+    relatorio = {'total': len(df), 'validos': 0, 'descartados': {}, 'avisos': {}}
+
+    def registrar(secao, motivo, mascara):
+        linhas = (mascara[mascara].index + 2).tolist()
+        if linhas:
+            relatorio[secao][motivo] = {'quantidade': len(linhas), 'linhas': linhas[:max_exemplos]}
+
+    email = normalizar_emails(df['email'])
+    registrar('avisos', 'email_invalido', (df['email'] != '') & (email == ''))
+    df['email'] = email
+    for coluna in COLUNAS_TELEFONE:
+        telefone = normalizar_telefones(df[coluna])
+        registrar('avisos', f'{coluna}_invalido', (df[coluna] != '') & (telefone == ''))
+        df[coluna] = telefone
+
+    sem_contato = (df['email'] == '') & (df['telefone'] == '') & (df['whatsapp'] == '')
+    registrar('descartados', 'sem_contato_valido', sem_contato)
+    df = df[~sem_contato]
+    relatorio['validos'] = len(df)
+    return df, relatorio
+
+
+def para_registros(df):
+    """DataFrame -> list of dicts; much faster than ``to_dict('records')`` on Arrow-backed strings."""
+    colunas = list(df.columns)
+    return [dict(zip(colunas, valores)) for valores in zip(*(df[c].tolist() for c in colunas))]
+
+
+def dividir_em_lotes(registros, max_linhas=MAX_LINHAS_LOTE, max_bytes=MAX_BYTES_LOTE):
+    """Splits ``registros`` into chunks under both ``max_linhas`` rows and ~``max_bytes`` of JSON."""
+    lotes, atual, tamanho = [], [], 2
+    for registro in registros:
+        bytes_registro = len(json.dumps(registro, ensure_ascii=False).encode('utf-8')) + 1
+        if atual and (len(atual) >= max_linhas or tamanho + bytes_registro > max_bytes):
+            lotes.append(atual)
+            atual, tamanho = [], 2
+        atual.append(registro)
+        tamanho += bytes_registro
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+
+def _antes_do_commit(erro):
+    """True when ``erro`` proves nothing was written, so sending the same chunk again cannot duplicate it."""
+    if isinstance(erro, SupabaseError):
+        return erro.status in STATUS_ANTES_DO_COMMIT
+    if isinstance(erro, urllib.error.URLError):
+        erro = erro.reason
+    # The connection was never made; a timeout or reset may come after the server committed.
+    return isinstance(erro, (ConnectionRefusedError, socket.gaierror))
+
+
+def _incerto(erro):
+    """True when the chunk may have been written despite ``erro`` (timeouts, 5xx, dropped connections)."""
+    if isinstance(erro, SupabaseError):
+        return erro.status in STATUS_INCERTOS or erro.code == '57014'  # statement timeout
+    return not _antes_do_commit(erro)
+
+
+def com_retentativas(funcao, tentativas=4, espera=1.0):
+    """Calls ``funcao()`` retrying, with exponential backoff and jitter, only errors raised before any commit."""
+    for tentativa in range(tentativas):
+        try:
+            return funcao()
+        except (SupabaseError, OSError) as e:
+            if tentativa == tentativas - 1 or not _antes_do_commit(e):
+                raise
+            time.sleep(espera * 2 ** tentativa * (0.5 + random.random()))
+
+
+def _enviar_em_paralelo(enviar, lotes, workers=4, tentativas=4):
+    """Calls ``enviar(lote)`` for each chunk concurrently; returns one result per chunk."""
+    resultados = [None] * len(lotes)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = {executor.submit(com_retentativas, lambda l=lote: enviar(l), tentativas): i
+                   for i, lote in enumerate(lotes)}
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            try:
+                resultados[i] = {'lote': i, 'linhas': len(lotes[i]), 'ok': True, 'resposta': futuro.result()}
+            except ERROS_DE_ENVIO as e:
+                resultados[i] = {'lote': i, 'linhas': len(lotes[i]), 'ok': False, 'erro': str(e),
+                                 'codigo': getattr(e, 'code', None), 'incerto': _incerto(e)}
+                print(f"Erro no lote {i}: {e}" + (' (pode ter sido gravado)' if resultados[i]['incerto'] else ''))
+    return resultados
+
+
+def enviar_lotes(cliente, marca_id, plataforma_id, lotes, workers=4, tentativas=4):
+    """Submits each chunk to importar_leads_em_massa concurrently; returns one result per chunk."""
+    def enviar(lote):
+        return cliente.rpc('importar_leads_em_massa', {
+            'p_marca_id': marca_id,
+            'p_plataforma_id': plataforma_id,
+            'p_dados_leads': lote,
+        })
+
+    return _enviar_em_paralelo(enviar, lotes, workers, tentativas)
+
+
+def enviar_por_formulario(cliente, marca_id, plataforma_id, registros, workers=4,
+                          max_linhas=MAX_LINHAS_LOTE, max_bytes=MAX_BYTES_LOTE, tentativas=4):
+    """Resolves each distinct form once, then inserts every form's leads straight into ``leads``.
+
+    Returns ``(lotes, resultados, rejeitados)``. Chunks never mix forms, and
+    ``rejeitados`` maps each form that could not be created (RLS ``42501``) to
+    its error and lead count; those leads are not sent.
+    """
+    conta_id = resolver_conta(cliente, marca_id, plataforma_id)
+    grupos = agrupar_por_formulario(registros)
+    formularios = resolver_formularios(cliente, conta_id, marca_id, plataforma_id, grupos)
+
+    lotes, origem, rejeitados = [], [], {}
+    for nome, leads in grupos.items():
+        formulario = formularios[nome]
+        if 'erro' in formulario:
+            rejeitados[nome] = {'linhas': len(leads), 'erro': formulario['erro'], 'codigo': formulario['codigo']}
+            print(f"Formulário '{nome}' rejeitado ({formulario['codigo']}): {len(leads)} lead(s) não enviados.")
+            continue
+        for lote in dividir_em_lotes(vincular(leads, formulario['id'], conta_id, marca_id), max_linhas, max_bytes):
+            lotes.append(lote)
+            origem.append(nome)
+
+    resultados = _enviar_em_paralelo(lambda lote: cliente.insert('leads', lote), lotes, workers, tentativas)
+    for resultado, nome in zip(resultados, origem):
+        resultado['formulario'] = nome
+    return lotes, resultados, rejeitados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pré-processa e importa leads em lotes')
+    parser.add_argument('arquivo', help='Planilha de leads (.csv ou .xlsx)')
+    parser.add_argument('--marca-id', required=True)
+    parser.add_argument('--plataforma-id', required=True)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-linhas', type=int, default=MAX_LINHAS_LOTE)
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES_LOTE)
+    parser.add_argument('--relatorio', default=None, help='Caminho do relatório JSON de erros')
+    parser.add_argument('--via-rpc', action='store_true',
+                        help='Envia pela RPC importar_leads_em_massa em vez de resolver os formulários antes')
+    parser.add_argument('--sem-dedupe', action='store_true', help='Envia mesmo leads já importados')
+    parser.add_argument('--simular', action='store_true', help='Só pré-processa, sem enviar')
+    args = parser.parse_args()
+
+    leads, relatorio = preprocessar(carregar_planilha(args.arquivo))
+    registros = para_registros(leads)
+    indice = None
+    if not args.sem_dedupe:
+        indice = IndiceDedupe.carregar()
+        registros, duplicados = indice.filtrar_novos(registros, args.marca_id)
+        relatorio['duplicados'] = len(duplicados)
+    relatorio['formularios'] = {nome: len(leads) for nome, leads in agrupar_por_formulario(registros).items()}
+    print(f"{len(registros)} lead(s) novo(s) de {relatorio['total']} em {len(relatorio['formularios'])} "
+          f"formulário(s) ({relatorio.get('duplicados', 0)} duplicado(s) ignorado(s)).")
+
+    if not args.simular and registros:
+        cliente = SupabaseREST()
+        if args.via_rpc:
+            lotes = dividir_em_lotes(registros, args.max_linhas, args.max_bytes)
+            resultados = enviar_lotes(cliente, args.marca_id, args.plataforma_id, lotes, args.workers)
+        else:
+            try:
+                lotes, resultados, rejeitados = enviar_por_formulario(
+                    cliente, args.marca_id, args.plataforma_id, registros, args.workers, args.max_linhas, args.max_bytes)
+            except ContaNaoLocalizada as e:
+                raise SystemExit(str(e))
+            relatorio['formularios_rejeitados'] = rejeitados
+        relatorio['lotes'] = len(lotes)
+        relatorio['envio'] = resultados
+        falhas = [r for r in resultados if not r['ok']]
+        print(f"{len(lotes) - len(falhas)} lote(s) enviado(s), {len(falhas)} com erro.")
+        if any(r['incerto'] for r in falhas):
+            print("Há lotes que podem ter sido gravados: rode `python -m pipelines.dedupe_leads` antes de reenviar.")
+        if indice is not None:
+            # Only leads the server accepted are marked as imported, so failed chunks are retried next run.
+            for resultado in resultados:
+                if resultado['ok']:
+                    for lead in lotes[resultado['lote']]:
+                        indice.adicionar(lead, args.marca_id)
+            indice.salvar()
+
+    destino = args.relatorio or caminho_dados('relatorio_importacao_leads.json')
+    with open(destino, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2, default=str)
+    print(f"Relatório gravado em {destino}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Hashed customer lists for Meta custom audiences (``publicos_personalizados``).
+
+Streams the leads that match a brand, form or stage filter, normalizes their
+email and phone the way Meta expects, hashes them with SHA-256 and writes the
+customer-list CSV as it goes:
+
+* leads are read page by page with keyset pagination, so memory does not
+  grow with the audience size;
+* pages are handed to a process pool, where they are normalized column-wise
+  with pandas (``pipelines.contatos``) and hashed, with a bounded number of
+  tasks in flight;
+* hashed pages are written in order as they complete.
+
+Meta expects lowercase trimmed emails and phones as digits with the country
+code, so stored numbers (DDD + number) get the ``55`` prefix.
+
+    python -m pipelines.publico_personalizado --marca-id <uuid> --estagio "Em análise"
+    python -m pipelines.publico_personalizado --formulario-id <uuid> --saida publico.csv --workers 8
+
+Requires ``pandas``.
+"""
+import argparse
+import hashlib
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from pipelines.contatos import normalizar_emails, normalizar_telefones
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+CODIGO_PAIS = '55'
+CABECALHO = 'email,phone\n'
+LINHAS_POR_PAGINA = 1000
+PAGINAS_POR_TAREFA = 5
+
+
+def _sha256(valor):
+    return hashlib.sha256(valor.encode('utf-8')).hexdigest() if valor else ''
+
+
+def normalizar_pagina(linhas):
+    """Returns the ``(email, telefone)`` pairs of a page of leads, dropping leads with neither."""
+    df = pd.DataFrame(linhas, columns=['email', 'telefone', 'whatsapp'])
+    email = normalizar_emails(df['email'])
+    telefone = normalizar_telefones(df['telefone'])
+    # WhatsApp is the fallback when the main phone is missing or invalid.
+    telefone = telefone.where(telefone != '', normalizar_telefones(df['whatsapp']))
+    telefone = (CODIGO_PAIS + telefone).where(telefone != '', '')
+    validos = (email != '') | (telefone != '')
+    return list(zip(email[validos].tolist(), telefone[validos].tolist()))
+
+
+def hashear(linhas):
+    """Normalizes raw ``(email, telefone, whatsapp)`` rows and returns ``(csv, quantidade)`` (runs in the pool)."""
+    identificadores = normalizar_pagina(linhas)
+    texto = ''.join(f"{_sha256(email)},{_sha256(telefone)}\n" for email, telefone in identificadores)
+    return texto, len(identificadores)
+
+
+def gerar_publico(cliente, filtros, saida, workers=4):
+    """Writes the hashed list for leads matching ``filtros`` to ``saida``; returns ``(leads, linhas)``."""
+    def tarefas():
+        tarefa = []
+        for lead in cliente.select_keyset('leads', 'id,email,telefone,whatsapp', filtros, page_size=LINHAS_POR_PAGINA):
+            tarefa.append((lead.get('email'), lead.get('telefone'), lead.get('whatsapp')))
+            if len(tarefa) == LINHAS_POR_PAGINA * PAGINAS_POR_TAREFA:
+                yield tarefa
+                tarefa = []
+        if tarefa:
+            yield tarefa
+
+    leads = linhas = 0
+    with open(saida, 'w', encoding='utf-8', newline='') as f, ProcessPoolExecutor(max_workers=workers) as executor:
+        f.write(CABECALHO)
+        pendentes = deque()
+
+        def gravar_mais_antiga():
+            texto, quantidade = pendentes.popleft().result()
+            f.write(texto)
+            return quantidade
+
+        for tarefa in tarefas():
+            leads += len(tarefa)
+            pendentes.append(executor.submit(hashear, tarefa))
+            # Keep at most two tasks per worker in flight; writing the oldest one
+            # first preserves order and bounds memory.
+            if len(pendentes) >= 2 * workers:
+                linhas += gravar_mais_antiga()
+        while pendentes:
+            linhas += gravar_mais_antiga()
+    return leads, linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera lista de público personalizado com e-mails e telefones em SHA-256')
+    parser.add_argument('--marca-id')
+    parser.add_argument('--formulario-id')
+    parser.add_argument('--nome-formulario')
+    parser.add_argument('--estagio')
+    parser.add_argument('--saida', default=None)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    filtros = [
+        (coluna, 'eq', valor)
+        for coluna, valor in (('marca_id', args.marca_id), ('formulario_id', args.formulario_id),
+                              ('nome_formulario', args.nome_formulario), ('estagio', args.estagio))
+        if valor
+    ]
+    if not filtros:
+        parser.error('Informe ao menos um filtro (--marca-id, --formulario-id, --nome-formulario ou --estagio)')
+    saida = args.saida or caminho_dados('publico_personalizado.csv')
+
+    inicio = time.perf_counter()
+    leads, linhas = gerar_publico(SupabaseREST(), filtros, saida, args.workers)
+    print(f"{linhas} linha(s) de {leads} lead(s) gravadas em {saida} ({time.perf_counter() - inicio:.1f}s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Budget pacing: spend-to-date and month-end projection against the planned budgets.
+
+``BudgetOverview``/``BudgetSummary`` compare planned and actual investment in
+the browser and do not project the rest of the month. This job precomputes a
+pacing table for one month:
+
+* ``orcamento_mensal`` gives the brand targets (``meta_investimento_meta``,
+  ``meta_investimento_google``, ``meta_investimento_total``);
+* ``orcamento_detalhado`` gives the planned daily and total budget per model
+  and account;
+* the month's ``relatorio_anuncios`` rows are loaded once into a DataFrame.
+  Each row's spend is prorated to the days that fall inside the month and up
+  to its brand's cut-off date with numpy, then grouped once by
+  marca x plataforma x conta x modelo. Every pacing level is rolled up from
+  that single grouping.
+
+Spend is projected linearly: spend-to-date / elapsed days x days in month.
+The cut-off is, per brand, the last day covered by its imported reports
+(never after today), so a week that has not been imported yet does not read
+as underspend, even when other brands are already further ahead. Brands with
+no reports in the month use the latest day of any brand.
+
+    python -m pipelines.ritmo_orcamento
+    python -m pipelines.ritmo_orcamento --mes 6 --ano 2025 --saida public/ritmo_orcamento.json
+
+Requires ``pandas``.
+"""
+import argparse
+import calendar
+import json
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from pipelines.datas import para_datetime64
+from pipelines.supabase_rest import SupabaseREST, caminho_dados
+
+ARQUIVO_PADRAO = 'ritmo_orcamento.json'
+COLUNAS_RELATORIO = 'id,marca_id,plataforma_id,conta_de_anuncio_id,modelo_id,data_inicio,data_fim,spend'
+CHAVES = ['marca_id', 'plataforma', 'conta_de_anuncio_id', 'modelo_id']
+# Pace ratio (spend-to-date / planned-to-date) outside this band is flagged.
+FAIXA_NO_RITMO = (0.9, 1.1)
+
+
+def _plataforma(nome):
+    nome = (nome or '').lower()
+    if 'google' in nome:
+        return 'google'
+    if 'meta' in nome or 'facebook' in nome:
+        return 'meta'
+    return nome or None
+
+
+def _sem_nan(chave):
+    """Group keys with the NaN that ``groupby(dropna=False)`` puts in place of None turned back into None."""
+    if isinstance(chave, tuple):
+        return tuple(_sem_nan(c) for c in chave)
+    return None if pd.isna(chave) else chave
+
+
+def _somas(gasto, chaves):
+    return {_sem_nan(k): v for k, v in gasto.groupby(chaves, dropna=False)['realizado'].sum().items()}
+
+
+def cortes_por_marca(relatorios, corte):
+    """``{marca_id: last day covered by its reports}``, never after ``corte``."""
+    if relatorios.empty:
+        return {}
+    fins = pd.DataFrame({'marca_id': relatorios['marca_id'], 'fim': para_datetime64(relatorios['data_fim'])})
+    ultimos = fins.dropna().groupby('marca_id')['fim'].max()
+    return {marca: min(corte, fim.date()) for marca, fim in ultimos.items()}
+
+
+def gasto_por_chave(relatorios, plataformas, inicio_mes, corte, cortes=None):
+    """Prorates each report row to ``[inicio_mes, cut-off]`` and sums by marca x plataforma x conta x modelo.
+
+    The cut-off is the row's brand entry in ``cortes``, or ``corte``.
+    """
+    if relatorios.empty:
+        return pd.DataFrame(columns=CHAVES + ['realizado'])
+    data_inicio = para_datetime64(relatorios['data_inicio'])
+    data_fim = para_datetime64(relatorios['data_fim'])
+    cortes = cortes or {}
+    corte_linha = np.array([np.datetime64(cortes.get(m, corte), 'D') for m in relatorios['marca_id']],
+                           dtype='datetime64[D]')
+    dentro_inicio = np.maximum(data_inicio, np.datetime64(inicio_mes, 'D'))
+    dentro_fim = np.minimum(data_fim, corte_linha)
+    dias_dentro = np.clip((dentro_fim - dentro_inicio).astype(int) + 1, 0, None)
+    dias_linha = np.clip((data_fim - data_inicio).astype(int) + 1, 1, None)
+    spend = pd.to_numeric(relatorios['spend'], errors='coerce').fillna(0).to_numpy()
+
+    df = relatorios[['marca_id', 'conta_de_anuncio_id', 'modelo_id']].copy()
+    df['plataforma'] = relatorios['plataforma_id'].map(plataformas)
+    df['realizado'] = spend * dias_dentro / dias_linha
+    return df.groupby(CHAVES, dropna=False, as_index=False)['realizado'].sum()
+
+
+def _linha(nivel, chaves, orcado, planejado_ate_hoje, realizado, dias_decorridos, dias_mes):
+    projecao = realizado / dias_decorridos * dias_mes if dias_decorridos else 0.0
+    ritmo = realizado / planejado_ate_hoje if planejado_ate_hoje else None
+    if ritmo is None:
+        status = 'sem_orcamento' if realizado else 'sem_dados'
+    elif ritmo < FAIXA_NO_RITMO[0]:
+        status = 'abaixo'
+    elif ritmo > FAIXA_NO_RITMO[1]:
+        status = 'acima'
+    else:
+        status = 'no_ritmo'
+    return {
+        'nivel': nivel,
+        **chaves,
+        'dias_decorridos': dias_decorridos,
+        'orcado': round(orcado, 2),
+        'planejado_ate_hoje': round(planejado_ate_hoje, 2),
+        'realizado': round(realizado, 2),
+        'projecao': round(projecao, 2),
+        'desvio_projetado': round(projecao - orcado, 2),
+        'ritmo': round(ritmo, 3) if ritmo is not None else None,
+        'status': status,
+    }
+
+
+def calcular_ritmo(mensais, detalhados, gasto, dias_decorridos, dias_mes):
+    """Builds the pacing rows: brand total, brand x platform and planned model x account.
+
+    ``dias_decorridos`` maps each brand to its elapsed days.
+    """
+    por_marca = _somas(gasto, 'marca_id')
+    por_plataforma = _somas(gasto, ['marca_id', 'plataforma'])
+    por_conta_modelo = _somas(gasto, ['marca_id', 'conta_de_anuncio_id', 'modelo_id'])
+
+    linhas = []
+    marcas_do_mes = {}
+    for mensal in mensais:
+        marca = mensal['marca_id']
+        marcas_do_mes[mensal['id']] = marca
+        fracao = dias_decorridos[marca] / dias_mes
+        total = float(mensal.get('meta_investimento_total') or 0)
+        linhas.append(_linha('marca', {'marca_id': marca}, total, total * fracao,
+                             por_marca.get(marca, 0.0), dias_decorridos[marca], dias_mes))
+        for plataforma in ('meta', 'google'):
+            orcado = float(mensal.get(f'meta_investimento_{plataforma}') or 0)
+            linhas.append(_linha('plataforma', {'marca_id': marca, 'plataforma': plataforma}, orcado, orcado * fracao,
+                                 por_plataforma.get((marca, plataforma), 0.0), dias_decorridos[marca], dias_mes))
+
+    for detalhado in detalhados:
+        marca = marcas_do_mes.get(detalhado['orcamento_mensal_id'])
+        if marca is None or not detalhado.get('ativo', True):
+            continue
+        conta, modelo = detalhado['conta_de_anuncio_id'], detalhado['modelo_id']
+        diario = float(detalhado.get('orcamento_diario_planejado') or 0)
+        orcado = float(detalhado.get('orcamento_total_planejado') or 0) or diario * dias_mes
+        linhas.append(_linha('modelo', {'marca_id': marca, 'conta_de_anuncio_id': conta, 'modelo_id': modelo,
+                                        'orcamento_detalhado_id': detalhado['id']},
+                             orcado, diario * dias_decorridos[marca],
+                             por_conta_modelo.get((marca, conta, modelo), 0.0), dias_decorridos[marca], dias_mes))
+    return linhas
+
+
+def gerar(cliente, ano, mes, hoje=None):
+    hoje = hoje or date.today()
+    dias_mes = calendar.monthrange(ano, mes)[1]
+    inicio_mes, fim_mes = date(ano, mes, 1), date(ano, mes, dias_mes)
+
+    mensais = list(cliente.select('orcamento_mensal', '*', [('ano', 'eq', ano), ('mes', 'eq', mes)], order='id'))
+    detalhados = []
+    if mensais:
+        detalhados = list(cliente.select('orcamento_detalhado', '*',
+                                         [('orcamento_mensal_id', 'in', [m['id'] for m in mensais])], order='id'))
+    plataformas = {p['id']: _plataforma(p['nome']) for p in cliente.select('plataformas', 'id,nome', order='id')}
+    relatorios = pd.DataFrame(
+        list(cliente.select_keyset('relatorio_anuncios', COLUNAS_RELATORIO, [
+            ('data_inicio', 'lte', fim_mes.isoformat()),
+            ('data_fim', 'gte', inicio_mes.isoformat()),
+        ])),
+        columns=COLUNAS_RELATORIO.split(','),
+    )
+
+    corte = min(hoje, fim_mes)
+    if not relatorios.empty:
+        ultimo_dia = para_datetime64(relatorios['data_fim']).max()
+        if not np.isnat(ultimo_dia):
+            corte = min(corte, ultimo_dia.astype(date))
+    cortes = cortes_por_marca(relatorios, corte)
+    marcas = {m['marca_id'] for m in mensais}
+    dias_decorridos = {marca: max((cortes.get(marca, corte) - inicio_mes).days + 1, 0) for marca in marcas}
+
+    gasto = gasto_por_chave(relatorios, plataformas, inicio_mes, corte, cortes)
+    return {
+        'ano': ano,
+        'mes': mes,
+        'dias_mes': dias_mes,
+        'dias_decorridos': max((corte - inicio_mes).days + 1, 0),
+        'dados_ate': corte.isoformat(),
+        'dados_ate_por_marca': {marca: cortes.get(marca, corte).isoformat() for marca in sorted(marcas)},
+        'gerado_em': datetime.now(timezone.utc).isoformat(),
+        'linhas': calcular_ritmo(mensais, detalhados, gasto, dias_decorridos, dias_mes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ritmo de investimento e projeção de fechamento do mês')
+    hoje = date.today()
+    parser.add_argument('--mes', type=int, default=hoje.month)
+    parser.add_argument('--ano', type=int, default=hoje.year)
+    parser.add_argument('--saida', default=None)
+    args = parser.parse_args()
+
+    resultado = gerar(SupabaseREST(), args.ano, args.mes)
+    saida = args.saida or caminho_dados(ARQUIVO_PADRAO)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    fora = [l for l in resultado['linhas'] if l['status'] in ('abaixo', 'acima')]
+    print(f"{len(resultado['linhas'])} linha(s) de ritmo até {resultado['dados_ate']} "
+          f"({len(fora)} fora do ritmo) gravadas em {saida}")
+
+
+if __name__ == "__main__":
+    main()
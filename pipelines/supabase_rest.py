@@ -0,0 +1,177 @@
+"""Minimal PostgREST client for the Supabase project used by the app.
+
+Only the standard library is used so the batch jobs run anywhere Python does.
+Credentials come from the environment: ``SUPABASE_URL`` and
+``SUPABASE_SERVICE_ROLE_KEY`` (or ``SUPABASE_ANON_KEY``); the ``VITE_`` names
+used by the frontend are accepted as a fallback.
+"""
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DADOS_DIR = os.environ.get('PIPELINES_DADOS', 'dados')
+
+
+class SupabaseError(Exception):
+    """Error returned by PostgREST, keeping the Postgres error code (e.g. 42501)."""
+
+    def __init__(self, status, message, code=None, details=None):
+        super().__init__(f"[{status}] {message}")
+        self.status = status
+        self.message = message
+        self.code = code
+        self.details = details
+
+
+def caminho_dados(*partes):
+    """Returns a path under the local data directory, creating its parent."""
+    path = os.path.join(DADOS_DIR, *partes)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return path
+
+
+def formatar_filtro(op, value):
+    """Formats a PostgREST filter value, e.g. ('in', [1, 2]) -> 'in.(1,2)'.
+
+    ``op=None`` passes ``value`` through untouched, for ``or=(...)`` expressions.
+    """
+    if op is None:
+        return value
+    if op == 'in':
+        return 'in.(' + ','.join(str(v) for v in value) + ')'
+    if value is None and op == 'is':
+        return 'is.null'
+    return f"{op}.{value}"
+
+
+class SupabaseREST:
+    def __init__(self, url=None, key=None, timeout=60):
+        self.url = (url or os.environ.get('SUPABASE_URL') or os.environ.get('VITE_SUPABASE_URL') or '').rstrip('/')
+        self.key = (key or os.environ.get('SUPABASE_SERVICE_ROLE_KEY') or os.environ.get('SUPABASE_ANON_KEY')
+                    or os.environ.get('VITE_SUPABASE_ANON_KEY'))
+        if not self.url or not self.key:
+            raise SupabaseError(0, "Configure SUPABASE_URL e SUPABASE_SERVICE_ROLE_KEY (ou SUPABASE_ANON_KEY).")
+        self.timeout = timeout
+
+    def _request(self, method, path, params=None, body=None, headers=None):
+        url = f"{self.url}/rest/v1/{path}"
+        if params:
+            url += '?' + urllib.parse.urlencode(params, safe='(),.:*')
+        req_headers = {
+            'apikey': self.key,
+            'Authorization': f"Bearer {self.key}",
+            'Content-Type': 'application/json',
+        }
+        req_headers.update(headers or {})
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(url, data=data, method=method, headers=req_headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                payload = resp.read()
+                return json.loads(payload) if payload else None
+        except urllib.error.HTTPError as e:
+            raw = e.read().decode('utf-8', errors='replace')
+            try:
+                info = json.loads(raw)
+            except ValueError:
+                info = {'message': raw}
+            raise SupabaseError(e.code, info.get('message', raw), info.get('code'), info.get('details')) from None
+
+    def select(self, table, columns='*', filters=None, order=None, page_size=1000):
+        """Yields every row of ``table`` matching ``filters``, paging with Range headers.
+
+        ``filters`` is a list of ``(column, op, value)`` tuples using PostgREST
+        operators (``eq``, ``gte``, ``in``...). Columns may repeat, which is how
+        ranges such as ``gte``/``lte`` on the same column are expressed.
+
+        Offset pages are only stable under an ``order`` that ends in a unique
+        key; without one, asking for a second page raises ``ValueError``
+        instead of silently skipping or repeating rows. Large reads should use
+        ``select_keyset``.
+        """
+        params = [('select', columns)]
+        for column, op, value in filters or []:
+            params.append((column, formatar_filtro(op, value)))
+        if order:
+            params.append(('order', order))
+        inicio = 0
+        while True:
+            fim = inicio + page_size - 1
+            rows = self._request('GET', table, params, headers={'Range-Unit': 'items', 'Range': f"{inicio}-{fim}"})
+            if not rows:
+                return
+            yield from rows
+            if len(rows) < page_size:
+                return
+            if not order:
+                raise ValueError(f"{table}: mais de {page_size} linhas sem order; use select_keyset "
+                                 "ou um order que termine numa chave única")
+            inicio += page_size
+
+    def select_keyset(self, table, columns='*', filters=None, key='id', page_size=1000):
+        """Like ``select``, but pages with ``key > last`` instead of offsets.
+
+        Each page is an index range scan, so streaming millions of rows does not
+        get slower towards the end. ``key`` must be unique and in ``columns``, and
+        ``page_size`` must not exceed the project's max-rows setting.
+        """
+        ultimo = None
+        while True:
+            pagina = list(filters or [])
+            if ultimo is not None:
+                pagina.append((key, 'gt', ultimo))
+            params = [('select', columns), ('order', key), ('limit', str(page_size))]
+            params[1:1] = [(column, formatar_filtro(op, value)) for column, op, value in pagina]
+            rows = self._request('GET', table, params)
+            if not rows:
+                return
+            yield from rows
+            if len(rows) < page_size:
+                return
+            ultimo = rows[-1][key]
+
+    def select_desde(self, table, columns='*', filters=None, coluna='criado_em', apos=None, page_size=1000):
+        """Yields the rows after ``apos`` in ``(coluna, id)`` order, paging by that pair instead of offsets.
+
+        ``apos`` is the ``(valor, id)`` of the last row already seen, or
+        ``(valor, None)`` to restart at ``valor`` itself. Rows sharing a
+        timestamp across a page boundary are neither skipped nor repeated.
+        Rows with ``coluna`` null are left out; ``coluna`` and ``id`` must be in
+        ``columns``.
+        """
+        while True:
+            pagina = list(filters or []) + [(coluna, 'not.is', 'null')]
+            if apos is not None:
+                valor, ultimo_id = apos
+                if ultimo_id is None:
+                    pagina.append((coluna, 'gte', valor))
+                else:
+                    # Quoted: timestamps carry ':' and '+', which the or= grammar would split on.
+                    pagina.append(('or', None, f'({coluna}.gt."{valor}",and({coluna}.eq."{valor}",id.gt.{ultimo_id}))'))
+            params = [('select', columns)]
+            params += [(column, formatar_filtro(op, value)) for column, op, value in pagina]
+            params += [('order', f'{coluna},id'), ('limit', str(page_size))]
+            rows = self._request('GET', table, params)
+            if not rows:
+                return
+            yield from rows
+            if len(rows) < page_size:
+                return
+            apos = (rows[-1][coluna], rows[-1]['id'])
+
+    def upsert(self, table, rows, on_conflict=None):
+        """Inserts or updates ``rows``; returns nothing to keep large batches cheap."""
+        if not rows:
+            return
+        params = [('on_conflict', on_conflict)] if on_conflict else None
+        self._request('POST', table, params, body=rows,
+                      headers={'Prefer': 'resolution=merge-duplicates,return=minimal'})
+
+    def insert(self, table, rows, returning=False):
+        prefer = 'return=representation' if returning else 'return=minimal'
+        return self._request('POST', table, body=rows, headers={'Prefer': prefer})
+
+    def rpc(self, function, params=None):
+        return self._request('POST', f"rpc/{function}", body=params or {})
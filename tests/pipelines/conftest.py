@@ -0,0 +1,78 @@
+"""Fixtures shared by the pipeline tests.
+
+No test talks to Supabase: jobs get a ``ClienteFalso`` serving fixed rows, and
+``urlopen`` is replaced so a client that slips through fails loudly instead of
+reaching the network.
+"""
+import urllib.request
+
+import pytest
+
+_OPERADORES = {
+    'eq': lambda a, b: a == b,
+    'gt': lambda a, b: a is not None and a > b,
+    'gte': lambda a, b: a is not None and a >= b,
+    'lt': lambda a, b: a is not None and a < b,
+    'lte': lambda a, b: a is not None and a <= b,
+    'in': lambda a, b: a in b,
+    'is': lambda a, b: a is b,
+    'not.is': lambda a, b: a is not None,
+}
+
+
+class ClienteFalso:
+    """In-memory stand-in for the read methods of ``SupabaseREST``.
+
+    ``tabelas`` maps a table name to its rows. Plain ``(column, op, value)``
+    filters are applied; ``or`` expressions are ignored, so those reads return
+    a superset of the real one, which every job re-filters by week anyway.
+    ``chamadas`` records ``(method, table)`` of every read.
+    """
+
+    def __init__(self, tabelas=None):
+        self.tabelas = tabelas or {}
+        self.chamadas = []
+
+    def _linhas(self, table, columns, filters):
+        linhas = []
+        for linha in self.tabelas.get(table, []):
+            if all(op is None or _OPERADORES[op](linha.get(column), value) for column, op, value in filters or []):
+                linhas.append(linha)
+        if columns == '*':
+            return [dict(linha) for linha in linhas]
+        nomes = columns.split(',')
+        return [{nome: linha.get(nome) for nome in nomes} for linha in linhas]
+
+    def select(self, table, columns='*', filters=None, order=None, page_size=1000):
+        self.chamadas.append(('select', table))
+        linhas = self._linhas(table, columns, filters)
+        return sorted(linhas, key=lambda l: l[order]) if order else linhas
+
+    def select_keyset(self, table, columns='*', filters=None, key='id', page_size=1000):
+        self.chamadas.append(('select_keyset', table))
+        return sorted(self._linhas(table, columns, filters), key=lambda l: l[key])
+
+    def select_desde(self, table, columns='*', filters=None, coluna='criado_em', apos=None, page_size=1000):
+        self.chamadas.append(('select_desde', table))
+        linhas = sorted((l for l in self._linhas(table, columns, filters) if l.get(coluna) is not None),
+                        key=lambda l: (l[coluna], l['id']))
+        if apos is not None:
+            valor, ultimo_id = apos
+            if ultimo_id is None:
+                linhas = [l for l in linhas if l[coluna] >= valor]
+            else:
+                linhas = [l for l in linhas if (l[coluna], l['id']) > (valor, ultimo_id)]
+        return linhas
+
+
+@pytest.fixture(autouse=True)
+def sem_rede(monkeypatch):
+    def recusar(*args, **kwargs):
+        raise AssertionError('os testes de pipelines não acessam a rede')
+
+    monkeypatch.setattr(urllib.request, 'urlopen', recusar)
+
+
+@pytest.fixture
+def cliente_falso():
+    return ClienteFalso
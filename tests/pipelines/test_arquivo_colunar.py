@@ -0,0 +1,107 @@
+import csv
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+
+from pipelines.arquivo_colunar import ArquivoColunar, ler_exportacao, tipar_coluna
+
+CABECALHO_META = ['Nome da conta', 'Nome da campanha', 'Identificação da campanha', 'Início dos relatórios',
+                  'Término dos relatórios', 'Valor usado (BRL)', 'Observação']
+
+
+def _csv(path, linhas):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(linhas)
+    return str(path)
+
+
+@pytest.mark.parametrize('coluna, valores, tipo', [
+    ('valor_usado_brl', ['R$ 1.234,56', '8,5', ''], 'float'),
+    ('inicio_dos_relatorios', ['2025-06-02', '09/06/2025'], 'date'),
+    ('nome_da_campanha', ['Kia Sportage', '12'], 'string'),
+    # 18-digit Meta IDs would lose precision as floats.
+    ('identificacao_da_campanha', ['120210000000000001'], 'string'),
+    ('observacao', ['', ' ', '--'], None),
+])
+def test_tipar_coluna(coluna, valores, tipo):
+    assert tipar_coluna(coluna, valores) == tipo
+
+
+def test_esquema_coluna_vazia_fica_sem_tipo_ate_ter_valores(tmp_path):
+    arquivo = ArquivoColunar(str(tmp_path))
+    assert arquivo._registrar_esquema('meta', ['Observação'], [None]) == ([None], set())
+    # The first real values type the column without widening it.
+    assert arquivo._registrar_esquema('meta', ['Observação'], ['float']) == (['float'], set())
+    # An empty column afterwards keeps the known type.
+    assert arquivo._registrar_esquema('meta', ['Observação'], [None]) == (['float'], set())
+    assert arquivo.manifesto['esquemas']['meta']['observacao'] == {'original': 'Observação', 'tipo': 'float'}
+
+
+def test_esquema_conflito_alarga_para_string(tmp_path):
+    arquivo = ArquivoColunar(str(tmp_path))
+    arquivo._registrar_esquema('meta', ['Observação'], ['float'])
+    assert arquivo._registrar_esquema('meta', ['Observação'], ['date']) == (['string'], {'observacao'})
+    # Platforms keep separate schemas.
+    assert arquivo._registrar_esquema('google', ['Observação'], ['date']) == (['date'], set())
+
+
+def test_converter_particiona_por_marca_e_semana(tmp_path):
+    origem = _csv(tmp_path / 'kia_junho.csv', [
+        CABECALHO_META,
+        ['Kia Motors', 'Kia Sportage', '120210000000000001', '2025-06-02', '2025-06-08', '100,50', ''],
+        ['Suzuki SP', 'Suzuki Jimny', '120210000000000002', '2025-06-09', '2025-06-15', '1.000,00', ''],
+    ])
+    arquivo = ArquivoColunar(str(tmp_path / 'arquivo'))
+    assert arquivo.converter(origem, 'meta', 'planilhas/meta/kia_junho.csv') == 2
+    assert sorted(arquivo.manifesto['fontes']['planilhas/meta/kia_junho.csv']['arquivos']) == [
+        'plataforma=meta/marca=kia/semana=2025-06-02/kia_junho.parquet',
+        'plataforma=meta/marca=suzuki/semana=2025-06-09/kia_junho.parquet',
+    ]
+    # Unchanged sources are skipped on re-runs.
+    assert arquivo.converter(origem, 'meta', 'planilhas/meta/kia_junho.csv') == 0
+
+
+def test_coluna_sem_tipo_e_lida_com_o_tipo_posterior(tmp_path):
+    destino = str(tmp_path / 'arquivo')
+    arquivo = ArquivoColunar(destino)
+    arquivo.converter(_csv(tmp_path / 'kia_a.csv', [
+        CABECALHO_META, ['Kia Motors', 'Kia Sportage', '1', '2025-06-02', '2025-06-08', '100,50', ''],
+    ]), 'meta', 'a.csv')
+    arquivo.converter(_csv(tmp_path / 'kia_b.csv', [
+        CABECALHO_META, ['Kia Motors', 'Kia Sportage', '1', '2025-06-09', '2025-06-15', '80', '3,5'],
+    ]), 'meta', 'b.csv')
+    esquema = arquivo.esquema_arrow('meta')
+    assert esquema.field('observacao').type == pa.float64()
+    tabela = ds.dataset(destino, format='parquet', schema=esquema, partitioning='hive').to_table()
+    assert sorted(tabela.column('observacao').to_pylist(), key=lambda v: v is None) == [3.5, None]
+
+
+def test_alargamento_reescreve_particoes_antigas(tmp_path):
+    destino = str(tmp_path / 'arquivo')
+    arquivo = ArquivoColunar(destino)
+    arquivo.converter(_csv(tmp_path / 'kia_a.csv', [
+        CABECALHO_META, ['Kia Motors', 'Kia Sportage', '1', '2025-06-02', '2025-06-08', '100', '12'],
+    ]), 'meta', 'a.csv')
+    arquivo.converter(_csv(tmp_path / 'kia_b.csv', [
+        CABECALHO_META, ['Kia Motors', 'Kia Sportage', '1', '2025-06-09', '2025-06-15', '80', 'pausada'],
+    ]), 'meta', 'b.csv')
+    esquema = arquivo.esquema_arrow('meta')
+    assert esquema.field('observacao').type == pa.string()
+    tabela = ds.dataset(destino, format='parquet', schema=esquema, partitioning='hive').to_table()
+    assert sorted(tabela.column('observacao').to_pylist()) == ['12', 'pausada']
+
+
+def test_ler_exportacao_google_descarta_cabecalho_e_totais(tmp_path):
+    origem = _csv(tmp_path / 'google.csv', [
+        ['Relatório de campanhas'],
+        ['1 de junho de 2025 - 30 de junho de 2025'],
+        ['Campanha', 'Grupo de anúncios', 'Anúncio', 'Palavra-chave', 'Custo'],
+        ['Kia Search', 'Grupo 1', '', '', '10,00'],
+        ['Total: Total da campanha', '', '', '', '10,00'],
+        ['Total: conta', '', '', '', '10,00'],
+    ])
+    header, rows, periodo = ler_exportacao(origem, 'google')
+    assert header[0] == 'Campanha'
+    assert [r[0] for r in rows] == ['Kia Search']
+    assert [d.isoformat() for d in periodo] == ['2025-06-01', '2025-06-30']
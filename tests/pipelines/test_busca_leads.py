@@ -0,0 +1,164 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from pipelines.busca_leads import (CABECALHO_TOKEN, HOST, IndiceBusca, _Servico, normalizar_consulta,
+                                   texto_indexado, trigramas)
+
+
+def _lead(id_, nome, criado_em, telefone=None, estagio='Em análise', importado_em=None, **outros):
+    return {'id': id_, 'nome': nome, 'email': None, 'telefone': telefone, 'whatsapp': None, 'proprietario': None,
+            'rotulos': None, 'estagio': estagio, 'formulario_id': 'f1', 'conta_de_anuncio_id': 'c1',
+            'marca_id': 'kia', 'criado_em': criado_em, 'importado_em': importado_em, 'nome_formulario': 'Feirão',
+            **outros}
+
+
+@pytest.fixture
+def leads():
+    return [
+        _lead('l1', 'João da Silva', '2025-06-01T10:00:00', telefone='(51) 99999-1234'),
+        _lead('l2', 'Maria Silva', '2025-06-03T10:00:00', estagio='Qualificado'),
+        _lead('l3', 'Silvana Souza', '2025-06-03T10:00:00'),
+        _lead('l4', 'Pedro Alves', '2025-06-02T10:00:00', email='pedro.silva@exemplo.com'),
+        _lead('l5', 'Silvio Santos', None),
+    ]
+
+
+@pytest.fixture
+def indice(leads):
+    return IndiceBusca(leads)
+
+
+def test_trigramas():
+    assert trigramas('silva') == {'sil', 'ilv', 'lva'}
+    assert trigramas('ab') == set()
+
+
+def test_normalizar_consulta():
+    assert normalizar_consulta(' JOÃO ') == 'joao'
+    assert normalizar_consulta('(51) 99999-1234') == '51999991234'
+    assert normalizar_consulta('+55 51 9999') == '55519999'
+
+
+def test_texto_indexado_inclui_telefone_so_com_digitos(leads):
+    assert '51999991234' in texto_indexado(leads[0])
+    assert 'joao da silva' in texto_indexado(leads[0])
+
+
+def test_ordem_de_exibicao(indice):
+    # criado_em desc, ties by id desc, leads without criado_em last.
+    assert [l['id'] for l in indice.leads] == ['l3', 'l2', 'l4', 'l1', 'l5']
+
+
+@pytest.mark.parametrize('consulta, ids', [
+    ('silva', ['l3', 'l2', 'l4', 'l1']),
+    ('SILV', ['l3', 'l2', 'l4', 'l1', 'l5']),
+    ('joao', ['l1']),
+    ('99999-1234', ['l1']),
+    ('(51) 99999-1234', ['l1']),
+    ('si', ['l3', 'l2', 'l4', 'l1', 'l5']),
+    # Both trigrams occur, but not as one substring.
+    ('silvaso', []),
+    ('inexistente', []),
+])
+def test_buscar(indice, consulta, ids):
+    dados, proximo = indice.buscar(consulta)
+    assert [l['id'] for l in dados] == ids
+    assert proximo is None
+
+
+def test_buscar_com_filtros(indice):
+    dados, _ = indice.buscar('silva', {'estagio': 'Qualificado', 'marca_id': ''})
+    assert [l['id'] for l in dados] == ['l2']
+
+
+def test_cursor_percorre_todas_as_paginas(indice):
+    vistos, apos = [], None
+    while True:
+        dados, apos = indice.buscar('silv', limite=2, apos=apos)
+        vistos.extend(l['id'] for l in dados)
+        if apos is None:
+            break
+    assert vistos == ['l3', 'l2', 'l4', 'l1', 'l5']
+
+
+def test_cursor_continua_valido_apos_novos_leads(indice, leads):
+    dados, apos = indice.buscar('silv', limite=2)
+    assert apos == '2025-06-03T10:00:00|l2'
+    novo = IndiceBusca(leads + [_lead('l6', 'Silas Novo', '2025-06-05T10:00:00')])
+    dados, _ = novo.buscar('silv', limite=2, apos=apos)
+    assert [l['id'] for l in dados] == ['l4', 'l1']
+
+
+def test_salvar_e_carregar(indice, tmp_path):
+    path = tmp_path / 'busca.json'
+    indice.marca_dagua = {'importado_em': ['2025-06-01T00:00:00', 'l1']}
+    indice.salvar(path)
+    carregado = IndiceBusca.carregar(path)
+    assert carregado.marca_dagua == indice.marca_dagua
+    assert carregado.buscar('silva') == indice.buscar('silva')
+
+
+def test_sincronizar_le_novos_leads_e_filtros_atualizados(leads, cliente_falso):
+    tabela = [dict(l, importado_em='2025-06-04T00:00:00') for l in leads[:3]]
+    cliente = cliente_falso({'leads': tabela})
+    indice = IndiceBusca()
+    assert indice.sincronizar(cliente) == 3
+    assert indice.marca_dagua == {'importado_em': ['2025-06-04T00:00:00', 'l3']}
+
+    # An app-created lead, a stage change and a deletion.
+    tabela.append(_lead('l7', 'Silvia App', '2025-06-06T10:00:00'))
+    tabela[1] = dict(tabela[1], estagio='Vendido')
+    del tabela[0]
+    assert indice.sincronizar(cliente) == 3
+    assert [l['id'] for l in indice.buscar('silv')[0]] == ['l7', 'l3', 'l2']
+    assert indice.buscar('maria')[0][0]['estagio'] == 'Vendido'
+    assert indice.marca_dagua['criado_em'] == ['2025-06-06T10:00:00', 'l7']
+
+
+@pytest.fixture
+def servico(indice, monkeypatch):
+    monkeypatch.setattr(_Servico, 'indice', indice)
+    monkeypatch.setattr(_Servico, 'token', 'segredo')
+    monkeypatch.setattr(_Servico, 'origem', 'http://localhost:5173')
+    servidor = ThreadingHTTPServer((HOST, 0), _Servico)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor.server_address[1]
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _pedir(porta, metodo, caminho, cabecalhos):
+    conexao = http.client.HTTPConnection(HOST, porta, timeout=5)
+    conexao.request(metodo, caminho, headers=cabecalhos)
+    resposta = conexao.getresponse()
+    corpo = resposta.read()
+    conexao.close()
+    return resposta, json.loads(corpo) if corpo else None
+
+
+def test_servico_exige_token(servico):
+    resposta, _ = _pedir(servico, 'GET', '/leads?q=silva', {})
+    assert resposta.status == 401
+    resposta, _ = _pedir(servico, 'GET', '/leads?q=silva', {CABECALHO_TOKEN: 'errado'})
+    assert resposta.status == 401
+
+
+def test_servico_responde_so_para_a_origem_do_app(servico):
+    resposta, corpo = _pedir(servico, 'GET', '/leads?q=silva&limite=1',
+                             {CABECALHO_TOKEN: 'segredo', 'Origin': 'http://localhost:5173'})
+    assert resposta.status == 200
+    assert resposta.getheader('Access-Control-Allow-Origin') == 'http://localhost:5173'
+    assert [l['id'] for l in corpo['dados']] == ['l3'] and corpo['proximo'] == '2025-06-03T10:00:00|l3'
+    resposta, _ = _pedir(servico, 'GET', '/saude', {CABECALHO_TOKEN: 'segredo', 'Origin': 'https://outro.site'})
+    assert resposta.status == 200
+    assert resposta.getheader('Access-Control-Allow-Origin') is None
+
+
+def test_servico_preflight(servico):
+    resposta, _ = _pedir(servico, 'OPTIONS', '/leads', {'Origin': 'http://localhost:5173'})
+    assert resposta.status == 204
+    assert resposta.getheader('Access-Control-Allow-Headers') == CABECALHO_TOKEN
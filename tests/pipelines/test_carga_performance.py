@@ -0,0 +1,98 @@
+import csv
+import uuid
+
+import pytest
+
+from pipelines.carga_performance import NAMESPACE, CargaPerformance, carregar_arquivo
+from pipelines.indice_external_id import IndiceExternalId
+
+CABECALHO = ['Dia', 'Início dos relatórios', 'Identificação da campanha', 'Identificação do anúncio', 'Idade',
+             'Gênero', 'Posicionamento', 'Valor usado (BRL)', 'Impressões', 'Término dos relatórios', 'Extra']
+
+
+def _valores(dia='2025-06-02', campanha='120210000000000001', anuncio='9001', idade='25-34', genero='female',
+             posicionamento='Feed', custo='12,50', impressoes='1234', extra=''):
+    return [dia, '2025-06-01', campanha, anuncio, idade, genero, posicionamento, custo, impressoes, '2025-06-30',
+            extra]
+
+
+@pytest.fixture
+def indice():
+    indice = IndiceExternalId()
+    indice.mesclar([{'id': str(uuid.UUID(int=1)), 'external_id': '120210000000000001', 'marca_id': None,
+                     'conta_de_anuncio_id': None}])
+    return indice
+
+
+def test_projecao_do_cabecalho():
+    carga = CargaPerformance(CABECALHO)
+    # "Dia" wins over "Início dos relatórios"; the end date is ignored, unmapped columns go to the raw payload.
+    assert [(p, c) for p, c, _ in carga.projecao if c == 'data_relatorio'] == [(0, 'data_relatorio')]
+    assert [h for _, h in carga.brutos] == ['Posicionamento', 'Extra']
+    assert carga.dimensoes == [6]
+
+
+def test_cabecalho_sem_data():
+    with pytest.raises(ValueError):
+        CargaPerformance(['Identificação do anúncio', 'Impressões'])
+
+
+def test_linha_converte_tipos():
+    registro = CargaPerformance(CABECALHO).linha(_valores())
+    assert registro['data_relatorio'] == '2025-06-02'
+    assert registro['custo'] == 12.5 and registro['impressoes'] == 1234
+    assert registro['dados_brutos_plataforma'] == {'Posicionamento': 'Feed'}
+
+
+def test_id_uuid5_deterministico_por_chave_e_dimensoes():
+    carga = CargaPerformance(CABECALHO)
+
+    def id_de(**valores):
+        return carga.finalizar(carga.linha(_valores(**valores)))['id']
+
+    esperado = uuid.uuid5(NAMESPACE, '2025-06-02|9001|120210000000000001|25-34|female|Feed')
+    assert id_de() == str(esperado)
+    # Metrics do not change the id; every key column and extra dimension does.
+    assert id_de(custo='99') == id_de()
+    assert id_de(idade='35-44') != id_de()
+    assert id_de(posicionamento='Stories') != id_de()
+    assert id_de(dia='2025-06-03') != id_de()
+
+
+def test_campanha_id_so_quando_resolvida(indice):
+    carga = CargaPerformance(CABECALHO, indice)
+    assert carga.finalizar(carga.linha(_valores()))['campanha_id'] == str(uuid.UUID(int=1))
+    assert 'campanha_id' not in carga.finalizar(carga.linha(_valores(campanha='999')))
+
+
+class _ClienteUpsert:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, table, rows, on_conflict=None):
+        self.upserts.append((table, rows, on_conflict))
+
+
+def test_carregar_arquivo(tmp_path, indice):
+    path = tmp_path / 'breakdown.csv'
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows([
+            CABECALHO,
+            _valores(),
+            _valores(),
+            _valores(campanha='999'),
+            _valores(idade='35-44'),
+            [''] * len(CABECALHO),
+            _valores(dia='', campanha='', anuncio='', idade='', genero='', posicionamento=''),
+        ])
+    cliente = _ClienteUpsert()
+    resumo = carregar_arquivo(str(path), cliente, indice, tamanho_lote=10)
+    assert (resumo['linhas'], resumo['enviadas'], resumo['sem_data'], resumo['sem_campanha']) == (5, 4, 1, 1)
+    # Rows with and without a resolved campaign go in separate requests; the repeated row is sent once.
+    assert sorted(len(rows) for _, rows, _ in cliente.upserts) == [1, 2]
+    assert all(table == 'relatorio_performance' and conflito == 'id' for table, _, conflito in cliente.upserts)
+
+    outra = _ClienteUpsert()
+    carregar_arquivo(str(path), outra, indice, tamanho_lote=2)
+    ids = {row['id'] for _, rows, _ in cliente.upserts for row in rows}
+    assert {row['id'] for _, rows, _ in outra.upserts for row in rows} == ids
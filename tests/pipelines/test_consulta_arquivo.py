@@ -0,0 +1,66 @@
+import csv
+
+import pytest
+
+from pipelines.arquivo_colunar import ArquivoColunar
+from pipelines.consulta_arquivo import ConsultaArquivo, _particao
+
+CABECALHO_META = ['Nome da conta', 'Nome da campanha', 'Início dos relatórios', 'Término dos relatórios',
+                  'Valor usado (BRL)']
+
+
+@pytest.fixture
+def raiz(tmp_path):
+    origem = tmp_path / 'meta.csv'
+    with open(origem, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows([
+            CABECALHO_META,
+            ['Kia Motors', 'Kia Sportage', '2025-06-02', '2025-06-08', '100'],
+            ['Kia Motors', 'Kia Stonic', '2025-06-04', '2025-06-08', '5'],
+            ['Kia Centro', 'Kia Sportage', '2025-06-09', '2025-06-15', '300'],
+            ['Suzuki SP', 'Suzuki Jimny', '2025-06-09', '2025-06-15', '50'],
+        ])
+    destino = str(tmp_path / 'arquivo')
+    ArquivoColunar(destino).converter(str(origem), 'meta', 'planilhas/meta/meta.csv')
+    return destino
+
+
+def test_particao_do_caminho():
+    assert _particao('plataforma=meta/marca=kia/semana=2025-06-02/x.parquet') == {
+        'plataforma': 'meta', 'marca': 'kia', 'semana': '2025-06-02'}
+
+
+def test_indexar_grava_mapas_de_zona(raiz):
+    consulta = ConsultaArquivo(raiz).indexar()
+    zona = consulta.zonas['plataforma=meta/marca=kia/semana=2025-06-02/meta.parquet']
+    assert zona['linhas'] == 2
+    assert zona['inicio_dos_relatorios'] == ['2025-06-02', '2025-06-04']
+    assert zona['valor_usado_brl'] == [5.0, 100.0]
+    # Reloaded from _zonas.json.
+    assert ConsultaArquivo(raiz).zonas == consulta.zonas
+
+
+@pytest.mark.parametrize('filtros, semanas', [
+    ({}, ['kia/2025-06-02', 'kia/2025-06-09', 'suzuki/2025-06-09']),
+    ({'marca': 'Kia'}, ['kia/2025-06-02', 'kia/2025-06-09']),
+    ({'plataforma': 'google'}, []),
+    ({'data_inicio': '2025-06-05'}, ['kia/2025-06-09', 'suzuki/2025-06-09']),
+    ({'data_fim': '2025-06-08'}, ['kia/2025-06-02']),
+    ({'spend_min': 200}, ['kia/2025-06-09']),
+    ({'conta': 'Suzuki SP'}, ['suzuki/2025-06-09']),
+])
+def test_particoes_podadas(raiz, filtros, semanas):
+    particoes = ConsultaArquivo(raiz).indexar().particoes(filtros)
+    assert [f"{p['marca']}/{p['semana']}" for _, p in particoes] == semanas
+
+
+def test_consultar_filtra_linhas_e_acrescenta_particao(raiz):
+    consulta = ConsultaArquivo(raiz).indexar()
+    linhas = list(consulta.consultar({'marca': 'kia', 'data_inicio': '2025-06-03'},
+                                     colunas=['nome_da_campanha', 'valor_usado_brl']))
+    assert linhas == [
+        {'nome_da_campanha': 'Kia Stonic', 'valor_usado_brl': 5.0,
+         'plataforma': 'meta', 'marca': 'kia', 'semana': '2025-06-02'},
+        {'nome_da_campanha': 'Kia Sportage', 'valor_usado_brl': 300.0,
+         'plataforma': 'meta', 'marca': 'kia', 'semana': '2025-06-09'},
+    ]
@@ -0,0 +1,103 @@
+import pytest
+
+from pipelines import cubo_metricas
+from pipelines.cubo_metricas import CuboMetricas, _restrita
+
+
+def _linha(id_, marca, plataforma, conta, inicio, fim, spend, carimbo='2025-06-20T10:00:00'):
+    return {
+        'id': id_, 'marca_id': marca, 'plataforma_id': plataforma, 'conta_de_anuncio_id': conta,
+        'data_inicio': inicio, 'data_fim': fim, 'spend': spend, 'conversao': spend / 50,
+        'cliques': int(spend / 10), 'impressoes': int(spend * 10), 'criado_em': carimbo, 'atualizado_em': None,
+    }
+
+
+@pytest.fixture
+def linhas():
+    return [
+        _linha(1, 'kia', 'meta', 'c1', '2025-06-02', '2025-06-08', 100.0),
+        # Older imports were not normalized to Monday: still bucketed into the week of 2025-06-02.
+        _linha(2, 'kia', 'meta', 'c1', '2025-06-04', '2025-06-08', 50.0),
+        _linha(3, 'kia', 'google', 'c2', '2025-06-09', '2025-06-15', 200.0),
+        _linha(4, 'suzuki', 'meta', 'c3', '2025-06-09', '2025-06-12', 30.0),
+        _linha(5, 'suzuki', 'meta', 'c3', '2025-06-16', '2025-06-22', 70.0, '2025-06-23T08:00:00'),
+    ]
+
+
+@pytest.fixture
+def cubo(linhas, cliente_falso):
+    return cubo_metricas.reconstruir(cliente_falso({'relatorio_anuncios': linhas}))
+
+
+def test_linhas_agrupadas_por_segunda_feira(cubo):
+    assert cubo.semanas == ['2025-06-02', '2025-06-09', '2025-06-16']
+    assert cubo.linhas_por_semana == {'2025-06-02': 2, '2025-06-09': 2, '2025-06-16': 1}
+    celula = cubo.celulas[('kia', 'meta', 'c1', '2025-06-02')]
+    assert celula[:5] == [150.0, 3.0, 15, 1500, '2025-06-08']
+    assert set(celula[5]) == {'2025-06-02|2025-06-08', '2025-06-04|2025-06-08'}
+    assert cubo.marca_dagua == '2025-06-23T08:00:00'
+
+
+@pytest.mark.parametrize('filtros, spend', [
+    ({}, 450.0),
+    ({'marca_id': 'kia'}, 350.0),
+    ({'plataforma_id': 'meta', 'conta_de_anuncio_id': 'c3'}, 100.0),
+    ({'data_inicio': '2025-06-09'}, 300.0),
+    # Inside a week only the rows starting on or after data_inicio count.
+    ({'data_inicio': '2025-06-03'}, 350.0),
+    # Rows ending after data_fim are left out, even when their week starts before it.
+    ({'data_fim': '2025-06-12'}, 180.0),
+    ({'data_inicio': '2025-06-09', 'data_fim': '2025-06-15'}, 230.0),
+    ({'data_inicio': '2025-06-03', 'data_fim': '2025-06-07'}, 0),
+    ({'marca_id': 'inexistente'}, 0),
+])
+def test_consultar_por_intervalo(cubo, filtros, spend):
+    assert cubo.consultar(filtros)['spend'] == pytest.approx(spend)
+
+
+def test_tendencia_semanal(cubo):
+    semanas = cubo.tendencia_semanal({'data_fim': '2025-06-15'})
+    assert [(s['semana'], s['spend']) for s in semanas] == [('2025-06-02', 150.0), ('2025-06-09', 230.0)]
+
+
+def test_celula_sem_subtotais_mantem_semana_inteira():
+    antiga = [10.0, 1.0, 1, 100, '2025-06-08']
+    assert _restrita(antiga, '2025-06-04', None) is antiga
+    assert _restrita(antiga, None, '2025-06-07') is None
+
+
+def test_salvar_e_carregar(cubo, tmp_path):
+    path = tmp_path / 'cubo.json'
+    cubo.salvar(path)
+    carregado = CuboMetricas.carregar(path)
+    assert carregado.celulas == cubo.celulas
+    assert carregado.linhas_por_semana == cubo.linhas_por_semana
+    assert carregado.consultar({'data_inicio': '2025-06-03'}) == cubo.consultar({'data_inicio': '2025-06-03'})
+
+
+def test_carregar_sem_arquivo(tmp_path):
+    assert CuboMetricas.carregar(tmp_path / 'nao_existe.json').celulas == {}
+
+
+def test_semanas_divergentes(cubo, linhas):
+    assert cubo.semanas_divergentes(linhas) == set()
+    # A deleted row shows up in the count, an edited one in the spend.
+    sem_linha_4 = [l for l in linhas if l['id'] != 4]
+    assert cubo.semanas_divergentes(sem_linha_4) == {'2025-06-09'}
+    editadas = [dict(l, spend=75.0) if l['id'] == 5 else l for l in linhas]
+    assert cubo.semanas_divergentes(editadas) == {'2025-06-16'}
+    assert cubo.semanas_divergentes(linhas[:2]) == {'2025-06-09', '2025-06-16'}
+
+
+def test_atualizar_reconstroi_semanas_com_linhas_removidas(cubo, linhas, cliente_falso):
+    restantes = [l for l in linhas if l['id'] not in (4, 5)]
+    cubo, alteradas = cubo_metricas.atualizar(cliente_falso({'relatorio_anuncios': restantes}), cubo)
+    assert {'2025-06-09', '2025-06-16'} <= set(alteradas)
+    assert cubo.semanas == ['2025-06-02', '2025-06-09']
+    assert cubo.consultar()['spend'] == pytest.approx(350.0)
+
+
+def test_atualizar_cubo_vazio_reconstroi(linhas, cliente_falso):
+    cubo, alteradas = cubo_metricas.atualizar(cliente_falso({'relatorio_anuncios': linhas}), CuboMetricas())
+    assert alteradas is None
+    assert cubo.consultar()['spend'] == pytest.approx(450.0)
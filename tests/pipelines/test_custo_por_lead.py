@@ -0,0 +1,108 @@
+import pytest
+
+from pipelines import custo_por_lead
+from pipelines.cubo_metricas import CuboMetricas
+from pipelines.custo_por_lead import CustoPorLead, _marcas_dos_leads, impressoes_gasto
+
+
+def _anuncio(id_, marca, plataforma, conta, inicio, fim, spend):
+    return {'id': id_, 'marca_id': marca, 'plataforma_id': plataforma, 'conta_de_anuncio_id': conta,
+            'data_inicio': inicio, 'data_fim': fim, 'spend': spend, 'conversao': 0, 'cliques': 0,
+            'impressoes': 0, 'criado_em': '2025-06-20T00:00:00', 'atualizado_em': None}
+
+
+def _lead(id_, formulario, criado_em, importado_em=None, marca='kia', conta='c1'):
+    return {'id': id_, 'marca_id': marca, 'conta_de_anuncio_id': conta, 'formulario_id': formulario,
+            'criado_em': criado_em, 'importado_em': importado_em}
+
+
+@pytest.fixture
+def tabelas():
+    return {
+        'relatorio_anuncios': [
+            _anuncio(1, 'kia', 'meta', 'c1', '2025-06-02', '2025-06-08', 100.0),
+            _anuncio(2, 'kia', 'google', 'c1', '2025-06-02', '2025-06-08', 50.0),
+            _anuncio(3, 'suzuki', 'meta', 'c3', '2025-06-09', '2025-06-15', 40.0),
+        ],
+        'leads': [
+            _lead('a1', 'f1', '2025-06-03T10:00:00', '2025-06-10T00:00:00'),
+            _lead('a2', 'f1', '2025-06-04T10:00:00', '2025-06-10T00:00:00'),
+            _lead('a3', 'f2', '2025-06-05T10:00:00', '2025-06-10T00:00:00'),
+        ],
+    }
+
+
+@pytest.fixture
+def calculado(tabelas, cliente_falso):
+    custo = CustoPorLead()
+    cubo, semanas = custo_por_lead.atualizar(cliente_falso(tabelas), custo, CuboMetricas())
+    assert semanas == ['2025-06-02', '2025-06-09']
+    return custo, cubo
+
+
+def _linhas(custo, **filtros):
+    return [(r['semana'], r['formulario_id'], r['leads'], r['spend'], r['custo_por_lead'])
+            for r in custo.consultar(filtros)]
+
+
+def test_gasto_da_conta_dividido_pelos_formularios(calculado):
+    custo, _ = calculado
+    assert _linhas(custo) == [
+        ('2025-06-02', 'f1', 2, 100.0, 50.0),
+        ('2025-06-02', 'f2', 1, 50.0, 50.0),
+        # Spend with no leads is kept, without a cost per lead.
+        ('2025-06-09', None, 0, 40.0, None),
+    ]
+    assert _linhas(custo, formulario_id='f2') == [('2025-06-02', 'f2', 1, 50.0, 50.0)]
+    assert _linhas(custo, data_inicio='2025-06-10') == [('2025-06-09', None, 0, 40.0, None)]
+    assert _linhas(custo, data_fim='2025-06-08', marca_id='suzuki') == []
+
+
+def test_marcas_dagua_por_origem(calculado):
+    custo, _ = calculado
+    assert custo.marca_dagua == {'importado_em': ['2025-06-10T00:00:00', 'a3']}
+    assert _marcas_dos_leads([_lead('b1', 'f1', '2025-06-05T00:00:00'), _lead('b2', 'f1', '2025-06-04T00:00:00'),
+                              _lead('a9', 'f1', '2025-06-01T00:00:00', '2025-06-02T00:00:00')]) == {
+        'criado_em': ['2025-06-05T00:00:00', 'b1'], 'importado_em': ['2025-06-02T00:00:00', 'a9']}
+
+
+def test_lead_criado_no_app_entra_na_atualizacao(calculado, tabelas, cliente_falso):
+    custo, cubo = calculado
+    tabelas['leads'].append(_lead('b1', 'f2', '2025-06-06T10:00:00'))
+    _, semanas = custo_por_lead.atualizar(cliente_falso(tabelas), custo, cubo)
+    assert semanas == ['2025-06-02']
+    assert _linhas(custo, data_fim='2025-06-08') == [
+        ('2025-06-02', 'f1', 2, 75.0, 37.5),
+        ('2025-06-02', 'f2', 2, 75.0, 37.5),
+    ]
+    assert custo.marca_dagua['criado_em'] == ['2025-06-06T10:00:00', 'b1']
+
+
+def test_gasto_alterado_recalcula_a_semana(calculado, tabelas, cliente_falso):
+    custo, cubo = calculado
+    tabelas['relatorio_anuncios'][2] = dict(tabelas['relatorio_anuncios'][2], spend=60.0,
+                                            atualizado_em='2025-06-21T00:00:00')
+    _, semanas = custo_por_lead.atualizar(cliente_falso(tabelas), custo, cubo)
+    assert semanas == ['2025-06-09']
+    assert _linhas(custo, data_inicio='2025-06-09') == [('2025-06-09', None, 0, 60.0, None)]
+
+
+def test_impressoes_gasto_so_mudam_com_o_gasto_por_conta():
+    def cubo(*celulas):
+        return CuboMetricas({(marca, plataforma, 'c1', '2025-06-02'): [spend, 0, 0, 0, '2025-06-08', {}]
+                             for marca, plataforma, spend in celulas})
+
+    gasto = impressoes_gasto(cubo(('kia', 'meta', 100.0), ('kia', 'google', 50.0)))
+    assert impressoes_gasto(cubo(('kia', 'meta', 150.0))) == gasto
+    assert impressoes_gasto(cubo(('kia', 'meta', 151.0))) != gasto
+    assert impressoes_gasto(cubo(('suzuki', 'meta', 150.0))) != gasto
+
+
+def test_salvar_e_carregar(calculado, tmp_path):
+    custo, _ = calculado
+    path = tmp_path / 'cpl.json'
+    custo.salvar(path)
+    carregado = CustoPorLead.carregar(path)
+    assert list(carregado.consultar()) == list(custo.consultar())
+    assert carregado.contagens == custo.contagens
+    assert carregado.marca_dagua == custo.marca_dagua and carregado.gasto == custo.gasto
@@ -0,0 +1,67 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.datas import para_datetime64, parse_data, parse_periodo, segunda_feira, semana_de
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('2025-06-02', date(2025, 6, 2)),
+    ('2025-06-02T13:45:00+00:00', date(2025, 6, 2)),
+    ('02/06/2025', date(2025, 6, 2)),
+    ('2/6/2025', date(2025, 6, 2)),
+    (' 02/06/2025 ', date(2025, 6, 2)),
+    ('1 de junho de 2025', date(2025, 6, 1)),
+    ('15 de Março de 2025', date(2025, 3, 15)),
+    ('15 de marco de 2025', date(2025, 3, 15)),
+    ('7 de set. de 2025', date(2025, 9, 7)),
+    ('31/02/2025', None),
+    ('2025-13-01', None),
+    ('junho de 2025', None),
+    ('', None),
+    (None, None),
+])
+def test_parse_data(texto, esperado):
+    assert parse_data(texto) == esperado
+
+
+def test_parse_periodo():
+    assert parse_periodo('1 de junho de 2025 - 30 de junho de 2025') == (date(2025, 6, 1), date(2025, 6, 30))
+    assert parse_periodo('01/06/2025 - 07/06/2025') == (date(2025, 6, 1), date(2025, 6, 7))
+    assert parse_periodo('1 de junho de 2025') is None
+    assert parse_periodo('ontem - hoje') is None
+    assert parse_periodo(None) is None
+
+
+@pytest.mark.parametrize('texto, semana', [
+    ('2025-06-02', '2025-06-02'),
+    ('2025-06-08', '2025-06-02'),
+    ('04/06/2025', '2025-06-02'),
+    ('2025-06-01T23:00:00', '2025-05-26'),
+    ('sem data', None),
+])
+def test_semana_de(texto, semana):
+    assert semana_de(texto) == semana
+
+
+def test_segunda_feira():
+    assert segunda_feira(date(2025, 1, 1)) == date(2024, 12, 30)
+
+
+def test_parse_data_usa_cache():
+    parse_data.cache_clear()
+    for _ in range(3):
+        parse_data('05/06/2025')
+    info = parse_data.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_para_datetime64():
+    serie = pd.Series(['2025-06-02', '03/06/2025', None, 'lixo', '2025-06-02', float('nan')])
+    convertidas = para_datetime64(serie)
+    assert convertidas.dtype == np.dtype('datetime64[D]')
+    assert list(convertidas[:2].astype(str)) == ['2025-06-02', '2025-06-03']
+    assert np.isnat(convertidas[2:4]).all() and np.isnat(convertidas[5])
+    assert convertidas[4] == np.datetime64('2025-06-02')
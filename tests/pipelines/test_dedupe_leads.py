@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from pipelines.dedupe_leads import FiltroBloom, IndiceDedupe, impressao_digital
+
+
+def _lead(id_, email='', telefone='', whatsapp='', formulario='Feirão', marca='kia', **carimbos):
+    return {'id': id_, 'marca_id': marca, 'nome_formulario': formulario, 'email': email, 'telefone': telefone,
+            'whatsapp': whatsapp, 'importado_em': None, 'criado_em': None, **carimbos}
+
+
+def test_impressao_digital_estavel_e_de_64_bits():
+    assert impressao_digital('kia|feirao|e:ana@exemplo.com') == impressao_digital('kia|feirao|e:ana@exemplo.com')
+    assert 0 <= impressao_digital('x') < 1 << 64
+    assert impressao_digital('x') != impressao_digital('y')
+
+
+def test_filtro_bloom_sem_falsos_negativos_e_poucos_falsos_positivos():
+    gerador = random.Random(7)
+    filtro = FiltroBloom(2000)
+    presentes = [gerador.getrandbits(64) for _ in range(2000)]
+    for chave in presentes:
+        filtro.adicionar(chave)
+    assert all(chave in filtro for chave in presentes)
+    ausentes = [gerador.getrandbits(64) for _ in range(20000)]
+    falsos_positivos = sum(chave in filtro for chave in ausentes) / len(ausentes)
+    assert falsos_positivos < 0.03
+
+
+def test_chaves_do_lead():
+    base = IndiceDedupe.chaves_do_lead({'nome_formulario': ' Feirão ', 'email': 'ana@exemplo.com'}, 'kia')
+    assert base == [impressao_digital('kia|feirão|e:ana@exemplo.com')]
+    # telefone and whatsapp share a namespace; the form name is trimmed and lowercased.
+    por_whatsapp = IndiceDedupe.chaves_do_lead({'nome_formulario': 'FEIRÃO', 'whatsapp': '51999991234'}, 'kia')
+    por_telefone = IndiceDedupe.chaves_do_lead({'nome_formulario': 'feirão', 'telefone': '51999991234'}, 'kia')
+    assert por_whatsapp == por_telefone
+    assert IndiceDedupe.chaves_do_lead({'email': 'ana@exemplo.com'}, 'suzuki') != \
+        IndiceDedupe.chaves_do_lead({'email': 'ana@exemplo.com'}, 'kia')
+    assert IndiceDedupe.chaves_do_lead({'nome_formulario': 'x'}, 'kia') == []
+
+
+def test_filtrar_novos_contra_indice_e_dentro_do_arquivo():
+    indice = IndiceDedupe()
+    indice.adicionar(_lead(1, email='ana@exemplo.com'), 'kia')
+    registros = [
+        _lead(2, email='ana@exemplo.com'),
+        _lead(3, email='bia@exemplo.com', telefone='51999991234'),
+        _lead(4, whatsapp='51999991234'),
+        _lead(5, email='ana@exemplo.com', formulario='Outro'),
+    ]
+    novos, duplicados = indice.filtrar_novos(registros, 'kia')
+    assert [r['id'] for r in novos] == [3, 5]
+    assert [r['id'] for r in duplicados] == [2, 4]
+    # Nothing is added until the leads are sent.
+    assert len(indice) == 1
+
+
+def test_salvar_e_carregar(tmp_path):
+    indice = IndiceDedupe()
+    for i in range(100):
+        indice.adicionar(_lead(i, email=f'lead{i}@exemplo.com'), 'kia')
+    indice.marca_dagua = {'importado_em': ['2025-06-02T10:00:00', 99]}
+    path = tmp_path / 'dedupe.bin'
+    indice.salvar(path)
+    carregado = IndiceDedupe.carregar(path)
+    assert len(carregado) == 100
+    assert list(carregado.chaves) == sorted(carregado.chaves)
+    assert carregado.marca_dagua == indice.marca_dagua
+    novos, duplicados = carregado.filtrar_novos([_lead(0, email='lead7@exemplo.com'),
+                                                 _lead(1, email='nova@exemplo.com')], 'kia')
+    assert [r['email'] for r in novos] == ['nova@exemplo.com'] and len(duplicados) == 1
+
+
+def test_consolidar_aumenta_o_filtro_cheio():
+    indice = IndiceDedupe(capacidade=8)
+    for i in range(20):
+        indice.adicionar(_lead(i, email=f'lead{i}@exemplo.com'), 'kia')
+    indice._consolidar()
+    assert indice.bloom.capacidade >= 20
+    assert all(indice._existe(chave) for chave in indice.chaves)
+
+
+@pytest.fixture
+def leads():
+    return [
+        _lead('a1', email=' ANA@Exemplo.com', importado_em='2025-06-02T10:00:00'),
+        _lead('a2', telefone='(51) 99999-1234', importado_em='2025-06-02T10:00:00'),
+        # Created in the app: no importado_em.
+        _lead('b1', email='bia@exemplo.com', criado_em='2025-06-03T09:00:00'),
+    ]
+
+
+def test_sincronizar_le_as_duas_origens_e_normaliza(leads, cliente_falso):
+    cliente = cliente_falso({'leads': leads})
+    indice = IndiceDedupe()
+    assert indice.sincronizar(cliente) == 3
+    assert indice.marca_dagua == {'importado_em': ['2025-06-02T10:00:00', 'a2'],
+                                  'criado_em': ['2025-06-03T09:00:00', 'b1']}
+    _, duplicados = indice.filtrar_novos([_lead(1, email='ana@exemplo.com'), _lead(2, whatsapp='51999991234'),
+                                          _lead(3, email='bia@exemplo.com')], 'kia')
+    assert len(duplicados) == 3
+
+    leads.append(_lead('b2', email='caio@exemplo.com', criado_em='2025-06-04T09:00:00'))
+    assert indice.sincronizar(cliente) == 1
+    assert indice.marca_dagua['criado_em'] == ['2025-06-04T09:00:00', 'b2']
+
+
+def test_sincronizar_aceita_marca_dagua_antiga(leads, cliente_falso):
+    indice = IndiceDedupe()
+    indice.marca_dagua = '2025-06-02T10:00:00'
+    # The old watermark restarts at its own timestamp, so rows sharing it are read again.
+    assert indice.sincronizar(cliente_falso({'leads': leads})) == 3
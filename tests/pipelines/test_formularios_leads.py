@@ -0,0 +1,53 @@
+import pytest
+
+from pipelines.formularios_leads import (ContaNaoLocalizada, agrupar_por_formulario, resolver_conta,
+                                        resolver_formularios, vincular)
+from pipelines.supabase_rest import SupabaseError
+
+
+@pytest.fixture
+def cliente(cliente_falso):
+    class ClienteComInsert(cliente_falso):
+        """Creates forms in memory; names listed in ``proibidos`` fail as RLS does."""
+
+        proibidos = {'Sem Permissão'}
+
+        def insert(self, table, rows, returning=False):
+            self.chamadas.append(('insert', table))
+            if rows[0]['nome'] in self.proibidos:
+                raise SupabaseError(403, 'new row violates row-level security policy', '42501')
+            criados = [dict(row, id=f"f{len(self.tabelas[table]) + 1}") for row in rows]
+            self.tabelas[table].extend(criados)
+            return criados
+
+    return ClienteComInsert({
+        'relatorio_completo_marcas': [{'marca_id': 'kia', 'plataforma_id': 'meta', 'conta_id': 'c1'}],
+        'formularios': [{'id': 'f1', 'nome': 'Cadastro Site', 'conta_de_anuncio_id': 'c1'}],
+    })
+
+
+def test_resolver_conta(cliente):
+    assert resolver_conta(cliente, 'kia', 'meta') == 'c1'
+    with pytest.raises(ContaNaoLocalizada):
+        resolver_conta(cliente, 'kia', 'google')
+
+
+def test_agrupar_por_formulario_ignora_caixa_e_espacos():
+    grupos = agrupar_por_formulario([{'nome_formulario': 'Cadastro Site'}, {'nome_formulario': 'cadastro site '},
+                                     {'nome_formulario': 'Feirão'}])
+    assert {nome: len(leads) for nome, leads in grupos.items()} == {'Cadastro Site': 2, 'Feirão': 1}
+
+
+def test_resolver_formularios_cria_so_os_que_faltam(cliente):
+    resolvidos = resolver_formularios(cliente, 'c1', 'kia', 'meta', ['cadastro site', 'Feirão', 'Sem Permissão'])
+    assert resolvidos['cadastro site'] == {'id': 'f1', 'criado': False}
+    assert resolvidos['Feirão'] == {'id': 'f2', 'criado': True}
+    assert resolvidos['Sem Permissão']['codigo'] == '42501'
+    assert cliente.chamadas.count(('select', 'formularios')) == 1
+
+
+def test_vincular():
+    (lead,) = vincular([{'nome': 'Ana', 'email': ''}], 'f1', 'c1', 'kia')
+    assert lead['email'] is None
+    assert (lead['formulario_id'], lead['conta_de_anuncio_id'], lead['marca_id']) == ('f1', 'c1', 'kia')
+    assert lead['importado_em']
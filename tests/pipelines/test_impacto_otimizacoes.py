@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from pipelines.impacto_otimizacoes import Serie, analisar, montar_series
+
+
+def _dia(texto):
+    return date.fromisoformat(texto).toordinal()
+
+
+def _performance(dia, custo, campanha='camp1', criativo=None):
+    return {'id': dia, 'data_relatorio': dia, 'campanha_id': campanha, 'grupo_de_anuncio_id': None,
+            'criativo_id': criativo, 'custo': custo, 'impressoes': custo * 100, 'cliques': custo, 'conversoes': 1}
+
+
+@pytest.fixture
+def performance():
+    # camp1 spends 10/day from 06-01 to 06-10 and 20/day from 06-11 to 06-20.
+    linhas = [_performance(f'2025-06-{d:02d}', 10.0 if d <= 10 else 20.0) for d in range(1, 21)]
+    linhas.append(_performance('2025-06-05', 4.0, campanha=None, criativo='cr1'))
+    linhas.append(_performance('sem data', 1000.0))
+    return linhas
+
+
+@pytest.fixture
+def anuncios():
+    return [{'id': 1, 'anuncio_id': 'an1', 'conta_de_anuncio_id': 'c1', 'data_inicio': '2025-06-02',
+             'data_fim': '2025-06-08', 'spend': 70.0, 'impressoes': 700, 'cliques': 14, 'conversao': 7}]
+
+
+def test_serie_soma_por_prefixo():
+    serie = Serie({_dia('2025-06-01'): [1, 10, 1, 0], _dia('2025-06-03'): [2, 20, 1, 1],
+                   _dia('2025-06-07'): [4, 40, 2, 1]})
+    assert serie.somar(_dia('2025-06-01'), _dia('2025-06-08'))['custo'] == 7
+    assert serie.somar(_dia('2025-06-02'), _dia('2025-06-07')) == {
+        'custo': 2, 'impressoes': 20, 'cliques': 1, 'conversoes': 1}
+    assert serie.somar(_dia('2025-06-08'), _dia('2025-06-30'))['custo'] == 0
+    assert serie.somar(_dia('2025-06-03'), _dia('2025-06-03'))['custo'] == 0
+
+
+def test_montar_series(performance, anuncios):
+    series = montar_series(performance, anuncios)
+    assert set(series) == {('campanha', 'camp1'), ('criativo', 'cr1'), ('anuncio', 'an1'), ('conta', 'c1')}
+    assert series[('campanha', 'camp1')].somar(_dia('2025-06-01'), _dia('2025-06-21'))['custo'] == 300
+    # Weekly rows are spread evenly over their days.
+    anuncio = series[('anuncio', 'an1')]
+    assert len(anuncio.dias) == 7
+    assert anuncio.somar(_dia('2025-06-02'), _dia('2025-06-05'))['custo'] == pytest.approx(30)
+
+
+def test_analisar_janelas_antes_e_depois(performance, anuncios):
+    series = montar_series(performance, anuncios)
+    otimizacoes = [{'id': 'o1', 'data_alteracao': '2025-06-11T09:00:00', 'campanha_id': 'camp1',
+                    'conta_de_anuncio_id': 'c1', 'descricao': 'Aumento de lance'}]
+    (resultado,) = analisar(otimizacoes, series, 5)
+    assert (resultado['entidade'], resultado['entidade_id']) == ('campanha', 'camp1')
+    # The change day itself is in neither window.
+    assert resultado['antes']['custo'] == 50 and resultado['depois']['custo'] == 100
+    assert resultado['antes']['custo_diario'] == 10 and resultado['depois']['custo_diario'] == 20
+    assert resultado['variacao']['custo_diario'] == 100.0
+    assert resultado['variacao']['ctr'] == 0.0
+    assert resultado['janela_completa']
+
+
+def test_analisar_corta_janelas_aos_dias_com_dados(performance, anuncios):
+    series = montar_series(performance, anuncios)
+    (resultado,) = analisar([{'id': 'o1', 'data_alteracao': '2025-06-03', 'campanha_id': 'camp1'}], series, 7)
+    assert resultado['antes']['dias'] == 2 and resultado['antes']['custo_diario'] == 10
+    assert not resultado['janela_completa']
+
+
+def test_analisar_usa_a_entidade_mais_especifica_com_metricas(performance, anuncios):
+    series = montar_series(performance, anuncios)
+    otimizacoes = [
+        {'id': 'o1', 'data_alteracao': '2025-06-05', 'anuncio_id': 'an1', 'campanha_id': 'camp1'},
+        {'id': 'o2', 'data_alteracao': '2025-06-05', 'anuncio_id': 'sem_metricas', 'campanha_id': 'camp1'},
+        {'id': 'o3', 'criado_em': '2025-06-05T12:00:00', 'conta_de_anuncio_id': 'c1'},
+        {'id': 'o4', 'data_alteracao': '2025-06-05', 'campanha_id': 'desconhecida'},
+        {'id': 'o5', 'data_alteracao': None, 'campanha_id': 'camp1'},
+    ]
+    escolhidas = {r['otimizacao_id']: r['entidade'] for r in analisar(otimizacoes, series, 3)}
+    assert escolhidas == {'o1': 'anuncio', 'o2': 'campanha', 'o3': 'conta'}
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from pipelines.indice_criativos import IndiceCriativos, chave_do_ativo
+
+
+def _linha(id_, imagem=None, video=None, criativo=None, dia='2025-06-02', custo=10.0, cliques=2, **outros):
+    return {'id': id_, 'criativo_id': criativo, 'hash_imagem_criativo': imagem, 'external_video_id_criativo': video,
+            'data_relatorio': dia, 'custo': custo, 'impressoes': 100, 'cliques': cliques, 'conversoes': 1, **outros}
+
+
+@pytest.fixture
+def linhas():
+    return [
+        _linha(1, imagem='abc', criativo='cr1', nome_imagem_criativo='banner.png'),
+        _linha(2, imagem=' abc ', criativo='cr2', dia='2025-06-09'),
+        _linha(3, video=123, criativo='cr2', dia='2025-06-01', cliques=0),
+        _linha(4),
+    ]
+
+
+def test_chave_do_ativo():
+    assert chave_do_ativo({'hash_imagem_criativo': ' abc '}) == 'img:abc'
+    assert chave_do_ativo({'external_video_id_criativo': 123}) == 'vid:123'
+    assert chave_do_ativo({'hash_imagem_criativo': 'abc', 'external_video_id_criativo': 1}) == 'img:abc'
+    assert chave_do_ativo({}) is None
+
+
+def test_agregar(linhas):
+    indice = IndiceCriativos()
+    assert indice.agregar(linhas) == 1
+    imagem = indice.ativos['img:abc']
+    assert (imagem['id'], imagem['tipo'], imagem['nome'], imagem['linhas']) == (1, 'imagem', 'banner.png', 2)
+    assert (imagem['custo'], imagem['cliques']) == (20.0, 4)
+    assert (imagem['primeiro_dia'], imagem['ultimo_dia']) == ('2025-06-02', '2025-06-09')
+    assert imagem['criativo_ids'] == {'cr1', 'cr2'}
+    assert indice.ativos['vid:123']['id'] == 2
+
+
+def test_ids_estaveis_entre_execucoes(linhas, tmp_path):
+    path = tmp_path / 'criativos.json'
+    indice = IndiceCriativos()
+    indice.agregar(linhas)
+    indice.salvar(path)
+
+    # Rows come back in another order and the image is gone: the video keeps its ID,
+    # the image's ID is retired and a new asset gets a fresh one.
+    novo = IndiceCriativos.carregar(path)
+    novo.agregar([_linha(5, imagem='xyz'), linhas[2]])
+    assert {chave: ativo['id'] for chave, ativo in novo.ativos.items()} == {'img:xyz': 3, 'vid:123': 2}
+    novo.salvar(path)
+
+    salvo = json.loads(path.read_text(encoding='utf-8'))
+    assert salvo['aposentados'] == {'img:abc': 1}
+    assert salvo['por_criativo'] == {'cr2': 2}
+    voltou = IndiceCriativos.carregar(path)
+    voltou.agregar(linhas)
+    assert voltou.ativos['img:abc']['id'] == 1
+
+
+def test_salvar_calcula_indicadores(linhas, tmp_path):
+    path = tmp_path / 'criativos.json'
+    indice = IndiceCriativos()
+    indice.agregar(linhas)
+    indice.salvar(path)
+    imagem, video = json.loads(path.read_text(encoding='utf-8'))['ativos']
+    assert (imagem['ctr'], imagem['cpc'], imagem['custo_por_conversao']) == (2.0, 5.0, 10.0)
+    assert imagem['criativo_ids'] == ['cr1', 'cr2']
+    assert video['cpc'] is None
+
+
+def test_anexar_urls(linhas, cliente_falso):
+    cliente = cliente_falso({'criativos': [
+        {'id': 'cr1', 'urls_criativo': ['https://cdn/a.png', 'https://cdn/b.png']},
+        {'id': 'cr2', 'urls_criativo': ['https://cdn/b.png', 'https://cdn/c.mp4']},
+    ]})
+    indice = IndiceCriativos()
+    indice.agregar(linhas)
+    indice.anexar_urls(cliente)
+    assert indice.ativos['img:abc']['urls'] == ['https://cdn/a.png', 'https://cdn/b.png', 'https://cdn/c.mp4']
+    assert indice.ativos['vid:123']['urls'] == ['https://cdn/b.png', 'https://cdn/c.mp4']
+    assert cliente.chamadas == [('select', 'criativos')]
@@ -0,0 +1,90 @@
+import uuid
+
+import pytest
+
+from pipelines.indice_external_id import IndiceExternalId
+
+
+def _uuid(n):
+    return str(uuid.UUID(int=n))
+
+
+def _campanha(n, external_id, marca=1, conta=None, carimbo='2025-06-01T00:00:00'):
+    return {'id': _uuid(n), 'external_id': external_id, 'marca_id': _uuid(100 + marca),
+            'conta_de_anuncio_id': _uuid(200 + conta) if conta else None, 'criado_em': carimbo,
+            'atualizado_em': None}
+
+
+@pytest.fixture
+def campanhas():
+    return [
+        _campanha(1, '120210000000000003', conta=1),
+        _campanha(2, '120210000000000001', marca=2),
+        _campanha(3, 'google-abc', conta=2, carimbo='2025-06-05T00:00:00'),
+        _campanha(4, ''),
+    ]
+
+
+@pytest.fixture
+def indice(campanhas):
+    indice = IndiceExternalId()
+    indice.mesclar(campanhas)
+    return indice
+
+
+def test_mesclar_ordena_ids_numericos_e_separa_os_demais(indice):
+    assert list(indice.ids) == [120210000000000001, 120210000000000003]
+    assert set(indice.extras) == {'google-abc'}
+    assert len(indice) == 3
+    assert indice.marca_dagua == '2025-06-05T00:00:00'
+
+
+def test_resolver(indice):
+    assert indice.resolver(' 120210000000000003 ') == {
+        'id': _uuid(1), 'marca_id': _uuid(101), 'conta_de_anuncio_id': _uuid(201)}
+    assert indice.resolver(120210000000000001)['conta_de_anuncio_id'] is None
+    assert indice.resolver('google-abc')['id'] == _uuid(3)
+    assert indice.resolver('120210000000000002') is None
+    assert indice.resolver(None) is None
+
+
+def test_resolver_lote(indice):
+    assert set(indice.resolver_lote(['120210000000000001', '999', '', None, 'google-abc'])) == {
+        '120210000000000001', 'google-abc'}
+
+
+def test_mesclar_incremental_intercala_e_substitui(indice):
+    indice.mesclar([
+        _campanha(5, '120210000000000002'),
+        _campanha(6, '120210000000000003', marca=3),
+        _campanha(7, '5'),
+    ])
+    assert list(indice.ids) == [5, 120210000000000001, 120210000000000002, 120210000000000003]
+    assert indice.resolver('120210000000000003') == {'id': _uuid(6), 'marca_id': _uuid(103),
+                                                     'conta_de_anuncio_id': None}
+    assert indice.resolver('120210000000000001')['id'] == _uuid(2)
+
+
+def test_salvar_e_carregar(indice, tmp_path):
+    path = tmp_path / 'indice.bin'
+    indice.salvar(path)
+    carregado = IndiceExternalId.carregar(path)
+    assert len(carregado) == len(indice)
+    assert carregado.marca_dagua == indice.marca_dagua
+    for external_id in ('120210000000000001', '120210000000000003', 'google-abc'):
+        assert carregado.resolver(external_id) == indice.resolver(external_id)
+
+
+def test_carregar_arquivo_invalido(tmp_path):
+    path = tmp_path / 'outro.bin'
+    path.write_bytes(b'XXXXXX')
+    with pytest.raises(ValueError):
+        IndiceExternalId.carregar(path)
+
+
+def test_atualizar_le_campanhas_por_id(campanhas, cliente_falso):
+    cliente = cliente_falso({'campanhas': campanhas})
+    indice = IndiceExternalId()
+    assert indice.atualizar(cliente) == 3
+    assert cliente.chamadas == [('select_keyset', 'campanhas')]
+    assert indice.resolver('120210000000000001')['id'] == _uuid(2)
@@ -0,0 +1,108 @@
+import http.client
+import json
+import urllib.error
+
+import pandas as pd
+import pytest
+
+from pipelines import preprocessador_leads
+from pipelines.preprocessador_leads import _enviar_em_paralelo, dividir_em_lotes, para_registros, preprocessar
+from pipelines.supabase_rest import SupabaseError
+
+
+@pytest.fixture
+def planilha():
+    return pd.DataFrame({
+        'Nome': ['Ana', 'Bruno', 'Carla', 'Davi'],
+        'Email': [' ANA@Exemplo.com ', 'bruno@', '', ''],
+        'Telefone': ['(51) 99999-1234', 'p:+5551988887777', '123', ''],
+        'whatsapp': ['', '', '', ''],
+        'Formulário': ['Feirão Kia', '', '', ''],
+        'Estágio': ['', 'Qualificado', '', ''],
+    }, dtype=str)
+
+
+def test_preprocessar_normaliza_e_descarta_sem_contato(planilha):
+    leads, relatorio = preprocessar(planilha)
+    assert leads['nome'].tolist() == ['Ana', 'Bruno']
+    assert leads['email'].tolist() == ['ana@exemplo.com', '']
+    assert leads['telefone'].tolist() == ['51999991234', '51988887777']
+    # Blank forms take the first row's form, blank stages the default.
+    assert leads['nome_formulario'].tolist() == ['Feirão Kia', 'Feirão Kia']
+    assert leads['estagio'].tolist() == ['Em análise', 'Qualificado']
+    assert relatorio['total'] == 4 and relatorio['validos'] == 2
+    assert relatorio['avisos']['email_invalido'] == {'quantidade': 1, 'linhas': [3]}
+    assert relatorio['avisos']['telefone_invalido'] == {'quantidade': 1, 'linhas': [4]}
+    assert relatorio['descartados']['sem_contato_valido'] == {'quantidade': 2, 'linhas': [4, 5]}
+
+
+def test_para_registros(planilha):
+    leads, _ = preprocessar(planilha)
+    registros = para_registros(leads)
+    assert registros[0]['email'] == 'ana@exemplo.com'
+    assert set(registros[0]) == set(leads.columns)
+
+
+def test_dividir_em_lotes_respeita_linhas_e_bytes():
+    registros = [{'nome': 'x' * 90} for _ in range(10)]
+    assert [len(l) for l in dividir_em_lotes(registros, max_linhas=4)] == [4, 4, 2]
+    tamanho = len(json.dumps(registros[0])) + 1
+    assert [len(l) for l in dividir_em_lotes(registros, max_bytes=3 * tamanho + 2)] == [3, 3, 3, 1]
+
+
+def _falhar_com(*erros):
+    """An ``enviar`` that raises ``erros`` in turn, then succeeds; counts its calls."""
+    restantes = list(erros)
+
+    def enviar(lote):
+        enviar.chamadas += 1
+        if restantes:
+            raise restantes.pop(0)
+        return len(lote)
+
+    enviar.chamadas = 0
+    return enviar
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    monkeypatch.setattr(preprocessador_leads.time, 'sleep', lambda s: None)
+
+
+@pytest.mark.parametrize('erro', [
+    SupabaseError(429, 'Too Many Requests'),
+    SupabaseError(503, 'Service Unavailable'),
+    urllib.error.URLError(ConnectionRefusedError()),
+])
+def test_erro_antes_do_commit_e_repetido(erro):
+    enviar = _falhar_com(erro)
+    (resultado,) = _enviar_em_paralelo(enviar, [[{}, {}]], workers=1)
+    assert resultado['ok'] and resultado['resposta'] == 2
+    assert enviar.chamadas == 2
+
+
+@pytest.mark.parametrize('erro', [
+    SupabaseError(504, 'Gateway Timeout'),
+    SupabaseError(400, 'canceling statement due to statement timeout', code='57014'),
+    TimeoutError('timed out'),
+    http.client.IncompleteRead(b'[{"id"'),
+    json.JSONDecodeError('Expecting value', '[{"id"', 6),
+])
+def test_erro_depois_do_envio_fica_incerto_sem_repetir(erro):
+    enviar = _falhar_com(erro)
+    (resultado,) = _enviar_em_paralelo(enviar, [[{}]], workers=1)
+    assert not resultado['ok'] and resultado['incerto']
+    assert enviar.chamadas == 1
+
+
+def test_erro_definitivo_nao_e_incerto():
+    enviar = _falhar_com(SupabaseError(400, 'invalid input', code='22P02'))
+    (resultado,) = _enviar_em_paralelo(enviar, [[{}]], workers=1)
+    assert not resultado['ok'] and not resultado['incerto'] and resultado['codigo'] == '22P02'
+
+
+def test_tentativas_esgotadas():
+    enviar = _falhar_com(*[SupabaseError(429, 'Too Many Requests')] * 3)
+    (resultado,) = _enviar_em_paralelo(enviar, [[{}]], workers=1, tentativas=3)
+    assert not resultado['ok'] and not resultado['incerto']
+    assert enviar.chamadas == 3
@@ -0,0 +1,39 @@
+import hashlib
+
+from pipelines.publico_personalizado import CABECALHO, gerar_publico, hashear, normalizar_pagina
+
+
+def _sha(valor):
+    return hashlib.sha256(valor.encode('utf-8')).hexdigest()
+
+
+def test_normalizar_pagina():
+    assert normalizar_pagina([
+        (' Ana@Exemplo.COM ', '(51) 99999-1234', None),
+        (None, '123', 'p:+5551988887777'),
+        ('invalido', '', ''),
+        ('bia@exemplo.com', None, None),
+    ]) == [
+        ('ana@exemplo.com', '5551999991234'),
+        # WhatsApp replaces an invalid main phone.
+        ('', '5551988887777'),
+        ('bia@exemplo.com', ''),
+    ]
+
+
+def test_hashear():
+    texto, quantidade = hashear([('ana@exemplo.com', '', ''), (None, None, None)])
+    assert quantidade == 1
+    assert texto == f"{_sha('ana@exemplo.com')},\n"
+
+
+def test_gerar_publico_em_ordem(tmp_path, cliente_falso):
+    leads = [{'id': i, 'email': f'lead{i}@exemplo.com', 'telefone': None, 'whatsapp': None, 'marca_id': 'kia'}
+             for i in range(1, 6)]
+    leads.append({'id': 6, 'email': None, 'telefone': None, 'whatsapp': None, 'marca_id': 'kia'})
+    leads.append({'id': 7, 'email': 'outra@exemplo.com', 'telefone': None, 'whatsapp': None, 'marca_id': 'suzuki'})
+    saida = tmp_path / 'publico.csv'
+    assert gerar_publico(cliente_falso({'leads': leads}), [('marca_id', 'eq', 'kia')], saida, workers=1) == (6, 5)
+    linhas = saida.read_text(encoding='utf-8').splitlines(keepends=True)
+    assert linhas[0] == CABECALHO
+    assert [l.split(',')[0] for l in linhas[1:]] == [_sha(f'lead{i}@exemplo.com') for i in range(1, 6)]
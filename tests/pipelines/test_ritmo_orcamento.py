@@ -0,0 +1,110 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from pipelines import ritmo_orcamento
+from pipelines.ritmo_orcamento import COLUNAS_RELATORIO, cortes_por_marca, gasto_por_chave
+
+
+def _relatorio(id_, marca, plataforma, conta, modelo, inicio, fim, spend):
+    return {'id': id_, 'marca_id': marca, 'plataforma_id': plataforma, 'conta_de_anuncio_id': conta,
+            'modelo_id': modelo, 'data_inicio': inicio, 'data_fim': fim, 'spend': spend}
+
+
+@pytest.fixture
+def tabelas():
+    return {
+        'relatorio_anuncios': [
+            # Only 2025-06-01 of this week falls in June.
+            _relatorio(1, 'kia', 'p1', 'c1', 'm1', '2025-05-26', '2025-06-01', 70.0),
+            _relatorio(2, 'kia', 'p1', 'c1', 'm1', '2025-06-02', '2025-06-08', 140.0),
+            _relatorio(3, 'kia', 'p1', 'c1', None, '2025-06-02', '2025-06-08', 7.0),
+            _relatorio(4, 'kia', 'p2', 'c2', 'm2', '2025-06-09', '2025-06-15', 70.0),
+            # Suzuki's reports stop a week earlier.
+            _relatorio(5, 'suzuki', 'p1', 'c3', 'm3', '2025-06-02', '2025-06-08', 35.0),
+            _relatorio(6, 'kia', 'p1', 'c1', 'm1', '2025-07-07', '2025-07-13', 999.0),
+        ],
+        'orcamento_mensal': [
+            {'id': 'om1', 'marca_id': 'kia', 'ano': 2025, 'mes': 6, 'meta_investimento_total': 600,
+             'meta_investimento_meta': 400, 'meta_investimento_google': 200},
+            {'id': 'om2', 'marca_id': 'suzuki', 'ano': 2025, 'mes': 6, 'meta_investimento_total': 100,
+             'meta_investimento_meta': 100, 'meta_investimento_google': None},
+            {'id': 'om3', 'marca_id': 'kia', 'ano': 2025, 'mes': 5, 'meta_investimento_total': 1},
+        ],
+        'orcamento_detalhado': [
+            {'id': 'd1', 'orcamento_mensal_id': 'om1', 'conta_de_anuncio_id': 'c1', 'modelo_id': 'm1',
+             'orcamento_diario_planejado': 10, 'orcamento_total_planejado': None, 'ativo': True},
+            {'id': 'd2', 'orcamento_mensal_id': 'om1', 'conta_de_anuncio_id': 'c2', 'modelo_id': 'm2',
+             'orcamento_diario_planejado': 5, 'orcamento_total_planejado': 150, 'ativo': False},
+            {'id': 'd3', 'orcamento_mensal_id': 'om1', 'conta_de_anuncio_id': 'c1', 'modelo_id': None,
+             'orcamento_diario_planejado': 1, 'orcamento_total_planejado': None, 'ativo': True},
+        ],
+        'plataformas': [{'id': 'p1', 'nome': 'Meta Ads'}, {'id': 'p2', 'nome': 'Google Ads'}],
+    }
+
+
+@pytest.fixture
+def relatorios(tabelas):
+    return pd.DataFrame(tabelas['relatorio_anuncios'][:5], columns=COLUNAS_RELATORIO.split(','))
+
+
+def test_cortes_por_marca(relatorios):
+    assert cortes_por_marca(relatorios, date(2025, 6, 20)) == {'kia': date(2025, 6, 15), 'suzuki': date(2025, 6, 8)}
+    assert cortes_por_marca(relatorios, date(2025, 6, 10)) == {'kia': date(2025, 6, 10), 'suzuki': date(2025, 6, 8)}
+    assert cortes_por_marca(relatorios.iloc[:0], date(2025, 6, 10)) == {}
+
+
+def test_gasto_rateado_pelos_dias_dentro_do_mes_e_do_corte(relatorios):
+    gasto = gasto_por_chave(relatorios, {'p1': 'meta', 'p2': 'google'}, date(2025, 6, 1), date(2025, 6, 30),
+                            {'kia': date(2025, 6, 11)})
+    somas = {tuple(l[:4]): l[4] for l in gasto.itertuples(index=False)}
+    assert somas[('kia', 'meta', 'c1', 'm1')] == pytest.approx(10 + 140)
+    # Three of the seven days are up to Kia's cut-off.
+    assert somas[('kia', 'google', 'c2', 'm2')] == pytest.approx(30)
+    assert somas[('suzuki', 'meta', 'c3', 'm3')] == pytest.approx(35)
+    assert gasto['realizado'].sum() == pytest.approx(222)
+
+
+def test_gasto_vazio():
+    vazio = pd.DataFrame(columns=COLUNAS_RELATORIO.split(','))
+    assert gasto_por_chave(vazio, {}, date(2025, 6, 1), date(2025, 6, 30)).empty
+
+
+@pytest.fixture
+def resultado(tabelas, cliente_falso):
+    return ritmo_orcamento.gerar(cliente_falso(tabelas), 2025, 6, hoje=date(2025, 6, 20))
+
+
+def _linha(resultado, nivel, **chaves):
+    (linha,) = [l for l in resultado['linhas']
+                if l['nivel'] == nivel and all(l.get(k) == v for k, v in chaves.items())]
+    return linha
+
+
+def test_gerar_corte_por_marca(resultado):
+    assert resultado['dias_mes'] == 30
+    assert resultado['dados_ate'] == '2025-06-15'
+    assert resultado['dados_ate_por_marca'] == {'kia': '2025-06-15', 'suzuki': '2025-06-08'}
+
+
+def test_gerar_ritmo_e_projecao(resultado):
+    kia = _linha(resultado, 'marca', marca_id='kia')
+    assert (kia['dias_decorridos'], kia['planejado_ate_hoje'], kia['realizado']) == (15, 300.0, 227.0)
+    assert (kia['projecao'], kia['desvio_projetado'], kia['status']) == (454.0, -146.0, 'abaixo')
+    # Suzuki is paced over its own 8 days, not Kia's 15.
+    suzuki = _linha(resultado, 'marca', marca_id='suzuki')
+    assert (suzuki['dias_decorridos'], suzuki['planejado_ate_hoje'], suzuki['projecao']) == (8, 26.67, 131.25)
+    assert suzuki['status'] == 'acima'
+    assert _linha(resultado, 'plataforma', marca_id='kia', plataforma='google')['realizado'] == 70.0
+    assert _linha(resultado, 'plataforma', marca_id='suzuki', plataforma='google')['status'] == 'sem_dados'
+
+
+def test_gerar_linhas_por_modelo(resultado):
+    modelo = _linha(resultado, 'modelo', orcamento_detalhado_id='d1')
+    assert (modelo['orcado'], modelo['planejado_ate_hoje'], modelo['realizado']) == (300.0, 150.0, 150.0)
+    assert modelo['status'] == 'no_ritmo'
+    # Rows without a model are matched to the plan without a model, not lost as NaN.
+    assert _linha(resultado, 'modelo', orcamento_detalhado_id='d3')['realizado'] == 7.0
+    # Inactive plans are left out.
+    assert not [l for l in resultado['linhas'] if l.get('orcamento_detalhado_id') == 'd2']
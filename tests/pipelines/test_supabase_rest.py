@@ -0,0 +1,58 @@
+import pytest
+
+from pipelines.supabase_rest import SupabaseREST, formatar_filtro
+
+
+def _cliente(paginas):
+    """A client whose ``_request`` answers with ``paginas`` in turn and records the params it got."""
+    cliente = SupabaseREST(url='http://supabase.invalido', key='chave')
+    cliente.pedidos = []
+    respostas = iter(paginas)
+
+    def _request(method, path, params=None, body=None, headers=None):
+        cliente.pedidos.append((dict(params or []), headers or {}))
+        return next(respostas)
+
+    cliente._request = _request
+    return cliente
+
+
+def test_formatar_filtro():
+    assert formatar_filtro('in', [1, 2]) == 'in.(1,2)'
+    assert formatar_filtro('is', None) == 'is.null'
+    assert formatar_filtro('gte', '2025-06-02') == 'gte.2025-06-02'
+    assert formatar_filtro(None, '(a.eq.1,b.eq.2)') == '(a.eq.1,b.eq.2)'
+
+
+def test_select_sem_order_le_uma_pagina_cheia():
+    cliente = _cliente([[{'id': 1}, {'id': 2}]])
+    assert next(iter(cliente.select('t', 'id', page_size=2))) == {'id': 1}
+
+
+def test_select_sem_order_recusa_a_segunda_pagina():
+    cliente = _cliente([[{'id': 1}, {'id': 2}], [{'id': 3}]])
+    with pytest.raises(ValueError):
+        list(cliente.select('t', 'id', page_size=2))
+
+
+def test_select_com_order_pagina_por_range():
+    cliente = _cliente([[{'id': 1}, {'id': 2}], [{'id': 3}]])
+    assert [l['id'] for l in cliente.select('t', 'id', order='id', page_size=2)] == [1, 2, 3]
+    assert [h['Range'] for _, h in cliente.pedidos] == ['0-1', '2-3']
+
+
+def test_select_keyset_continua_apos_a_ultima_chave():
+    cliente = _cliente([[{'id': 1}, {'id': 2}], [{'id': 3}]])
+    assert [l['id'] for l in cliente.select_keyset('t', 'id', [('marca_id', 'eq', 'm')], page_size=2)] == [1, 2, 3]
+    primeira, segunda = (params for params, _ in cliente.pedidos)
+    assert primeira['order'] == 'id' and 'id' not in primeira
+    assert segunda['id'] == 'gt.2' and segunda['marca_id'] == 'eq.m'
+
+
+def test_select_desde_desempata_pelo_id():
+    cliente = _cliente([[{'id': 5, 'criado_em': 't1'}, {'id': 7, 'criado_em': 't1'}], []])
+    assert len(list(cliente.select_desde('leads', 'id,criado_em', apos=('t0', 3), page_size=2))) == 2
+    primeira, segunda = (params for params, _ in cliente.pedidos)
+    assert primeira['or'] == '(criado_em.gt."t0",and(criado_em.eq."t0",id.gt.3))'
+    assert segunda['or'] == '(criado_em.gt."t1",and(criado_em.eq."t1",id.gt.7))'
+    assert segunda['order'] == 'criado_em,id'
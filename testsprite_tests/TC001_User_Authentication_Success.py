@@ -1,182 +1,139 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from suporte.esperas import abrir, clicar, preencher
+from suporte.execucao import executar_isolado
+
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Input valid username/email and password
+    frame = context.pages[-1]
+    # Input valid email
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, 'validuser@example.com')
+    
+
+    frame = context.pages[-1]
+    # Input valid password
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, 'validpassword123')
+    
+
+    frame = context.pages[-1]
+    # Click the login button to submit credentials
+    elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Verify if the credentials are correct or try another valid credential set if available
+    frame = context.pages[-1]
+    # Clear the email input field
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, '')
+    
+
+    frame = context.pages[-1]
+    # Clear the password input field
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, '')
+    
+
+    # -> Try alternative valid credentials or verify the correct credentials for login
+    frame = context.pages[-1]
+    # Input alternative valid email
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, 'testuser@example.com')
+    
+
+    frame = context.pages[-1]
+    # Input alternative valid password
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, 'testpassword123')
+    
+
+    frame = context.pages[-1]
+    # Click the login button to submit alternative credentials
+    elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click on 'Criar conta' link to create a new account for testing login
+    frame = context.pages[-1]
+    # Click on 'Criar conta' link to navigate to account creation page
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[3]/a').nth(0)
+    await clicar(elem)
+    
+
+    # -> Input new valid email, password, confirm password and submit to create a new account
+    frame = context.pages[-1]
+    # Input new valid email for account creation
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, 'newuser@example.com')
+    
+
+    frame = context.pages[-1]
+    # Input new valid password for account creation
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, 'newpassword123')
+    
+
+    frame = context.pages[-1]
+    # Input password confirmation for account creation
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[3]/div/input').nth(0)
+    await preencher(elem, 'newpassword123')
+    
+
+    frame = context.pages[-1]
+    # Click 'Criar Conta' button to submit new account creation form
+    elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click on 'Fazer login' link to return to login page
+    frame = context.pages[-1]
+    # Click on 'Fazer login' link to go back to login page
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[3]/a[2]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click on 'Voltar para Login' link to return to login page
+    frame = context.pages[-1]
+    # Click on 'Voltar para Login' link to return to login page
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/a').nth(0)
+    await clicar(elem)
+    
+
+    # -> Input existing valid email and password and click login button
+    frame = context.pages[-1]
+    # Input existing valid email
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, 'newuser@example.com')
+    
+
+    frame = context.pages[-1]
+    # Input existing valid password
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, 'newpassword123')
     
+
+    frame = context.pages[-1]
+    # Click the login button to attempt login with existing user credentials
+    elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
+    await clicar(elem)
+    
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input valid username/email and password
-        frame = context.pages[-1]
-        # Input valid email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input valid password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword123')
-        
-
-        frame = context.pages[-1]
-        # Click the login button to submit credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Verify if the credentials are correct or try another valid credential set if available
-        frame = context.pages[-1]
-        # Clear the email input field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        frame = context.pages[-1]
-        # Clear the password input field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        # -> Try alternative valid credentials or verify the correct credentials for login
-        frame = context.pages[-1]
-        # Input alternative valid email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input alternative valid password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testpassword123')
-        
-
-        frame = context.pages[-1]
-        # Click the login button to submit alternative credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Criar conta' link to create a new account for testing login
-        frame = context.pages[-1]
-        # Click on 'Criar conta' link to navigate to account creation page
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input new valid email, password, confirm password and submit to create a new account
-        frame = context.pages[-1]
-        # Input new valid email for account creation
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('newuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input new valid password for account creation
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('newpassword123')
-        
-
-        frame = context.pages[-1]
-        # Input password confirmation for account creation
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('newpassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Criar Conta' button to submit new account creation form
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Fazer login' link to return to login page
-        frame = context.pages[-1]
-        # Click on 'Fazer login' link to go back to login page
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[3]/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Voltar para Login' link to return to login page
-        frame = context.pages[-1]
-        # Click on 'Voltar para Login' link to return to login page
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input existing valid email and password and click login button
-        frame = context.pages[-1]
-        # Input existing valid email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('newuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input existing valid password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('newpassword123')
-        
-
-        frame = context.pages[-1]
-        # Click the login button to attempt login with existing user credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Login Successful! Welcome to your dashboard').first).to_be_visible(timeout=30000)
-        except AssertionError:
-            raise AssertionError("Test case failed: The user was not successfully logged in, redirected to the dashboard, or session was not persisted as expected.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+        await expect(frame.locator('text=Login Successful! Welcome to your dashboard').first).to_be_visible(timeout=30000)
+    except AssertionError:
+        raise AssertionError("Test case failed: The user was not successfully logged in, redirected to the dashboard, or session was not persisted as expected.")
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test)
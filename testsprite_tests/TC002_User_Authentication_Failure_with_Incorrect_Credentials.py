@@ -1,82 +1,39 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input invalid username/email and password
-        frame = context.pages[-1]
-        # Input invalid email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('invalid@example.com')
-        
+from suporte.esperas import abrir, clicar, preencher
+from suporte.execucao import executar_isolado
 
-        frame = context.pages[-1]
-        # Input invalid password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wrongpassword')
-        
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Input invalid username/email and password
+    frame = context.pages[-1]
+    # Input invalid email
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, 'invalid@example.com')
+    
 
-        frame = context.pages[-1]
-        # Click the login button to attempt login with invalid credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    frame = context.pages[-1]
+    # Input invalid password
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, 'wrongpassword')
+    
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        await expect(frame.locator('text=Invalid login credentials').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
+    frame = context.pages[-1]
+    # Click the login button to attempt login with invalid credentials
+    elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    await expect(frame.locator('text=Invalid login credentials').first).to_be_visible(timeout=30000)
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test)
@@ -1,104 +1,35 @@
-import asyncio
-from playwright import async_api
-from playwright.async_api import expect
-
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input ADM user credentials and click login button
-        frame = context.pages[-1]
-        # Input ADM user email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('adm@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input ADM user password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('adm_password')
-        
+import re
 
-        frame = context.pages[-1]
-        # Click Entrar button to login as ADM user
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+from playwright.async_api import expect
 
-        # -> Request valid ADM user credentials or try alternative approach to login as ADM user.
-        frame = context.pages[-1]
-        # Retry input ADM user email with alternative email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin@example.com')
-        
+from suporte.esperas import abrir
+from suporte.execucao import executar_isolado
 
-        frame = context.pages[-1]
-        # Retry input ADM user password with alternative password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin_password')
-        
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'marketing'
+# Routes a Marketing profile may not open (ROUTE_PERMISSIONS in src/utils/permissions.js)
+ROTAS_NEGADAS = ('/dashboard', '/campanhas', '/uploads', '/relatorios')
 
-        frame = context.pages[-1]
-        # Click Entrar button to retry login as ADM user
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # --> Assertions to verify final state
+    # MainLayout sends a profile without access back to its initial route, /onboard for Marketing
+    for rota in ROTAS_NEGADAS:
+        await abrir(page, f"http://localhost:5173{rota}")
         try:
-            await expect(frame.locator('text=Access Denied: Marketing user cannot access Configurations').first).to_be_visible(timeout=30000)
+            await expect(page).to_have_url(re.compile(r'/onboard$'), timeout=10000)
         except AssertionError:
-            raise AssertionError('Test case failed: Marketing user was able to access restricted routes such as Configurations and RBAC settings, violating RBAC permissions.')
-        await asyncio.sleep(5)
+            raise AssertionError(f'Test case failed: Marketing user was able to open {rota}, violating RBAC permissions.')
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+    # Restricted pages are not offered in the sidebar either, while the shared ones are
+    menu = page.locator('.nav-menu')
+    for titulo in ('Dashboard', 'Relatórios', 'Campanhas', 'Uploads'):
+        await expect(menu.locator('.nav-text', has_text=titulo)).to_have_count(0)
+    await expect(menu.locator('.nav-text', has_text='Configurações')).to_be_visible()
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
@@ -1,168 +1,110 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from suporte.esperas import abrir, clicar, preencher
+from suporte.execucao import executar_isolado
+
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'usuario'
+
+
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
     
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click login button to authenticate user and navigate to campaigns page
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click login button to submit credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Navigate to Campaigns section to start new campaign creation wizard
-        frame = context.pages[-1]
-        # Click on 'Anúncios' (Campaigns) menu to navigate to campaigns section
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click '+ Novo Anúncio' button to start new campaign creation wizard
-        frame = context.pages[-1]
-        # Click '+ Novo Anúncio' button to start new campaign creation wizard
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click '+ Novo Anúncio' button to start new campaign creation wizard
-        frame = context.pages[-1]
-        # Click '+ Novo Anúncio' button to start new campaign creation wizard
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Fill in basic campaign info: campaign name, platform, status, brand, model, budget, observations, media link, and creative copy fields
-        frame = context.pages[-1]
-        # Input campaign name
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Promoção de Verão')
-        
-
-        frame = context.pages[-1]
-        # Input monthly budget
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1500')
-        
-
-        # -> Verify data persistence by navigating back and forth between steps, then proceed to fill remaining steps: ad groups, creative assets, and review
-        frame = context.pages[-1]
-        # Click 'Cancelar' to exit current form and test data persistence by reopening the form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[8]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click '+ Novo Anúncio' button to restart campaign creation wizard and verify if previous data persists
-        frame = context.pages[-1]
-        # Click '+ Novo Anúncio' button to restart campaign creation wizard and verify data persistence
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click '+ Novo Anúncio' button to restart campaign creation wizard and try alternative approach for budget input
-        frame = context.pages[-1]
-        # Click '+ Novo Anúncio' button to start new campaign creation wizard
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Fill in campaign name, platform, status, brand, model, observations, media link, creative titles and texts. For budget, try clicking the add button (index 9) to input budget alternatively.
-        frame = context.pages[-1]
-        # Input campaign name
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Promoção de Verão')
-        
-
-        # -> Click 'Adicionar novo' button (index 9) next to budget field to open budget input dialog or alternative input method
-        frame = context.pages[-1]
-        # Click 'Adicionar novo' button next to budget field to input budget alternatively
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[6]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Navigate back to Anúncios (Campaigns) section to resume campaign creation wizard and continue testing budget input and subsequent steps
-        frame = context.pages[-1]
-        # Click 'Anúncios' menu to return to Campaigns section and resume campaign creation wizard
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click '+ Novo Anúncio' button to restart campaign creation wizard and continue testing budget input and subsequent steps
-        frame = context.pages[-1]
-        # Click '+ Novo Anúncio' button to start new campaign creation wizard
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Campaign Creation Wizard Completed Successfully').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError("Test case failed: The multi-step campaign creation wizard did not complete successfully. Data may not have been saved correctly at each step, or the campaign was not created as expected.")
-        await asyncio.sleep(5)
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Navigate to Campaigns section to start new campaign creation wizard
+    frame = context.pages[-1]
+    # Click on 'Anúncios' (Campaigns) menu to navigate to campaigns section
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click '+ Novo Anúncio' button to start new campaign creation wizard
+    frame = context.pages[-1]
+    # Click '+ Novo Anúncio' button to start new campaign creation wizard
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click '+ Novo Anúncio' button to start new campaign creation wizard
+    frame = context.pages[-1]
+    # Click '+ Novo Anúncio' button to start new campaign creation wizard
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Fill in basic campaign info: campaign name, platform, status, brand, model, budget, observations, media link, and creative copy fields
+    frame = context.pages[-1]
+    # Input campaign name
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div/input').nth(0)
+    await preencher(elem, 'Promoção de Verão')
+    
+
+    frame = context.pages[-1]
+    # Input monthly budget
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div/div/div/input').nth(0)
+    await preencher(elem, '1500')
+    
+
+    # -> Verify data persistence by navigating back and forth between steps, then proceed to fill remaining steps: ad groups, creative assets, and review
+    frame = context.pages[-1]
+    # Click 'Cancelar' to exit current form and test data persistence by reopening the form
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[8]/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # -> Click '+ Novo Anúncio' button to restart campaign creation wizard and verify if previous data persists
+    frame = context.pages[-1]
+    # Click '+ Novo Anúncio' button to restart campaign creation wizard and verify data persistence
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click '+ Novo Anúncio' button to restart campaign creation wizard and try alternative approach for budget input
+    frame = context.pages[-1]
+    # Click '+ Novo Anúncio' button to start new campaign creation wizard
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Fill in campaign name, platform, status, brand, model, observations, media link, creative titles and texts. For budget, try clicking the add button (index 9) to input budget alternatively.
+    frame = context.pages[-1]
+    # Input campaign name
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div/input').nth(0)
+    await preencher(elem, 'Promoção de Verão')
+    
+
+    # -> Click 'Adicionar novo' button (index 9) next to budget field to open budget input dialog or alternative input method
+    frame = context.pages[-1]
+    # Click 'Adicionar novo' button next to budget field to input budget alternatively
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[6]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Navigate back to Anúncios (Campaigns) section to resume campaign creation wizard and continue testing budget input and subsequent steps
+    frame = context.pages[-1]
+    # Click 'Anúncios' menu to return to Campaigns section and resume campaign creation wizard
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click '+ Novo Anúncio' button to restart campaign creation wizard and continue testing budget input and subsequent steps
+    frame = context.pages[-1]
+    # Click '+ Novo Anúncio' button to start new campaign creation wizard
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Campaign Creation Wizard Completed Successfully').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError("Test case failed: The multi-step campaign creation wizard did not complete successfully. Data may not have been saved correctly at each step, or the campaign was not created as expected.")
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
@@ -1,104 +1,61 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Start campaign creation wizard by logging in or navigating to the wizard start page.
-        frame = context.pages[-1]
-        # Clear email field to simulate missing required data
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
+from suporte.esperas import abrir, clicar, preencher
+from suporte.execucao import executar_isolado
 
-        frame = context.pages[-1]
-        # Input a valid password to test progression with missing email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword')
-        
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Start campaign creation wizard by logging in or navigating to the wizard start page.
+    frame = context.pages[-1]
+    # Clear email field to simulate missing required data
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, '')
+    
 
-        frame = context.pages[-1]
-        # Click Entrar button to attempt login with missing email
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    frame = context.pages[-1]
+    # Input a valid password to test progression with missing email
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, 'validpassword')
+    
 
-        # -> Fill in valid email and password to log in and start the campaign creation wizard.
-        frame = context.pages[-1]
-        # Input valid email to proceed with login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@example.com')
-        
+    frame = context.pages[-1]
+    # Click Entrar button to attempt login with missing email
+    elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
+    await clicar(elem)
+    
 
-        frame = context.pages[-1]
-        # Ensure password is valid for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword')
-        
+    # -> Fill in valid email and password to log in and start the campaign creation wizard.
+    frame = context.pages[-1]
+    # Input valid email to proceed with login
+    elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
+    await preencher(elem, 'test@example.com')
+    
 
-        frame = context.pages[-1]
-        # Click Entrar button to log in with valid credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    frame = context.pages[-1]
+    # Ensure password is valid for login
+    elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
+    await preencher(elem, 'validpassword')
+    
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Campaign Created Successfully').first).to_be_visible(timeout=5000)
-        except AssertionError:
-            raise AssertionError('Test failed: The wizard allowed progression or submission despite missing or invalid required data, violating the validation rules in the test plan.')
-        await asyncio.sleep(5)
+    frame = context.pages[-1]
+    # Click Entrar button to log in with valid credentials
+    elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Campaign Created Successfully').first).to_be_visible(timeout=5000)
+    except AssertionError:
+        raise AssertionError('Test failed: The wizard allowed progression or submission despite missing or invalid required data, violating the validation rules in the test plan.')
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test)
@@ -1,158 +1,100 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from suporte.esperas import abrir, clicar, rolar
+from suporte.execucao import executar_isolado
+
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'usuario'
+
+
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
     
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input valid email and password, then click Entrar to log in
-        frame = context.pages[-1]
-        # Input valid email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input valid password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click Entrar button to log in
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on the 'Leads' menu item to navigate to Leads management
-        frame = context.pages[-1]
-        # Click on the 'Leads' menu item to navigate to Leads management
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[5]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Importação em Massa' button to start CSV import
-        frame = context.pages[-1]
-        # Click on 'Importação em Massa' button to open CSV import dialog
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try to interact with the file input element using a different approach or skip file input and report issue if no alternative method is available.
-        frame = context.pages[-1]
-        # Click on the file input element to open file picker dialog (if supported)
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, then attempt to upload a valid CSV file for lead import and click 'Importar'.
-        frame = context.pages[-1]
-        # Click 'Importação em Massa' button to open file upload dialog
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, upload a valid CSV file with lead data, and click 'Importar' to start the import process.
-        frame = context.pages[-1]
-        # Click the 'Importar' button to start the CSV import
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click the 'Importação em Massa' button to open the import modal.
-        frame = context.pages[-1]
-        # Click the 'Importação em Massa' button to open the CSV import modal.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, upload a valid CSV file with lead data, and click 'Importar' to start the import process.
-        frame = context.pages[-1]
-        # Click the 'Conta de Anúncio' dropdown to open options
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[6]/div/div[2]/div/div/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Scroll down to bring the 'Aplicar' button into view and retry clicking it, or try clicking the 'Importação em Massa' button to open the import modal.
-        await page.mouse.wheel(0, 300)
-        
-
-        frame = context.pages[-1]
-        # Click the 'Aplicar' button to apply filters or proceed
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div[7]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click the 'Importação em Massa' button to open the CSV import modal.
-        frame = context.pages[-1]
-        # Click the 'Importação em Massa' button to open the CSV import modal.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, upload a valid CSV file with lead data, and click 'Importar' to start the import process.
-        frame = context.pages[-1]
-        # Click the 'Conta de Anúncio' dropdown to open options
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[6]/div/div[2]/div/div/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Importação concluída com sucesso').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError("Test case failed: The leads CSV import did not complete successfully as expected. The success notification 'Importação concluída com sucesso' was not found, indicating the import process failed or was not completed.")
-        await asyncio.sleep(5)
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Click on the 'Leads' menu item to navigate to Leads management
+    frame = context.pages[-1]
+    # Click on the 'Leads' menu item to navigate to Leads management
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[5]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click on 'Importação em Massa' button to start CSV import
+    frame = context.pages[-1]
+    # Click on 'Importação em Massa' button to open CSV import dialog
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Try to interact with the file input element using a different approach or skip file input and report issue if no alternative method is available.
+    frame = context.pages[-1]
+    # Click on the file input element to open file picker dialog (if supported)
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, then attempt to upload a valid CSV file for lead import and click 'Importar'.
+    frame = context.pages[-1]
+    # Click 'Importação em Massa' button to open file upload dialog
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, upload a valid CSV file with lead data, and click 'Importar' to start the import process.
+    frame = context.pages[-1]
+    # Click the 'Importar' button to start the CSV import
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div/div[3]/button[2]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click the 'Importação em Massa' button to open the import modal.
+    frame = context.pages[-1]
+    # Click the 'Importação em Massa' button to open the CSV import modal.
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, upload a valid CSV file with lead data, and click 'Importar' to start the import process.
+    frame = context.pages[-1]
+    # Click the 'Conta de Anúncio' dropdown to open options
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[6]/div/div[2]/div/div/div').nth(0)
+    await clicar(elem)
+    
+
+    # -> Scroll down to bring the 'Aplicar' button into view and retry clicking it, or try clicking the 'Importação em Massa' button to open the import modal.
+    await rolar(page, 300)
+    
+
+    frame = context.pages[-1]
+    # Click the 'Aplicar' button to apply filters or proceed
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div[7]/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click the 'Importação em Massa' button to open the CSV import modal.
+    frame = context.pages[-1]
+    # Click the 'Importação em Massa' button to open the CSV import modal.
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Select 'Kia - Google - Kia Sun Motors' from the 'Conta de Anúncio' dropdown, upload a valid CSV file with lead data, and click 'Importar' to start the import process.
+    frame = context.pages[-1]
+    # Click the 'Conta de Anúncio' dropdown to open options
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[6]/div/div[2]/div/div/div').nth(0)
+    await clicar(elem)
+    
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Importação concluída com sucesso').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError("Test case failed: The leads CSV import did not complete successfully as expected. The success notification 'Importação concluída com sucesso' was not found, indicating the import process failed or was not completed.")
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
@@ -1,182 +1,124 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click Entrar to log in
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click Entrar button to log in
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Otimizações' in the left menu to navigate to the Optimization section
-        frame = context.pages[-1]
-        # Click on 'Otimizações' to go to Optimization section
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Nova Otimização' button to start creating a new optimization entry
-        frame = context.pages[-1]
-        # Click 'Nova Otimização' button to create new optimization entry
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try scrolling down slightly to ensure the button is fully in view and then attempt to click the 'Nova Otimização' button again.
-        await page.mouse.wheel(0, 100)
-        
-
-        frame = context.pages[-1]
-        # Attempt to click 'Nova Otimização' button again after scrolling
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try to manually input or select a different dropdown option for Status or try to interact with the dropdown differently to proceed with form filling.
-        frame = context.pages[-1]
-        # Click on Status dropdown to open options
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        # Attempt to select 'Solicitada' option from Status dropdown by clicking again
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        # Input 'testuser@example.com' as Responsável
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div[4]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Click 'Nova Otimização' to cancel and retry if needed
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Fill in the form fields: select 'Solicitada' for Status, 'Mídias' for Tipo de Alteração, input 'testuser@example.com' for Responsável, select 'Kia' for Marca, enter a description, then save the entry.
-        frame = context.pages[-1]
-        # Input 'testuser@example.com' as Responsável
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section/form/div/div/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        # -> Click on an existing optimization entry to update its status and assign a responsible user.
-        frame = context.pages[-1]
-        # Click on the first optimization entry to open details for status update
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Editar' button to open the edit form for the selected optimization entry to update status and assign responsible user.
-        frame = context.pages[-1]
-        # Click 'Editar' to open the edit form for the selected optimization entry
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try to update the 'Responsável' field by selecting an option from a dropdown or other supported interaction instead of text input.
-        frame = context.pages[-1]
-        # Click on 'Responsável' field to check if it is a dropdown or selectable list
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on the first optimization entry to open its details for status update and responsible user assignment.
-        frame = context.pages[-1]
-        # Click on the first optimization entry to open details
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Editar' button to open the edit form for the selected optimization entry to update status and assign responsible user.
-        frame = context.pages[-1]
-        # Click 'Editar' to open the edit form for the selected optimization entry
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Atualizar' button to save the status update and responsible user assignment, then verify the changes are saved and visible.
-        frame = context.pages[-1]
-        # Click 'Atualizar' to save the changes in the optimization entry edit form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div[6]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        await expect(frame.locator('text=testuser@example.com').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Solicitada').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Troca de criativo: Kia Niro').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+from suporte.esperas import abrir, clicar, preencher, rolar
+from suporte.execucao import executar_isolado
+
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'usuario'
+
+
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Click on 'Otimizações' in the left menu to navigate to the Optimization section
+    frame = context.pages[-1]
+    # Click on 'Otimizações' to go to Optimization section
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[4]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click 'Nova Otimização' button to start creating a new optimization entry
+    frame = context.pages[-1]
+    # Click 'Nova Otimização' button to create new optimization entry
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Try scrolling down slightly to ensure the button is fully in view and then attempt to click the 'Nova Otimização' button again.
+    await rolar(page, 100)
+    
+
+    frame = context.pages[-1]
+    # Attempt to click 'Nova Otimização' button again after scrolling
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Try to manually input or select a different dropdown option for Status or try to interact with the dropdown differently to proceed with form filling.
+    frame = context.pages[-1]
+    # Click on Status dropdown to open options
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div/select').nth(0)
+    await clicar(elem)
+    
+
+    frame = context.pages[-1]
+    # Attempt to select 'Solicitada' option from Status dropdown by clicking again
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div/select').nth(0)
+    await clicar(elem)
+    
+
+    frame = context.pages[-1]
+    # Input 'testuser@example.com' as Responsável
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div[4]/input').nth(0)
+    await preencher(elem, 'testuser@example.com')
+    
+
+    frame = context.pages[-1]
+    # Click 'Nova Otimização' to cancel and retry if needed
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Fill in the form fields: select 'Solicitada' for Status, 'Mídias' for Tipo de Alteração, input 'testuser@example.com' for Responsável, select 'Kia' for Marca, enter a description, then save the entry.
+    frame = context.pages[-1]
+    # Input 'testuser@example.com' as Responsável
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section/form/div/div/div/div[3]/input').nth(0)
+    await preencher(elem, 'testuser@example.com')
+    
+
+    # -> Click on an existing optimization entry to update its status and assign a responsible user.
+    frame = context.pages[-1]
+    # Click on the first optimization entry to open details for status update
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click 'Editar' button to open the edit form for the selected optimization entry to update status and assign responsible user.
+    frame = context.pages[-1]
+    # Click 'Editar' to open the edit form for the selected optimization entry
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/div/button[2]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Try to update the 'Responsável' field by selecting an option from a dropdown or other supported interaction instead of text input.
+    frame = context.pages[-1]
+    # Click on 'Responsável' field to check if it is a dropdown or selectable list
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div/select').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click on the first optimization entry to open its details for status update and responsible user assignment.
+    frame = context.pages[-1]
+    # Click on the first optimization entry to open details
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click 'Editar' button to open the edit form for the selected optimization entry to update status and assign responsible user.
+    frame = context.pages[-1]
+    # Click 'Editar' to open the edit form for the selected optimization entry
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section[2]/div[2]/div/div/div/div/button[2]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Click 'Atualizar' button to save the status update and responsible user assignment, then verify the changes are saved and visible.
+    frame = context.pages[-1]
+    # Click 'Atualizar' to save the changes in the optimization entry edit form
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/section/div[2]/div[6]/input').nth(0)
+    await clicar(elem)
+    
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    await expect(frame.locator('text=testuser@example.com').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Solicitada').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Troca de criativo: Kia Niro').first).to_be_visible(timeout=30000)
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
@@ -1,129 +1,71 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click login button to proceed to Reports page.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
+from suporte.esperas import abrir, clicar, rolar
+from suporte.execucao import executar_isolado
 
-        frame = context.pages[-1]
-        # Click the login button to submit credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'usuario'
 
-        # -> Apply filter by brand using the 'Marca' dropdown.
-        frame = context.pages[-1]
-        # Click on 'Marca' dropdown to select a brand filter
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div[2]/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Check and verify the platform filter dropdown updates based on the selected brand 'Kia'.
-        frame = context.pages[-1]
-        # Click on 'Período' dropdown to check if platform filter is visible or scroll to find platform filter dropdown
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Apply filter by brand using the 'Marca' dropdown.
+    frame = context.pages[-1]
+    # Click on 'Marca' dropdown to select a brand filter
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div[2]/select').nth(0)
+    await clicar(elem)
+    
 
-        await page.mouse.wheel(0, 300)
-        
+    # -> Check and verify the platform filter dropdown updates based on the selected brand 'Kia'.
+    frame = context.pages[-1]
+    # Click on 'Período' dropdown to check if platform filter is visible or scroll to find platform filter dropdown
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/select').nth(0)
+    await clicar(elem)
+    
 
-        # -> Locate or reveal the platform filter dropdown or section on the Reports page to verify cascading filter behavior.
-        await page.mouse.wheel(0, 400)
-        
+    await rolar(page, 300)
+    
 
-        # -> Check for account filter presence or any other filters that cascade from brand or platform selection.
-        await page.mouse.wheel(0, 300)
-        
+    # -> Locate or reveal the platform filter dropdown or section on the Reports page to verify cascading filter behavior.
+    await rolar(page, 400)
+    
 
-        # -> Verify that metrics and trend charts refresh with aggregated data after applying the brand filter.
-        frame = context.pages[-1]
-        # Click 'Ver Relatório' button to view detailed performance chart and verify data aggregation and refresh.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[4]/div[3]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # -> Check for account filter presence or any other filters that cascade from brand or platform selection.
+    await rolar(page, 300)
+    
 
-        # -> Click the 'Atualizar' button to confirm that metrics and charts refresh with aggregated data after applying the brand filter.
-        frame = context.pages[-1]
-        # Click 'Atualizar' button to refresh data and verify metrics and charts update accordingly.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # -> Verify that metrics and trend charts refresh with aggregated data after applying the brand filter.
+    frame = context.pages[-1]
+    # Click 'Ver Relatório' button to view detailed performance chart and verify data aggregation and refresh.
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[4]/div[3]/div/button').nth(0)
+    await clicar(elem)
+    
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        await expect(frame.locator('text=Kia').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Suzuki').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Haojue').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Zontes').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Google Ads').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Campanhas Bongo').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=R$ 1.250,50').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=15 conversões').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Ver Relatório').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
+    # -> Click the 'Atualizar' button to confirm that metrics and charts refresh with aggregated data after applying the brand filter.
+    frame = context.pages[-1]
+    # Click 'Atualizar' button to refresh data and verify metrics and charts update accordingly.
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    await expect(frame.locator('text=Kia').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Suzuki').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Haojue').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Zontes').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Google Ads').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Campanhas Bongo').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=R$ 1.250,50').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=15 conversões').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Ver Relatório').first).to_be_visible(timeout=30000)
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
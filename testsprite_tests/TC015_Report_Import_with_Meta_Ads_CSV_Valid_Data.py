@@ -1,116 +1,58 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click Entrar to log in
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
+from suporte.esperas import abrir, clicar, rolar
+from suporte.execucao import executar_isolado
 
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'usuario'
 
-        frame = context.pages[-1]
-        # Click Entrar button to log in
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Navigate to 'Anúncios' section to find import option for Meta Ads CSV file
-        frame = context.pages[-1]
-        # Click on 'Anúncios' menu to access ads section for CSV import
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Novo Anúncio' button to start import process
-        frame = context.pages[-1]
-        # Click 'Novo Anúncio' button to open ad creation/import options
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Navigate to 'Anúncios' section to find import option for Meta Ads CSV file
+    frame = context.pages[-1]
+    # Click on 'Anúncios' menu to access ads section for CSV import
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
+    await clicar(elem)
+    
 
-        # -> Click 'Novo Anúncio' button to start the import process for Meta Ads CSV file
-        frame = context.pages[-1]
-        # Click 'Novo Anúncio' button to open ad creation/import options
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # -> Click on 'Novo Anúncio' button to start import process
+    frame = context.pages[-1]
+    # Click 'Novo Anúncio' button to open ad creation/import options
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
 
-        # -> Locate and click the button or link to import a Meta Ads CSV file
-        await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
-        
+    # -> Click 'Novo Anúncio' button to start the import process for Meta Ads CSV file
+    frame = context.pages[-1]
+    # Click 'Novo Anúncio' button to open ad creation/import options
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
 
-        frame = context.pages[-1]
-        # Click 'Adicionar novo' button or similar to find import CSV option
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # -> Locate and click the button or link to import a Meta Ads CSV file
+    await rolar(page, await page.evaluate('() => window.innerHeight'))
+    
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Weekly Date Normalization Failed').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError('Test case failed: Importing Meta Ads CSV did not normalize dates weekly or parse monetary and percentage metrics correctly, or import success notification was not shown.')
-        await asyncio.sleep(5)
+    frame = context.pages[-1]
+    # Click 'Adicionar novo' button or similar to find import CSV option
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div/div/div/div/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Weekly Date Normalization Failed').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError('Test case failed: Importing Meta Ads CSV did not normalize dates weekly or parse monetary and percentage metrics correctly, or import success notification was not shown.')
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
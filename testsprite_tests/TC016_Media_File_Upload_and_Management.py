@@ -1,99 +1,41 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click Entrar to login.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
+from suporte.esperas import abrir, clicar
+from suporte.execucao import executar_isolado
 
-        frame = context.pages[-1]
-        # Click Entrar button to login
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'usuario'
 
-        # -> Click on the 'Mídias' (Media) link to navigate to the Media management module.
-        frame = context.pages[-1]
-        # Click on 'Mídias' (Media) link in the sidebar to navigate to Media management module
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[7]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Click on 'Adicionar Mídia' button to start uploading media files.
-        frame = context.pages[-1]
-        # Click 'Adicionar Mídia' button to open upload dialog
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[6]/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
+    
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Click on the 'Mídias' (Media) link to navigate to the Media management module.
+    frame = context.pages[-1]
+    # Click on 'Mídias' (Media) link in the sidebar to navigate to Media management module
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[7]').nth(0)
+    await clicar(elem)
+    
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Upload Successful! Your media is now available.').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError("Test failed: Media file uploads using the public storage client did not succeed or session persistence is required, contrary to the test plan.")
-        await asyncio.sleep(5)
+    # -> Click on 'Adicionar Mídia' button to start uploading media files.
+    frame = context.pages[-1]
+    # Click 'Adicionar Mídia' button to open upload dialog
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[6]/div/div[2]/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Upload Successful! Your media is now available.').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError("Test failed: Media file uploads using the public storage client did not succeed or session persistence is required, contrary to the test plan.")
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
@@ -1,153 +1,95 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from suporte.esperas import abrir, clicar, preencher
+from suporte.execucao import executar_isolado
+
+# Starts logged in with the saved session of this role (suporte.sessao)
+PAPEL = 'usuario'
+
+
+async def run_test(context):
+    # Open a new page in the fresh browser context given by the runner
+    page = await context.new_page()
     
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input email and password and click login button to access the application
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click Entrar button to login
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Navigate to Campaigns module to perform CRUD operations
-        frame = context.pages[-1]
-        # Click on Anúncios (Campaigns) module in the sidebar to start CRUD testing
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Perform Create operation by clicking 'Novo Anúncio' button to add a new campaign
-        frame = context.pages[-1]
-        # Click 'Novo Anúncio' button to start creating a new campaign
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Novo Anúncio' button to open the new campaign creation form
-        frame = context.pages[-1]
-        # Click 'Novo Anúncio' button to start creating a new campaign
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Fill out the new campaign form fields with valid data and submit to test Create operation and verify success toast
-        frame = context.pages[-1]
-        # Input campaign name
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Promoção de Verão')
-        
-
-        frame = context.pages[-1]
-        # Input monthly budget
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1000')
-        
-
-        frame = context.pages[-1]
-        # Input observations
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div[2]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Campanha para promoção de verão')
-        
-
-        # -> Submit the new campaign creation form and verify success toast and data integrity for Create operation
-        frame = context.pages[-1]
-        # Click the submit button to save the new campaign and trigger Create operation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[3]/div/div[2]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Verify success toast for Create operation and then perform Read operation by clicking Visualizar on the created campaign
-        frame = context.pages[-1]
-        # Click 'Visualizar' button to perform Read operation on the created campaign
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[3]/div/div[2]/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Perform Update operation by clicking the Edit button on the campaign details to modify campaign data and verify success toast
-        frame = context.pages[-1]
-        # Click 'Editar' button to start Update operation on the campaign
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/div/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Retry locating and clicking the Edit button for Update operation or find alternative way to trigger Update operation in Campaigns module
-        frame = context.pages[-1]
-        # Retry clicking the Edit button to start Update operation on the campaign
-        elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Atomicity and CRUD Success').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError("Test case failed: CRUD operations atomicity verification failed. Users did not receive expected success or failure toasts confirming operation results, indicating potential data integrity issues or missing rollback notifications on backend failures.")
-        await asyncio.sleep(5)
+    # Navigate to the app and wait for the DOM and its first Supabase requests
+    await abrir(page, "http://localhost:5173")
+    
+    # Interact with the page elements to simulate user flow
+    # -> Navigate to Campaigns module to perform CRUD operations
+    frame = context.pages[-1]
+    # Click on Anúncios (Campaigns) module in the sidebar to start CRUD testing
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a[8]').nth(0)
+    await clicar(elem)
+    
+
+    # -> Perform Create operation by clicking 'Novo Anúncio' button to add a new campaign
+    frame = context.pages[-1]
+    # Click 'Novo Anúncio' button to start creating a new campaign
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    # -> Click 'Novo Anúncio' button to open the new campaign creation form
+    frame = context.pages[-1]
+    # Click 'Novo Anúncio' button to start creating a new campaign
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Fill out the new campaign form fields with valid data and submit to test Create operation and verify success toast
+    frame = context.pages[-1]
+    # Input campaign name
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div/input').nth(0)
+    await preencher(elem, 'Promoção de Verão')
+    
+
+    frame = context.pages[-1]
+    # Input monthly budget
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div/div/div/input').nth(0)
+    await preencher(elem, '1000')
+    
+
+    frame = context.pages[-1]
+    # Input observations
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/form/div[4]/div[2]/textarea').nth(0)
+    await preencher(elem, 'Campanha para promoção de verão')
+    
+
+    # -> Submit the new campaign creation form and verify success toast and data integrity for Create operation
+    frame = context.pages[-1]
+    # Click the submit button to save the new campaign and trigger Create operation
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[3]/div/div[2]/div[2]/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Verify success toast for Create operation and then perform Read operation by clicking Visualizar on the created campaign
+    frame = context.pages[-1]
+    # Click 'Visualizar' button to perform Read operation on the created campaign
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[3]/div/div[2]/div[2]/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Perform Update operation by clicking the Edit button on the campaign details to modify campaign data and verify success toast
+    frame = context.pages[-1]
+    # Click 'Editar' button to start Update operation on the campaign
+    elem = frame.locator('xpath=html/body/div/div/main/div/div/div[5]/div[2]/div/div[2]/div/button').nth(0)
+    await clicar(elem)
+    
+
+    # -> Retry locating and clicking the Edit button for Update operation or find alternative way to trigger Update operation in Campaigns module
+    frame = context.pages[-1]
+    # Retry clicking the Edit button to start Update operation on the campaign
+    elem = frame.locator('xpath=html/body/div/div/nav/div[2]/a').nth(0)
+    await clicar(elem)
+    
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Atomicity and CRUD Success').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError("Test case failed: CRUD operations atomicity verification failed. Users did not receive expected success or failure toasts confirming operation results, indicating potential data integrity issues or missing rollback notifications on backend failures.")
+
+
+if __name__ == "__main__":
+    executar_isolado(run_test, PAPEL)
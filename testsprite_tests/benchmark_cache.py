@@ -0,0 +1,233 @@
+"""How much of each main route the PWA service worker serves: cold, warm and offline loads.
+
+    python testsprite_tests/benchmark_cache.py
+    python testsprite_tests/benchmark_cache.py /dashboard /leads
+    python testsprite_tests/benchmark_cache.py --papel admin --com-janela
+
+Every route gets a new context, logged in through ``suporte.sessao``, and
+three loads of it in new pages:
+
+* ``fria``: nothing installed yet; the Workbox worker (``registerSW.js``)
+  registers, precaches and claims the page;
+* ``quente``: the same route again, now under the worker's control;
+* ``offline``: the context offline (``context.set_offline``), what the
+  caches alone can still show.
+
+Each finished or failed request is recorded with its origin:
+
+* ``service_worker``: answered to the page by the worker (precache, runtime
+  cache, or a fetch the worker made for it);
+* ``rede_do_sw``: a fetch the worker itself sent to the network;
+* ``rede``: went to the network without the worker;
+* ``falhou``: never got a response.
+
+with its bytes (response body, or ``Content-Length`` when the body size is
+not reported) and time to the end of the response. The app must be running
+at ``TESTSPRITE_URL`` with the worker enabled: ``npm run dev`` registers the
+development worker of ``dev-dist/``, which only precaches ``index.html``;
+``npm run build && npm run preview`` serves the real precache manifest.
+Results go to ``tmp/benchmark_cache.json``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from playwright.async_api import async_playwright
+
+from suporte.esperas import acompanhar
+from suporte.execucao import PASTA_TESTES, lancar_navegador, novo_contexto
+from suporte.sessao import PAPEIS, URL_APP, Sessoes
+
+ARQUIVO_BENCHMARK = os.path.join(PASTA_TESTES, 'tmp', 'benchmark_cache.json')
+# '/' is the only navigation the development worker answers from the precache.
+ROTAS = ('/', '/dashboard', '/relatorios', '/campanhas', '/leads', '/uploads')
+FASES = ('fria', 'quente', 'offline')
+ORIGENS = ('service_worker', 'rede_do_sw', 'rede', 'falhou')
+TIMEOUT_MS = 30000
+TIMEOUT_SW_MS = 15000
+# Waits until a service worker controls the page; resolves to its script URL, or null.
+CONTROLADO = """
+async (timeoutMs) => {
+  if (!('serviceWorker' in navigator)) return null;
+  const expirou = new Promise(r => setTimeout(r, timeoutMs));
+  await Promise.race([navigator.serviceWorker.ready, expirou]);
+  if (!navigator.serviceWorker.controller) {
+    await Promise.race([
+      new Promise(r => navigator.serviceWorker.addEventListener('controllerchange', r, { once: true })),
+      expirou,
+    ]);
+  }
+  return navigator.serviceWorker.controller ? navigator.serviceWorker.controller.scriptURL : null;
+}
+"""
+NAVEGACAO = """
+() => {
+  const n = performance.getEntriesByType('navigation')[0];
+  return n ? { dom_content_loaded_ms: Math.round(n.domContentLoadedEventEnd), load_ms: Math.round(n.loadEventEnd),
+               bytes_documento: n.transferSize } : {};
+}
+"""
+
+
+class Coleta:
+    """The requests of one context that finish or fail while a phase is open."""
+
+    def __init__(self, context):
+        self.fase = None
+        self.pendentes = []
+        context.on('requestfinished', lambda request: self._anotar(request, False))
+        context.on('requestfailed', lambda request: self._anotar(request, True))
+
+    def _anotar(self, request, falhou):
+        if self.fase is not None and urlsplit(request.url).scheme in ('http', 'https'):
+            self.pendentes.append(asyncio.ensure_future(self._registrar(request, falhou)))
+
+    async def _registrar(self, request, falhou):
+        registro = {'url': request.url, 'tipo': request.resource_type, 'status': None, 'bytes': 0, 'ms': None}
+        if falhou:
+            registro['origem'] = 'falhou'
+            registro['erro'] = request.failure
+            return registro
+        response = await request.response()
+        if request.service_worker is not None:
+            registro['origem'] = 'rede_do_sw'
+        elif response is not None and response.from_service_worker:
+            registro['origem'] = 'service_worker'
+        else:
+            registro['origem'] = 'rede'
+        if response is not None:
+            registro['status'] = response.status
+            try:
+                corpo = (await request.sizes())['responseBodySize']
+            except Exception:
+                # Not reported for some responses the worker builds itself.
+                corpo = 0
+            registro['bytes'] = corpo or int(response.headers.get('content-length') or 0)
+        fim = request.timing.get('responseEnd', -1)
+        registro['ms'] = round(fim, 1) if fim >= 0 else None
+        return registro
+
+    def abrir(self, fase):
+        self.fase = fase
+        self.pendentes = []
+
+    async def fechar(self):
+        self.fase = None
+        return [r for r in await asyncio.gather(*self.pendentes, return_exceptions=True) if isinstance(r, dict)]
+
+
+def resumir(requisicoes):
+    """Requests, bytes and summed response time per origin, plus the share served by the worker."""
+    resumo = {origem: {'requisicoes': 0, 'bytes': 0, 'ms': 0.0} for origem in ORIGENS}
+    for r in requisicoes:
+        grupo = resumo[r['origem']]
+        grupo['requisicoes'] += 1
+        grupo['bytes'] += r['bytes']
+        grupo['ms'] = round(grupo['ms'] + (r['ms'] or 0), 1)
+    total = sum(g['requisicoes'] for g in resumo.values())
+    resumo['servidas_pelo_sw'] = round(resumo['service_worker']['requisicoes'] / total, 3) if total else None
+    return resumo
+
+
+async def carregar(context, coleta, rede, rota, fase):
+    """Opens ``rota`` in a new page during ``fase``; returns the phase's result (never raises)."""
+    resultado = {'erro': None}
+    page = await context.new_page()
+    coleta.abrir(fase)
+    inicio = time.monotonic()
+    try:
+        await page.goto(URL_APP + rota, wait_until='load', timeout=TIMEOUT_MS)
+        carregada = time.monotonic()
+        await rede.ociosa(timeout_ms=TIMEOUT_MS)
+        # Ready once loaded and the Supabase requests went quiet, without the quiet period itself.
+        resultado['pronta_ms'] = round((max(carregada, rede.ultima_mudanca) - inicio) * 1000)
+        resultado.update(await page.evaluate(NAVEGACAO))
+        resultado['service_worker'] = await page.evaluate(CONTROLADO, TIMEOUT_SW_MS)
+        resultado['conteudo'] = await page.evaluate(
+            "() => !!document.querySelector('#root') && document.querySelector('#root').childElementCount > 0")
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}".strip().splitlines()[0]
+    requisicoes = await coleta.fechar()
+    await page.close()
+    resultado['resumo'] = resumir(requisicoes)
+    resultado['requisicoes'] = requisicoes
+    return resultado
+
+
+async def medir(browser, sessoes, papel, rota):
+    resultado = {'rota': rota, 'erro': None, 'fases': {}}
+    try:
+        storage_state = await sessoes.obter(papel)
+    except Exception as e:
+        resultado['erro'] = str(e)
+        return resultado
+    context = await novo_contexto(browser, storage_state=storage_state, service_workers='allow')
+    coleta = Coleta(context)
+    rede = acompanhar(context)
+    try:
+        for fase in FASES:
+            await context.set_offline(fase == 'offline')
+            resultado['fases'][fase] = await carregar(context, coleta, rede, rota, fase)
+    finally:
+        await context.close()
+    return resultado
+
+
+def imprimir(r):
+    if r['erro']:
+        print(f"{r['rota']:<12} ERRO {r['erro']}", flush=True)
+        return
+    partes = []
+    for fase, f in r['fases'].items():
+        resumo = f['resumo']
+        rede = resumo['rede']['bytes'] + resumo['rede_do_sw']['bytes']
+        sw = resumo['servidas_pelo_sw']
+        partes.append(f"{fase} {f.get('pronta_ms', '-')} ms, {rede / 1024:.0f} KiB da rede, "
+                      f"{'-' if sw is None else f'{sw:.0%}'} pelo SW" + (' (falhou)' if f['erro'] else ''))
+    print(f"{r['rota']:<12} " + ' | '.join(partes), flush=True)
+
+
+async def executar(rotas, papel, headless, renovar):
+    resultados = []
+    async with async_playwright() as playwright:
+        browser = await lancar_navegador(playwright, headless)
+        try:
+            sessoes = Sessoes(browser, renovar)
+            for rota in rotas:
+                resultado = await medir(browser, sessoes, papel, rota)
+                imprimir(resultado)
+                resultados.append(resultado)
+        finally:
+            await browser.close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede o que o service worker serve nas cargas fria, quente e offline')
+    parser.add_argument('rotas', nargs='*', help=f"Rotas a medir; padrão: {' '.join(ROTAS)}")
+    parser.add_argument('--papel', default='usuario', choices=sorted(PAPEIS))
+    parser.add_argument('--renovar-sessoes', action='store_true')
+    parser.add_argument('--com-janela', action='store_true', help='Abre o navegador visível')
+    parser.add_argument('--saida', default=ARQUIVO_BENCHMARK)
+    args = parser.parse_args()
+    invalidas = [rota for rota in args.rotas if not rota.startswith('/')]
+    if invalidas:
+        parser.error(f"rota deve começar com '/': {', '.join(invalidas)}")
+
+    inicio = time.perf_counter()
+    resultados = asyncio.run(executar(args.rotas or list(ROTAS), args.papel, not args.com_janela,
+                                      args.renovar_sessoes))
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump({'gerado_em': datetime.now(timezone.utc).isoformat(), 'url': URL_APP, 'papel': args.papel,
+                   'duracao_total_s': round(time.perf_counter() - inicio, 2), 'resultados': resultados},
+                  f, ensure_ascii=False, indent=2)
+    print(f"resultados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Concurrent users on the app, with the journeys of the TC scenarios, ramped up in steps.
+
+    python testsprite_tests/benchmark_carga.py
+    python testsprite_tests/benchmark_carga.py --degraus 1 5 10 25 --duracao 120
+    python testsprite_tests/benchmark_carga.py --backend-local 10000 dashboard relatorios
+
+Every virtual user is a browser context of its own that repeats a session
+until the step's time is up, each session running the chosen journeys in
+order:
+
+* ``login``: the ``/auth`` form until the app leaves it (TC001);
+* ``dashboard``: ``/dashboard`` until its KPIs are shown (TC011);
+* ``relatorios``: ``/relatorios`` filtered by the first brand (TC014);
+* ``leads``: ``/leads`` filtered by stage, which reloads the list.
+
+Without ``login`` the sessions start logged in (``suporte.sessao``). The
+users of a step start spread over its first ``ESCALONAMENTO_S`` seconds; a
+journey lasts until its last action plus the Supabase requests it caused.
+Each step reports latency percentiles per journey and per backend endpoint
+(``<METODO> <tabela>``, ``rpc/<funcao>``, ``auth/<rota>``, from Playwright's
+resource timing), and the ramp stops after a step where more than
+``--limite-erros`` of the journeys failed.
+
+``--backend-local N`` replaces Supabase with ``suporte.backend_local``
+filled with ``N`` rows per table, for runs without the real project; its
+own time per endpoint goes under ``backend``. Results go to
+``tmp/benchmark_carga.json``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from playwright.async_api import async_playwright
+
+from suporte.backend_local import BackendLocal, dados_sinteticos, nome_endpoint
+from suporte.desempenho import percentil
+from suporte.esperas import abrir, acompanhar, clicar, e_supabase
+from suporte.execucao import PASTA_TESTES, lancar_navegador, novo_contexto
+from suporte.sessao import PAPEIS, URL_APP, SessaoIndisponivel, Sessoes, credenciais
+
+ARQUIVO_BENCHMARK = os.path.join(PASTA_TESTES, 'tmp', 'benchmark_carga.json')
+DEGRAUS = (1, 5, 10, 20)
+DURACAO_S = 60
+ESCALONAMENTO_S = 5
+LIMITE_ERROS = 0.5
+PERCENTIS = (50, 90, 95, 99)
+TIMEOUT_MS = 30000
+
+
+async def jornada_login(page, conta):
+    await abrir(page, f'{URL_APP}/auth', timeout=TIMEOUT_MS)
+    await page.locator('#login-form input[type="email"]').fill(conta[0])
+    await page.locator('#login-form input[type="password"]').fill(conta[1])
+    await clicar(page.locator('#login-form button[type="submit"]'))
+    await page.wait_for_url(lambda url: '/auth' not in url, timeout=TIMEOUT_MS)
+
+
+async def jornada_dashboard(page, conta):
+    await abrir(page, f'{URL_APP}/dashboard', timeout=TIMEOUT_MS)
+    await page.locator('#view-dashboard .dashboard-kpis').wait_for()
+
+
+async def jornada_relatorios(page, conta):
+    await abrir(page, f'{URL_APP}/relatorios', timeout=TIMEOUT_MS)
+    await page.locator('#filter-marca').select_option(index=1)
+    await clicar(page.locator('.filter-actions button', has_text='Aplicar Filtros'))
+
+
+async def jornada_leads(page, conta):
+    # The page has no text search; every filter change reloads the leads from Supabase.
+    await abrir(page, f'{URL_APP}/leads', timeout=TIMEOUT_MS)
+    await page.locator('#leads-filter-estagio').select_option('Em negociação')
+
+
+JORNADAS = {
+    'login': jornada_login,
+    'dashboard': jornada_dashboard,
+    'relatorios': jornada_relatorios,
+    'leads': jornada_leads,
+}
+
+
+class Degrau:
+    """What the users of one step measured: journey durations, errors and Supabase latencies."""
+
+    def __init__(self, usuarios):
+        self.usuarios = usuarios
+        self.sessoes = 0
+        self.jornadas = {}
+        self.erros = {}
+        self.endpoints = {}
+        self.falhas_endpoint = Counter()
+
+    def acompanhar(self, context):
+        context.on('requestfinished', self._requisicao)
+        context.on('requestfailed', self._falha)
+
+    def _requisicao(self, request):
+        if e_supabase(request.url):
+            latencia = request.timing.get('responseEnd', -1)
+            medidas = self.endpoints.setdefault(nome_endpoint(request.method, request.url), [])
+            medidas.append(round(latencia, 1) if latencia >= 0 else None)
+
+    def _falha(self, request):
+        if e_supabase(request.url):
+            self.falhas_endpoint[nome_endpoint(request.method, request.url)] += 1
+
+    def anotar(self, jornada, duracao_ms=None, erro=None):
+        self.jornadas.setdefault(jornada, [])
+        if erro is None:
+            self.jornadas[jornada].append(duracao_ms)
+        else:
+            self.erros.setdefault(jornada, Counter())[erro] += 1
+
+    def taxa_erros(self):
+        erros = sum(sum(c.values()) for c in self.erros.values())
+        execucoes = sum(len(v) for v in self.jornadas.values()) + erros
+        return erros / execucoes if execucoes else 0
+
+    def resultado(self, duracao_s):
+        jornadas = {}
+        for nome, duracoes in self.jornadas.items():
+            erros = self.erros.get(nome, Counter())
+            jornadas[nome] = {'execucoes': len(duracoes) + sum(erros.values()), 'erros': sum(erros.values()),
+                              'por_s': round(len(duracoes) / duracao_s, 2), **estatisticas(duracoes),
+                              'mensagens': dict(erros.most_common(5))}
+        endpoints = {}
+        for nome in sorted(set(self.endpoints) | set(self.falhas_endpoint)):
+            latencias = self.endpoints.get(nome, [])
+            endpoints[nome] = {'requisicoes': len(latencias), 'falhas': self.falhas_endpoint[nome],
+                               **estatisticas([l for l in latencias if l is not None])}
+        return {'usuarios': self.usuarios, 'duracao_s': round(duracao_s, 1), 'sessoes': self.sessoes,
+                'taxa_erros': round(self.taxa_erros(), 3), 'jornadas': jornadas, 'endpoints': endpoints}
+
+
+def estatisticas(valores):
+    return {**{f'p{p}_ms': percentil(valores, p) for p in PERCENTIS}, 'max_ms': max(valores, default=None)}
+
+
+async def usuario(browser, degrau, numero, limite, jornadas, preparar):
+    """One virtual user: sessions of ``jornadas`` in new contexts until ``limite`` (a ``time.monotonic()``)."""
+    await asyncio.sleep(numero * ESCALONAMENTO_S / degrau.usuarios)
+    while time.monotonic() < limite:
+        opcoes, conta, backend = await preparar()
+        context = await novo_contexto(browser, **opcoes)
+        context.set_default_timeout(TIMEOUT_MS)
+        rede = acompanhar(context)
+        degrau.acompanhar(context)
+        degrau.sessoes += 1
+        try:
+            if backend:
+                await backend.instalar(context)
+            page = await context.new_page()
+            for nome in jornadas:
+                if time.monotonic() >= limite:
+                    break
+                inicio = time.monotonic()
+                try:
+                    await JORNADAS[nome](page, conta)
+                    feito = time.monotonic()
+                    await rede.ociosa(timeout_ms=TIMEOUT_MS)
+                except Exception as e:
+                    degrau.anotar(nome, erro=f"{type(e).__name__}: {e}".strip().splitlines()[0])
+                    # The rest of the session depends on this journey (a failed login above all).
+                    break
+                degrau.anotar(nome, round((max(feito, rede.ultima_mudanca) - inicio) * 1000, 1))
+        finally:
+            await context.close()
+
+
+def imprimir(r):
+    print(f"{r['usuarios']:>4} usuários  {r['sessoes']} sessões  erros {r['taxa_erros']:.0%}", flush=True)
+    for nome, j in r['jornadas'].items():
+        print(f"     {nome:<11} {j['execucoes']:>5}x  p50 {j['p50_ms'] or '-':>8} ms  p95 {j['p95_ms'] or '-':>8} ms  "
+              f"p99 {j['p99_ms'] or '-':>8} ms  erros {j['erros']}", flush=True)
+
+
+async def executar(jornadas, degraus, duracao_s, papel, linhas_locais, limite_erros, headless):
+    resultados = []
+    backend = BackendLocal(dados_sinteticos(linhas_locais)) if linhas_locais is not None else None
+    async with async_playwright() as playwright:
+        browser = await lancar_navegador(playwright, headless)
+        try:
+            sessoes = Sessoes(browser)
+            logar = 'login' in jornadas
+
+            async def preparar():
+                """Context options, credentials and stand-in of a new session."""
+                # Pages controlled by a service worker can bypass the stand-in's routing.
+                opcoes = {'service_workers': 'block'} if backend else {}
+                if backend:
+                    conta = (backend.usuario['email'], 'benchmark')
+                    if not logar:
+                        opcoes['storage_state'] = backend.sessao()
+                else:
+                    conta = credenciais(papel) if logar else None
+                    if not logar:
+                        opcoes['storage_state'] = await sessoes.obter(papel)
+                return opcoes, conta, backend
+
+            # A missing login or credentials fails here, once, instead of in every user.
+            await preparar()
+            for usuarios in degraus:
+                if backend:
+                    backend.atendidas = []
+                degrau = Degrau(usuarios)
+                inicio = time.monotonic()
+                await asyncio.gather(*(usuario(browser, degrau, i, inicio + duracao_s, jornadas, preparar)
+                                       for i in range(usuarios)))
+                resultado = degrau.resultado(time.monotonic() - inicio)
+                if backend:
+                    resultado['backend'] = backend.resumo()
+                imprimir(resultado)
+                resultados.append(resultado)
+                if resultado['taxa_erros'] > limite_erros:
+                    print(f"parando a rampa: {resultado['taxa_erros']:.0%} das jornadas falharam com {usuarios} "
+                          "usuários", flush=True)
+                    break
+        finally:
+            await browser.close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simula usuários simultâneos, aumentando a concorrência em degraus')
+    parser.add_argument('jornadas', nargs='*',
+                        help=f"Jornadas de cada sessão, em ordem ({', '.join(JORNADAS)}); padrão: todas")
+    parser.add_argument('--degraus', nargs='+', type=int, default=list(DEGRAUS),
+                        help='Usuários simultâneos por degrau')
+    parser.add_argument('--duracao', type=int, default=DURACAO_S, help='Segundos de cada degrau')
+    parser.add_argument('--papel', default='usuario', choices=sorted(PAPEIS))
+    parser.add_argument('--backend-local', type=int, metavar='LINHAS',
+                        help='Usa o backend local em memória com LINHAS registros por tabela')
+    parser.add_argument('--limite-erros', type=float, default=LIMITE_ERROS,
+                        help='Fração de jornadas com erro que encerra a rampa')
+    parser.add_argument('--com-janela', action='store_true', help='Abre o navegador visível')
+    parser.add_argument('--saida', default=ARQUIVO_BENCHMARK)
+    args = parser.parse_args()
+    desconhecidas = set(args.jornadas) - set(JORNADAS)
+    if desconhecidas:
+        parser.error(f"jornada desconhecida: {', '.join(sorted(desconhecidas))}")
+    if any(n < 1 for n in args.degraus):
+        parser.error('cada degrau precisa de pelo menos 1 usuário')
+
+    inicio = time.perf_counter()
+    try:
+        resultados = asyncio.run(executar(args.jornadas or list(JORNADAS), args.degraus, args.duracao, args.papel,
+                                          args.backend_local, args.limite_erros, not args.com_janela))
+    except SessaoIndisponivel as e:
+        sys.exit(f"erro: {e}")
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump({'gerado_em': datetime.now(timezone.utc).isoformat(), 'url': URL_APP,
+                   'backend': 'local' if args.backend_local is not None else 'supabase',
+                   'jornadas': args.jornadas or list(JORNADAS),
+                   'duracao_total_s': round(time.perf_counter() - inicio, 2), 'degraus': resultados},
+                  f, ensure_ascii=False, indent=2)
+    print(f"resultados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Throughput of the CSV importers, driven through the browser with files of increasing size.
+
+    python testsprite_tests/benchmark_importacao.py
+    python testsprite_tests/benchmark_importacao.py --escalas 1000 50000 meta google
+    python testsprite_tests/benchmark_importacao.py --rastros leads
+
+Valid Meta, Google Ads and leads CSVs are generated under ``tmp/importacoes/``
+and uploaded with ``set_input_files`` into the importers of ``/uploads``:
+
+* ``meta``: ``ImportadorAnunciosMeta``, a Meta Ads Manager export, RPC
+  ``upload_tabela_anuncios``;
+* ``google``: ``ImportadorAnunciosGoogle``, a Google Ads campaign report,
+  RPC ``upload_tabela_anuncios_google``;
+* ``leads``: ``ImportadorLeads``, a leads sheet, RPC
+  ``importar_leads_em_massa``;
+* ``relatorios``: ``relatorios/ImportadorCSV``, a Meta weekly report, RPC
+  ``importar_relatorio_anuncios_csv``.
+
+Supabase is ``suporte.backend_local``, which accepts every RPC, so the
+numbers are the browser's: ``leitura`` goes from choosing the file to the
+preview painted (parsing), ``importacao`` from the import button to the
+result painted (building the payload, sending it, rendering the result).
+Both are CDP-traced steps (``suporte.rastreamento``) with their long tasks
+and blocking time. An importer that errors or times out at one size is not
+tried at the larger ones; ``falhou_em`` records where it fell over.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from playwright.async_api import async_playwright
+
+from suporte.backend_local import BackendLocal, dados_sinteticos
+from suporte.esperas import abrir, acompanhar, clicar
+from suporte.execucao import PASTA_TESTES, lancar_navegador, novo_contexto
+from suporte.rastreamento import Rastreamento, analisar, encerrar_etapa, iniciar_etapa, salvar
+from suporte.sessao import URL_APP
+
+ARQUIVO_BENCHMARK = os.path.join(PASTA_TESTES, 'tmp', 'benchmark_importacao.json')
+PASTA_ARQUIVOS = os.path.join(PASTA_TESTES, 'tmp', 'importacoes')
+PASTA_RASTROS = os.path.join(PASTA_TESTES, 'tmp', 'rastros')
+ESCALAS = (1000, 5000, 20000, 50000, 100000)
+ETAPAS = ('leitura', 'importacao')
+TIMEOUT_MS = 300000
+SELETOR_ERRO = '.upload-sidemenu.open .error-box, .resultado-icon.error, .toast-error'
+MESES = ('janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho', 'agosto', 'setembro', 'outubro',
+         'novembro', 'dezembro')
+COLUNAS_META = (
+    'Início dos relatórios', 'Término dos relatórios', 'Nome da campanha', 'Identificação da campanha',
+    'Valor usado (BRL)', 'CPC (custo por clique no link) (BRL)', 'CTR (todos)', 'CTR (taxa de cliques no link)',
+    'Resultados', 'Impressões', 'Custo por resultados',
+)
+COLUNAS_GOOGLE = (
+    'Status da campanha', 'Campanha', 'Orçamento', 'Tipo de orçamento', 'Código da moeda', 'Tipo de campanha',
+    'Tipo de estratégia de lances', 'Motivos do status', 'Custo / conv.', 'CPC méd.', 'Taxa de interação', 'Custo',
+    'Conversões', 'Impr.', 'CPM médio', 'Cliques',
+)
+COLUNAS_LEADS = ('Nome', 'Email', 'Telefone', 'WhatsApp', 'Nome do Formulário', 'Fonte', 'Canal', 'Estágio',
+                 'Proprietário', 'Rótulos')
+
+
+class ErroImportacao(Exception):
+    """The importer showed an error instead of the expected step."""
+
+
+def _br(valor):
+    return f'{valor:.2f}'.replace('.', ',')
+
+
+def csv_meta(n, path, semente=0):
+    """Meta Ads Manager export: ``n`` weekly rows, four weeks per campaign."""
+    aleatorio = random.Random(semente)
+    segunda = date.today() - timedelta(days=date.today().weekday())
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f, lineterminator='\n')
+        escritor.writerow(COLUNAS_META)
+        for i in range(n):
+            inicio = segunda - timedelta(weeks=4 - i % 4)
+            impressoes = aleatorio.randrange(1000, 200000)
+            cliques = max(1, impressoes // aleatorio.randrange(30, 120))
+            spend = round(cliques * aleatorio.uniform(0.2, 3.5), 2)
+            resultados = aleatorio.randrange(0, cliques // 5 + 2)
+            escritor.writerow([
+                inicio.isoformat(), (inicio + timedelta(days=6)).isoformat(), f'Campanha {i // 4 + 1}',
+                str(120000000000000 + i // 4), f'{spend:.2f}', f'{spend / cliques:.2f}',
+                f'{cliques / impressoes * 100:.2f}', f'{cliques / impressoes * 90:.2f}', resultados, impressoes,
+                f'{spend / resultados:.2f}' if resultados else '',
+            ])
+
+
+def csv_google(n, path, semente=0):
+    """Google Ads campaign report: title and period lines, ``n`` campaigns in pt-BR formats, then a total row."""
+    aleatorio = random.Random(semente)
+    fim = date.today().replace(day=1) - timedelta(days=1)
+    periodo = f'1 de {MESES[fim.month - 1]} de {fim.year} - {fim.day} de {MESES[fim.month - 1]} de {fim.year}'
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(f'Relatório de campanha\n{periodo}\n')
+        escritor = csv.writer(f, lineterminator='\n')
+        escritor.writerow(COLUNAS_GOOGLE)
+        total = 0.0
+        for i in range(n):
+            impressoes = aleatorio.randrange(1000, 200000)
+            cliques = max(1, impressoes // aleatorio.randrange(20, 90))
+            custo = round(cliques * aleatorio.uniform(0.3, 4.0), 2)
+            conversoes = aleatorio.randrange(1, cliques // 5 + 2)
+            total += custo
+            escritor.writerow([
+                aleatorio.choice(('Ativada', 'Pausada')), f'Campanha Google {i + 1}',
+                _br(aleatorio.randrange(20, 500)), 'Diário', 'BRL', aleatorio.choice(('Pesquisa', 'Performance Max')),
+                'Maximizar conversões', 'Qualificada', _br(custo / conversoes), _br(custo / cliques),
+                _br(cliques / impressoes * 100) + '%', _br(custo), _br(conversoes), impressoes,
+                _br(custo / impressoes * 1000), cliques,
+            ])
+        escritor.writerow(['', 'Total: conta', '', '', 'BRL', '', '', '', '', '', '', _br(total), '', '', '', ''])
+
+
+def csv_leads(n, path, semente=0):
+    """Leads sheet with every column ``ImportadorLeads`` maps."""
+    aleatorio = random.Random(semente)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f, lineterminator='\n')
+        escritor.writerow(COLUNAS_LEADS)
+        for i in range(n):
+            telefone = f'(11) 9{aleatorio.randrange(10 ** 8):08d}'
+            escritor.writerow([
+                f'Lead {i + 1}', f'lead{i + 1}@exemplo.com', telefone, telefone,
+                f'Formulário {i % 20 + 1:02d}', aleatorio.choice(('Facebook', 'Instagram')),
+                'Formulário instantâneo', 'Em análise', '', 'importado',
+            ])
+
+
+def _cartao(page, titulo):
+    return page.locator('.upload-card', has=page.get_by_role('heading', name=titulo, exact=True))
+
+
+async def abrir_anuncios(page, plataforma):
+    await clicar(_cartao(page, 'Anúncios'))
+    await clicar(page.locator('.searchable-trigger'))
+    await clicar(page.locator('.searchable-option', has=page.locator(f'.mini-badge.{plataforma}')).first)
+
+
+async def abrir_meta(page):
+    await abrir_anuncios(page, 'meta')
+
+
+async def abrir_google(page):
+    await abrir_anuncios(page, 'google')
+
+
+async def abrir_leads(page):
+    await clicar(_cartao(page, 'Leads'))
+    seletores = page.locator('.upload-sidemenu.open .searchable-select')
+    await clicar(seletores.nth(0).locator('.searchable-trigger'))
+    await clicar(page.locator('.searchable-option').first)
+    await clicar(seletores.nth(1).locator('.searchable-trigger'))
+    await clicar(page.locator('.searchable-option', has_text='Meta').first)
+
+
+async def abrir_relatorios(page):
+    await clicar(_cartao(page, 'Relatórios'))
+    await acompanhar(page.context).ociosa()
+    await page.locator('#conta-anuncio').select_option(index=1)
+
+
+# importador -> (open and prepare, CSV generator, preview selector, import button, success selector)
+IMPORTADORES = {
+    'meta': (abrir_meta, csv_meta, '.preview-section', re.compile(r'^\s*Importar \d+'), '.resultado-icon.success'),
+    'google': (abrir_google, csv_google, '.preview-section', re.compile(r'^\s*Importar \d+'),
+               '.resultado-icon.success'),
+    'leads': (abrir_leads, csv_leads, '.preview-line.success', 'Importar Leads', '.toast-success'),
+    'relatorios': (abrir_relatorios, csv_meta, '.preview-section', re.compile(r'^\s*Importar \d+ registros'),
+                   '.resultado-icon.success'),
+}
+
+
+async def esperar(page, seletor):
+    """Waits for ``seletor`` or an importer error, whichever shows first; raises ``ErroImportacao`` on the error."""
+    await page.locator(seletor).or_(page.locator(SELETOR_ERRO)).first.wait_for(timeout=TIMEOUT_MS)
+    erro = page.locator(SELETOR_ERRO)
+    if await erro.count():
+        raise ErroImportacao((await erro.first.inner_text()).strip() or 'erro sem mensagem')
+
+
+async def medir(browser, importador, n, arquivo, tabelas, rastros):
+    """Imports ``arquivo`` with ``importador``; returns its result (never raises)."""
+    preparar, _, seletor_preview, botao, seletor_sucesso = IMPORTADORES[importador]
+    backend = BackendLocal(tabelas)
+    resultado = {'importador': importador, 'linhas': n, 'bytes_arquivo': os.path.getsize(arquivo), 'erro': None}
+    context = await novo_contexto(browser, storage_state=backend.sessao())
+    context.set_default_timeout(TIMEOUT_MS)
+    rede = acompanhar(context)
+    rastreamento = None
+    try:
+        await backend.instalar(context)
+        page = await context.new_page()
+        await abrir(page, f'{URL_APP}/uploads', timeout=TIMEOUT_MS)
+        await preparar(page)
+        rastreamento = Rastreamento(page)
+        await rastreamento.iniciar()
+
+        await iniciar_etapa(page, 'leitura')
+        await page.locator('.upload-sidemenu.open input[type="file"]').set_input_files(arquivo)
+        await esperar(page, seletor_preview)
+        await encerrar_etapa(page, 'leitura')
+
+        await iniciar_etapa(page, 'importacao')
+        await page.get_by_role('button', name=botao).click()
+        rede.tocar()
+        await esperar(page, seletor_sucesso)
+        await encerrar_etapa(page, 'importacao')
+        resultado['heap_mb'] = await page.evaluate(
+            '() => performance.memory ? +(performance.memory.usedJSHeapSize / 1048576).toFixed(1) : null')
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}".strip().splitlines()[0]
+    finally:
+        if rastreamento and rastreamento.cdp:
+            try:
+                eventos = await rastreamento.encerrar()
+                resultado['etapas'] = etapas = {etapa: analisar(eventos, etapa) for etapa in ETAPAS}
+                if all(etapas.values()):
+                    total_ms = sum(e['duracao_ms'] for e in etapas.values())
+                    resultado['ponta_a_ponta_ms'] = round(total_ms, 1)
+                    resultado['bloqueio_ms'] = round(sum(e['bloqueio_ms'] for e in etapas.values()), 1)
+                    resultado['linhas_por_s'] = round(n / (total_ms / 1000)) if total_ms else None
+                if rastros:
+                    os.makedirs(PASTA_RASTROS, exist_ok=True)
+                    resultado['rastro'] = os.path.join(PASTA_RASTROS, f'importacao-{importador}-{n}.json')
+                    salvar(eventos, resultado['rastro'])
+            except Exception as e:
+                resultado['erro'] = resultado['erro'] or f"rastro: {type(e).__name__}: {e}"
+        await context.close()
+    resultado['backend'] = {k: v for k, v in backend.resumo().items() if k.startswith('rpc/')}
+    return resultado
+
+
+def imprimir(r):
+    etapas = r.get('etapas') or {}
+
+    def valor(etapa, medida):
+        return (etapas.get(etapa) or {}).get(medida, '-')
+
+    print(f"{r['importador']:<10} {r['linhas']:>7}  leitura {valor('leitura', 'duracao_ms'):>9} ms "
+          f"(bloqueio {valor('leitura', 'bloqueio_ms')} ms)  importação {valor('importacao', 'duracao_ms'):>9} ms  "
+          f"{r.get('linhas_por_s') or '-'} linhas/s" + (f"  ERRO {r['erro']}" if r['erro'] else ''), flush=True)
+
+
+async def executar(importadores, escalas, headless, rastros):
+    os.makedirs(PASTA_ARQUIVOS, exist_ok=True)
+    tabelas = dados_sinteticos(0)
+    resultados, falhas = [], {}
+    async with async_playwright() as playwright:
+        browser = await lancar_navegador(playwright, headless)
+        try:
+            for importador in importadores:
+                gerar = IMPORTADORES[importador][1]
+                for n in sorted(escalas):
+                    arquivo = os.path.join(PASTA_ARQUIVOS, f'{importador}-{n}.csv')
+                    gerar(n, arquivo)
+                    resultado = await medir(browser, importador, n, arquivo, tabelas, rastros)
+                    imprimir(resultado)
+                    resultados.append(resultado)
+                    if resultado['erro']:
+                        falhas[importador] = n
+                        break
+        finally:
+            await browser.close()
+    return resultados, falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede a importação de CSVs cada vez maiores pelos importadores')
+    parser.add_argument('importadores', nargs='*',
+                        help=f"Importadores a medir ({', '.join(IMPORTADORES)}); padrão: todos")
+    parser.add_argument('--escalas', nargs='+', type=int, default=list(ESCALAS), help='Linhas por arquivo')
+    parser.add_argument('--com-janela', action='store_true', help='Abre o navegador visível')
+    parser.add_argument('--rastros', action='store_true', help='Guarda os rastros em tmp/rastros/ para o DevTools')
+    parser.add_argument('--saida', default=ARQUIVO_BENCHMARK)
+    args = parser.parse_args()
+    desconhecidos = set(args.importadores) - set(IMPORTADORES)
+    if desconhecidos:
+        parser.error(f"importador desconhecido: {', '.join(sorted(desconhecidos))}")
+
+    inicio = time.perf_counter()
+    resultados, falhas = asyncio.run(executar(args.importadores or list(IMPORTADORES), args.escalas,
+                                              not args.com_janela, args.rastros))
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump({'gerado_em': datetime.now(timezone.utc).isoformat(), 'url': URL_APP,
+                   'duracao_total_s': round(time.perf_counter() - inicio, 2), 'falhou_em': falhas,
+                   'resultados': resultados}, f, ensure_ascii=False, indent=2)
+    for importador, n in falhas.items():
+        print(f"{importador}: falhou com {n} linhas")
+    print(f"resultados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Render, scroll and filter benchmarks of the list pages at 1k, 10k and 100k rows.
+
+    python testsprite_tests/benchmark_volume.py
+    python testsprite_tests/benchmark_volume.py --escalas 1000 10000 leads
+    python testsprite_tests/benchmark_volume.py --rastros campanhas     # keeps the traces for DevTools
+
+Supabase is replaced by ``suporte.backend_local`` filled with ``n`` leads,
+campaigns and weekly ad report rows (``dados_sinteticos``); the app itself
+must be running at ``TESTSPRITE_URL``. For every page and scale a fresh
+context, logged in as the stand-in's user, is traced over CDP
+(``suporte.rastreamento``) through three steps:
+
+* ``render``: from ``navigationStart`` to the list painted with its data;
+* ``rolagem``: the list scrolled by ``PASSOS_ROLAGEM`` frames, one step per
+  animation frame, which is where dropped frames show up;
+* ``filtro``: one filter applied until the new result is painted.
+
+Render and filter end at the last DOM change painted before the page went
+quiet, not when this script noticed it.
+
+Results go to ``tmp/benchmark_volume.json``, with the time the stand-in spent
+building its responses under ``backend``, so it can be told apart from the
+browser's share.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from playwright.async_api import async_playwright
+
+from suporte.backend_local import BackendLocal, dados_sinteticos
+from suporte.esperas import acompanhar
+from suporte.execucao import PASTA_TESTES, lancar_navegador, novo_contexto
+from suporte.rastreamento import (Rastreamento, analisar, encerrar_etapa, iniciar_etapa, observar_render,
+                                  salvar)
+from suporte.sessao import URL_APP
+
+ARQUIVO_BENCHMARK = os.path.join(PASTA_TESTES, 'tmp', 'benchmark_volume.json')
+PASTA_RASTROS = os.path.join(PASTA_TESTES, 'tmp', 'rastros')
+ESCALAS = (1000, 10000, 100000)
+ETAPAS = ('render', 'rolagem', 'filtro')
+PASSOS_ROLAGEM = 60
+PIXELS_POR_PASSO = 120
+# The 100k lists take far longer than a functional test is allowed to.
+TIMEOUT_MS = 180000
+# Scrolls the nearest scrollable ancestor of the element (or the document), one step per frame.
+ROLAR = """
+async ([seletor, passos, dy]) => {
+  let alvo = document.querySelector(seletor);
+  while (alvo && !(alvo.scrollHeight > alvo.clientHeight && /(auto|scroll)/.test(getComputedStyle(alvo).overflowY))) {
+    alvo = alvo.parentElement;
+  }
+  alvo = alvo || document.scrollingElement;
+  for (let i = 0; i < passos; i++) {
+    alvo.scrollBy(0, dy);
+    await new Promise(r => requestAnimationFrame(r));
+  }
+}
+"""
+
+
+async def filtrar_leads(page):
+    # The page reloads the leads on every filter change, no need for "Aplicar Filtros".
+    await page.locator('#leads-filter-estagio').select_option('Convertido')
+
+
+async def filtrar_relatorios(page):
+    await page.locator('#filter-marca').select_option(index=1)
+    await page.locator('.filter-actions button', has_text='Aplicar Filtros').click()
+
+
+async def filtrar_campanhas(page):
+    await page.locator('#campaign-filter-status').select_option('active')
+
+
+# pagina -> (route, selector of the rendered list, filter action)
+PAGINAS = {
+    'leads': ('/leads', '.leads-table tbody tr', filtrar_leads),
+    'relatorios': ('/relatorios', '#detailed-report-container', filtrar_relatorios),
+    'campanhas': ('/campanhas', '#campaignsList > *', filtrar_campanhas),
+}
+
+
+async def medir(browser, pagina, tabelas, n, rastros):
+    """Runs the three steps of ``pagina`` against ``tabelas``; returns its result (never raises)."""
+    rota, seletor, filtrar = PAGINAS[pagina]
+    backend = BackendLocal(tabelas)
+    resultado = {'pagina': pagina, 'linhas': n, 'erro': None}
+    context = await novo_contexto(browser, storage_state=backend.sessao())
+    context.set_default_timeout(TIMEOUT_MS)
+    rede = acompanhar(context)
+    rastreamento = None
+    try:
+        await backend.instalar(context)
+        await observar_render(context)
+        page = await context.new_page()
+        rastreamento = Rastreamento(page)
+        await rastreamento.iniciar()
+
+        await page.goto(URL_APP + rota, wait_until='domcontentloaded', timeout=TIMEOUT_MS)
+        await page.locator(seletor).first.wait_for(timeout=TIMEOUT_MS)
+        await rede.ociosa(timeout_ms=TIMEOUT_MS)
+        await encerrar_etapa(page, 'render')
+
+        await iniciar_etapa(page, 'rolagem')
+        await page.evaluate(ROLAR, [seletor, PASSOS_ROLAGEM, PIXELS_POR_PASSO])
+        await encerrar_etapa(page, 'rolagem')
+
+        await iniciar_etapa(page, 'filtro')
+        await filtrar(page)
+        rede.tocar()
+        await rede.ociosa(timeout_ms=TIMEOUT_MS)
+        await encerrar_etapa(page, 'filtro')
+        resultado['heap_mb'] = await page.evaluate(
+            '() => performance.memory ? +(performance.memory.usedJSHeapSize / 1048576).toFixed(1) : null')
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}".strip().splitlines()[0]
+    finally:
+        if rastreamento and rastreamento.cdp:
+            try:
+                eventos = await rastreamento.encerrar()
+                resultado['etapas'] = {etapa: analisar(eventos, etapa) for etapa in ETAPAS}
+                if rastros:
+                    os.makedirs(PASTA_RASTROS, exist_ok=True)
+                    resultado['rastro'] = os.path.join(PASTA_RASTROS, f'{pagina}-{n}.json')
+                    salvar(eventos, resultado['rastro'])
+            except Exception as e:
+                resultado['erro'] = resultado['erro'] or f"rastro: {type(e).__name__}: {e}"
+        await context.close()
+    resultado['backend'] = backend.resumo()
+    return resultado
+
+
+def imprimir(r):
+    etapas = r.get('etapas') or {}
+
+    def valor(etapa, medida):
+        return (etapas.get(etapa) or {}).get(medida, '-')
+
+    print(f"{r['pagina']:<11} {r['linhas']:>7}  render {valor('render', 'duracao_ms'):>8} ms  "
+          f"rolagem {valor('rolagem', 'quadros_perdidos'):>4} quadros perdidos "
+          f"(máx {valor('rolagem', 'intervalo_max_ms')} ms)  filtro {valor('filtro', 'duracao_ms'):>8} ms"
+          + (f"  ERRO {r['erro']}" if r['erro'] else ''), flush=True)
+
+
+async def executar(paginas, escalas, headless, rastros):
+    resultados = []
+    async with async_playwright() as playwright:
+        browser = await lancar_navegador(playwright, headless)
+        try:
+            for n in escalas:
+                tabelas = dados_sinteticos(n)
+                for pagina in paginas:
+                    resultado = await medir(browser, pagina, tabelas, n, rastros)
+                    imprimir(resultado)
+                    resultados.append(resultado)
+        finally:
+            await browser.close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede render, rolagem e filtro das listas com muitos registros')
+    parser.add_argument('paginas', nargs='*', help=f"Páginas a medir ({', '.join(PAGINAS)}); padrão: todas")
+    parser.add_argument('--escalas', nargs='+', type=int, default=list(ESCALAS), help='Registros por tabela')
+    parser.add_argument('--com-janela', action='store_true', help='Abre o navegador visível')
+    parser.add_argument('--rastros', action='store_true', help='Guarda os rastros em tmp/rastros/ para o DevTools')
+    parser.add_argument('--saida', default=ARQUIVO_BENCHMARK)
+    args = parser.parse_args()
+    desconhecidas = set(args.paginas) - set(PAGINAS)
+    if desconhecidas:
+        parser.error(f"página desconhecida: {', '.join(sorted(desconhecidas))}")
+
+    inicio = time.perf_counter()
+    resultados = asyncio.run(executar(args.paginas or list(PAGINAS), args.escalas, not args.com_janela, args.rastros))
+    os.makedirs(os.path.dirname(args.saida), exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump({'gerado_em': datetime.now(timezone.utc).isoformat(), 'url': URL_APP,
+                   'duracao_total_s': round(time.perf_counter() - inicio, 2), 'resultados': resultados},
+                  f, ensure_ascii=False, indent=2)
+    print(f"resultados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Runs the TC scripts in one browser, concurrently, each in a fresh context.
+
+    python testsprite_tests/executar.py
+    python testsprite_tests/executar.py -j 6 TC009 TC010
+    python testsprite_tests/executar.py --com-janela -j 1 TC019
+    python testsprite_tests/executar.py --rede gravar TC009      # then --rede reproduzir
+
+For several worker processes, see ``fragmentar.py``.
+
+Results go to ``testsprite_tests/tmp/execucao.json`` and the per-route
+performance report to ``tmp/execucao.desempenho.json``; the exit code is 1 when
+any test fails or a route goes over its budget (``orcamentos_desempenho.json``).
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from suporte.execucao import (ARQUIVO_RESULTADOS, CONCORRENCIA_PADRAO, adicionar_opcoes_rede, aplicar_opcoes_rede,
+                              concluir, descobrir, executar_suite, imprimir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Executa os testes TC0xx num único navegador')
+    parser.add_argument('testes', nargs='*', help='Prefixos de id (ex.: TC001 TC01); padrão: todos')
+    parser.add_argument('-j', '--concorrencia', type=int, default=CONCORRENCIA_PADRAO)
+    parser.add_argument('--com-janela', action='store_true', help='Abre o navegador visível')
+    parser.add_argument('--renovar-sessoes', action='store_true', help='Faz login de novo mesmo com sessão salva recente')
+    parser.add_argument('--saida', default=ARQUIVO_RESULTADOS)
+    parser.add_argument('--ws', help='Conecta a um servidor de navegador do Playwright em vez de abrir o Chromium')
+    adicionar_opcoes_rede(parser)
+    args = parser.parse_args()
+    aplicar_opcoes_rede(args)
+
+    testes = descobrir(args.testes)
+    if not testes:
+        parser.error('nenhum teste encontrado')
+    inicio = time.perf_counter()
+    resultados = asyncio.run(executar_suite(testes, args.concorrencia, not args.com_janela, imprimir,
+                                            args.renovar_sessoes, args.ws))
+    sys.exit(concluir(resultados, args.saida, time.perf_counter() - inicio, concorrencia=args.concorrencia))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Runs the TC scripts in several worker processes, sharded by historical duration.
+
+    python testsprite_tests/fragmentar.py -n 4
+    python testsprite_tests/fragmentar.py -n 3 --simular      # only prints the plan
+    python testsprite_tests/fragmentar.py -n 2 -j 2 TC00
+
+The tests are split with longest-processing-time-first (``suporte.fragmentos``).
+One ``playwright run-server`` is started and every shard runs ``executar.py
+--ws`` against it in its own process. The role logins (``suporte.sessao``)
+are done once here before the workers start, so they reuse the saved
+sessions. The per-shard files are merged into ``tmp/execucao.json``, which
+also feeds the durations of the next run.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from suporte.desempenho import caminho_relatorio
+from suporte.execucao import (ARQUIVO_RESULTADOS, PASTA_TESTES, adicionar_opcoes_rede, aplicar_opcoes_rede,
+                              carregar_teste, concluir, descobrir)
+from suporte.fragmentos import duracoes_historicas, lpt, mesclar
+from suporte.gravacao import modo_rede
+from suporte.sessao import Sessoes
+
+EXECUTAR = os.path.join(PASTA_TESTES, 'executar.py')
+TIMEOUT_SERVIDOR_S = 30
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor():
+    """Starts ``playwright run-server`` on a free local port; returns ``(process, ws_endpoint)``."""
+    porta = porta_livre()
+    processo = subprocess.Popen([sys.executable, '-m', 'playwright', 'run-server',
+                                 '--port', str(porta), '--host', '127.0.0.1'])
+    limite = time.monotonic() + TIMEOUT_SERVIDOR_S
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f'playwright run-server terminou com código {processo.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', porta), timeout=0.5).close()
+            return processo, f'ws://127.0.0.1:{porta}/'
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError(f'playwright run-server não respondeu em {TIMEOUT_SERVIDOR_S}s')
+
+
+async def preparar_sessoes(ws_endpoint, papeis, renovar):
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.connect(ws_endpoint)
+        try:
+            sessoes = Sessoes(browser, renovar)
+            for papel in sorted(papeis):
+                try:
+                    await sessoes.obter(papel)
+                except Exception as e:
+                    print(f"aviso: {e}", flush=True)
+        finally:
+            await browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Executa os testes TC0xx em processos paralelos, balanceados por duração')
+    parser.add_argument('testes', nargs='*', help='Prefixos de id (ex.: TC001 TC01); padrão: todos')
+    parser.add_argument('-n', '--fragmentos', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('-j', '--concorrencia', type=int, default=1, help='Testes simultâneos em cada processo')
+    parser.add_argument('--renovar-sessoes', action='store_true')
+    parser.add_argument('--simular', action='store_true', help='Só mostra a divisão')
+    parser.add_argument('--saida', default=ARQUIVO_RESULTADOS)
+    adicionar_opcoes_rede(parser)
+    args = parser.parse_args()
+    aplicar_opcoes_rede(args)
+
+    testes = dict(descobrir(args.testes))
+    if not testes:
+        parser.error('nenhum teste encontrado')
+    duracoes, origens = duracoes_historicas(testes)
+    plano = lpt(duracoes, args.fragmentos)
+    for numero, (previsto, ids) in enumerate(plano, 1):
+        detalhes = ', '.join(f"{t} ({duracoes[t]:.0f}s{'' if origens[t] == 'execucao' else ' ' + origens[t]})"
+                             for t in ids)
+        print(f"fragmento {numero}: ~{previsto:.0f}s  {detalhes}")
+    if args.simular:
+        return
+
+    inicio = time.perf_counter()
+    papeis = {getattr(carregar_teste(path), 'PAPEL', None) for path in testes.values()} - {None}
+    servidor, ws_endpoint = iniciar_servidor()
+    base = os.path.splitext(args.saida)[0]
+    paths = [f'{base}.fragmento-{numero}.json' for numero in range(1, len(plano) + 1)]
+    try:
+        if modo_rede() != 'reproduzir':
+            # Replays start from the session stored with each recording.
+            asyncio.run(preparar_sessoes(ws_endpoint, papeis, args.renovar_sessoes))
+        trabalhadores = [
+            subprocess.Popen([sys.executable, EXECUTAR, '--ws', ws_endpoint, '-j', str(args.concorrencia),
+                              '--saida', path, *ids])
+            for path, (_, ids) in zip(paths, plano)
+        ]
+        for trabalhador in trabalhadores:
+            trabalhador.wait()
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    resultados, fragmentos = mesclar(paths, plano)
+    for path in paths:
+        for arquivo in (path, caminho_relatorio(path)):
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+    sys.exit(concluir(resultados, args.saida, time.perf_counter() - inicio, fragmentos=fragmentos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Shared helpers for the testsprite Playwright scripts (``TC0xx_*.py``).
+
+The scripts import from here with ``testsprite_tests/`` on ``sys.path``, which
+is the case both when a script is run directly and through the suite runner.
+"""
@@ -0,0 +1,448 @@
+"""In-memory stand-in for the Supabase backend, served through Playwright routing.
+
+``BackendLocal`` answers every request a browser context makes to
+``VITE_SUPABASE_URL`` (the same variable ``client.js`` reads) from tables
+held in Python, so the app can be driven against data sets of any size
+without touching the real project:
+
+* ``/rest/v1/<tabela>``: the PostgREST subset the services use: ``select``
+  with ``*``, renamed columns and to-one embeds (``marca:marcas(nome)``,
+  ``modelos(nome)``), the ``eq``/``neq``/``gt``/``gte``/``lt``/``lte``/
+  ``like``/``ilike``/``in``/``is`` filters (``not.`` negated), ``order``,
+  ``limit``/``offset`` or a ``Range`` header, ``Prefer: count=exact``,
+  single-object responses, and inserts, updates and deletes;
+* ``/rest/v1/rpc/<funcao>``: the function registered in ``rpcs``, ``[]``
+  otherwise;
+* ``/auth/v1/``: one fixed user, whatever credentials are sent.
+
+Anything outside that subset (``or=``, one-to-many embeds) gets PostgREST's
+400, so a page that relies on it shows up as an error rather than as fast,
+wrong data. ``sessao()`` builds a ``storage_state`` already logged in as that
+user, and ``dados_sinteticos(n)`` fills the app's main tables with ``n``
+leads, campaigns and weekly report rows.
+
+Every request served is kept in ``atendidas`` (endpoint, status, rows, bytes
+received and sent, time spent here), so a benchmark can tell backend time
+from browser time.
+"""
+import base64
+import json
+import os
+import random
+import re
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from suporte.sessao import URL_APP
+
+URL_SUPABASE = os.environ.get('VITE_SUPABASE_URL', 'https://agdvozsqcrszflzsimyl.supabase.co').rstrip('/')
+CHAVE_SESSAO = f"sb-{urlsplit(URL_SUPABASE).hostname.split('.')[0]}-auth-token"
+CHAVE_PERFIL = 'sun_motors_user_profile'
+# Embedded table -> the column of the embedding row that points to it.
+CHAVES_ESTRANGEIRAS = {
+    'marcas': 'marca_id',
+    'plataformas': 'plataforma_id',
+    'contas_de_anuncio': 'conta_de_anuncio_id',
+    'modelos': 'modelo_id',
+    'formularios': 'formulario_id',
+    'anuncios': 'anuncio_id',
+    'campanhas': 'campanha_id',
+}
+PARAMETROS_RESERVADOS = {'select', 'order', 'limit', 'offset', 'columns', 'on_conflict'}
+ESTAGIOS = ('Em análise', 'Em negociação', 'Convertido', 'Perdido')
+STATUS_CAMPANHA = ('active', 'paused', 'inactive')
+
+
+def nome_endpoint(metodo, url):
+    """How a Supabase request is grouped in reports: ``rpc/<funcao>``, ``<METODO> <tabela>`` or ``auth/<rota>``."""
+    caminho = unquote(urlsplit(url).path)
+    if caminho.startswith('/rest/v1/rpc/'):
+        return 'rpc/' + caminho[len('/rest/v1/rpc/'):]
+    if caminho.startswith('/rest/v1/'):
+        return f"{metodo} {caminho[len('/rest/v1/'):].strip('/')}"
+    if caminho.startswith('/auth/v1/'):
+        return 'auth/' + caminho[len('/auth/v1/'):]
+    return caminho
+
+
+class ConsultaInvalida(Exception):
+    """A query outside the supported PostgREST subset; answered with a 400."""
+
+
+def _agora_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _jwt(claims):
+    """Unsigned token with the right shape; only the app decodes it, nobody verifies it."""
+    def parte(dados):
+        return base64.urlsafe_b64encode(json.dumps(dados).encode()).rstrip(b'=').decode('ascii')
+    return f"{parte({'alg': 'HS256', 'typ': 'JWT'})}.{parte(claims)}.{parte('local')}"
+
+
+def _dividir(texto):
+    """Splits a ``select`` on the commas outside parentheses."""
+    itens, nivel, atual = [], 0, ''
+    for c in texto:
+        if c == ',' and nivel == 0:
+            itens.append(atual.strip())
+            atual = ''
+            continue
+        nivel += (c == '(') - (c == ')')
+        atual += c
+    if atual.strip():
+        itens.append(atual.strip())
+    return itens
+
+
+def _comparavel(atual, texto):
+    if isinstance(atual, bool):
+        return texto.lower() == 'true'
+    if isinstance(atual, (int, float)):
+        try:
+            return float(texto)
+        except ValueError:
+            return texto
+    return texto
+
+
+def _padrao(texto, ignorar_caixa):
+    regex = ''.join('.*' if c in '*%' else '.' if c == '_' else re.escape(c) for c in texto)
+    return re.compile(f'^{regex}$', re.IGNORECASE | re.DOTALL if ignorar_caixa else re.DOTALL)
+
+
+def _filtro(coluna, expressao):
+    """Predicate for one ``coluna=op.valor`` query parameter."""
+    negar = expressao.startswith('not.')
+    if negar:
+        expressao = expressao[4:]
+    op, _, valor = expressao.partition('.')
+    if op in ('eq', 'neq', 'gt', 'gte', 'lt', 'lte'):
+        def teste(atual):
+            if atual is None:
+                return False
+            alvo = _comparavel(atual, valor)
+            try:
+                return {'eq': atual == alvo, 'neq': atual != alvo, 'gt': atual > alvo, 'gte': atual >= alvo,
+                        'lt': atual < alvo, 'lte': atual <= alvo}[op]
+            except TypeError:
+                return False
+    elif op in ('like', 'ilike'):
+        padrao = _padrao(valor, op == 'ilike')
+        def teste(atual):
+            return atual is not None and bool(padrao.match(str(atual)))
+    elif op == 'in':
+        opcoes = [v.strip().strip('"') for v in valor.strip('()').split(',') if v.strip()]
+        def teste(atual):
+            return atual is not None and any(atual == _comparavel(atual, o) or str(atual) == o for o in opcoes)
+    elif op == 'is':
+        alvo = {'null': None, 'true': True, 'false': False}.get(valor.lower(), valor)
+        def teste(atual):
+            return atual is alvo
+    else:
+        raise ConsultaInvalida(f"operador não suportado pelo backend local: {coluna}={op}")
+    return lambda linha: teste(linha.get(coluna)) != negar
+
+
+def _ordenar(linhas, ordem):
+    """Applies ``order=col.desc.nullslast,col2`` (stable sorts, last key first)."""
+    for termo in reversed([t for t in ordem.split(',') if t]):
+        partes = termo.split('.')
+        coluna, descendente = partes[0], 'desc' in partes[1:]
+        nulos_primeiro = 'nullsfirst' in partes[1:] or ('nullslast' not in partes[1:] and descendente)
+        presentes = [l for l in linhas if l.get(coluna) is not None]
+        ausentes = [l for l in linhas if l.get(coluna) is None]
+        presentes.sort(key=lambda l: l[coluna], reverse=descendente)
+        linhas = ausentes + presentes if nulos_primeiro else presentes + ausentes
+    return linhas
+
+
+class BackendLocal:
+    """Tables in memory plus the fixed user; ``instalar(context)`` routes the Supabase URL to it."""
+
+    def __init__(self, tabelas=None, cargo='ADM'):
+        self.tabelas = {nome: list(linhas) for nome, linhas in (tabelas or {}).items()}
+        self.rpcs = {}
+        self.atendidas = []
+        self._indices = {}
+        self.usuario = {
+            'id': '00000000-0000-4000-8000-000000000001',
+            'aud': 'authenticated',
+            'role': 'authenticated',
+            'email': 'benchmark@local.test',
+            'app_metadata': {'provider': 'email', 'providers': ['email']},
+            'user_metadata': {'full_name': 'Benchmark Local'},
+            'created_at': '2024-01-01T00:00:00Z',
+        }
+        self.perfil = {'id': self.usuario['id'], 'nome': 'Benchmark Local', 'email': self.usuario['email'],
+                       'cargo': cargo}
+        self.tabelas.setdefault('perfil_de_usuario', [dict(self.perfil)])
+
+    def token(self):
+        """Auth response body: a session valid for a day."""
+        expira = int(time.time()) + 24 * 3600
+        return {
+            'access_token': _jwt({'sub': self.usuario['id'], 'email': self.usuario['email'], 'role': 'authenticated',
+                                  'aud': 'authenticated', 'cargo': self.perfil['cargo'], 'exp': expira}),
+            'token_type': 'bearer',
+            'expires_in': 24 * 3600,
+            'expires_at': expira,
+            'refresh_token': uuid.uuid4().hex,
+            'user': self.usuario,
+        }
+
+    def sessao(self):
+        """``storage_state`` of a context already logged in as the local user."""
+        origem = urlsplit(URL_APP)
+        return {'cookies': [], 'origins': [{
+            'origin': f'{origem.scheme}://{origem.netloc}',
+            'localStorage': [
+                {'name': CHAVE_SESSAO, 'value': json.dumps(self.token())},
+                {'name': CHAVE_PERFIL, 'value': json.dumps(self.perfil)},
+            ],
+        }]}
+
+    async def instalar(self, context):
+        await context.route(f'{URL_SUPABASE}/**', self._atender)
+
+    async def _atender(self, route):
+        request = route.request
+        inicio = time.perf_counter()
+        partes = urlsplit(request.url)
+        caminho = unquote(partes.path)
+        endpoint = nome_endpoint(request.method, request.url)
+        try:
+            if caminho.startswith('/rest/v1/rpc/'):
+                status, cabecalhos, corpo, linhas = self._rpc(caminho[len('/rest/v1/rpc/'):], request)
+            elif caminho.startswith('/rest/v1/'):
+                tabela = caminho[len('/rest/v1/'):].strip('/')
+                status, cabecalhos, corpo, linhas = self._rest(tabela, request, partes.query)
+            elif caminho.startswith('/auth/v1/'):
+                status, cabecalhos, corpo, linhas = self._auth(caminho[len('/auth/v1/'):], request)
+            else:
+                status, cabecalhos, corpo, linhas = 404, {}, {'message': 'não simulado pelo backend local'}, 0
+        except ConsultaInvalida as e:
+            status, cabecalhos, corpo, linhas = 400, {}, {'code': 'PGRST100', 'message': str(e)}, 0
+        texto = b'' if corpo is None or request.method == 'HEAD' else json.dumps(corpo).encode('utf-8')
+        self.atendidas.append({'endpoint': endpoint, 'status': status, 'linhas': linhas,
+                               'bytes_recebidos': len(request.post_data_buffer or b''), 'bytes': len(texto),
+                               'ms': round((time.perf_counter() - inicio) * 1000, 2)})
+        await route.fulfill(status=status, body=texto, headers={
+            'content-type': 'application/json; charset=utf-8',
+            'access-control-allow-origin': '*',
+            'access-control-allow-headers': '*',
+            'access-control-allow-methods': 'GET, HEAD, POST, PATCH, DELETE, OPTIONS',
+            'access-control-expose-headers': 'content-range',
+            **cabecalhos,
+        })
+
+    def _auth(self, caminho, request):
+        if request.method == 'OPTIONS':
+            return 204, {}, None, 0
+        if caminho.startswith('token'):
+            return 200, {}, self.token(), 0
+        if caminho.startswith('user'):
+            return 200, {}, self.usuario, 0
+        if caminho.startswith('logout'):
+            return 204, {}, None, 0
+        return 200, {}, {}, 0
+
+    def _rpc(self, funcao, request):
+        if request.method == 'OPTIONS':
+            return 204, {}, None, 0
+        argumentos = request.post_data_json if request.post_data else {}
+        resultado = self.rpcs[funcao](self, **(argumentos or {})) if funcao in self.rpcs else []
+        return 200, {}, resultado, len(resultado) if isinstance(resultado, list) else 1
+
+    def _indice(self, tabela):
+        if tabela not in self._indices:
+            self._indices[tabela] = {l.get('id'): l for l in self.tabelas.get(tabela, [])}
+        return self._indices[tabela]
+
+    def _projetar(self, linha, itens):
+        saida = {}
+        for item in itens:
+            if item == '*':
+                saida.update(linha)
+            elif '(' in item:
+                nome, _, colunas = item.partition('(')
+                alias, _, tabela = nome.partition(':')
+                tabela = (tabela or alias).split('!')[0].strip()
+                chave = CHAVES_ESTRANGEIRAS.get(tabela)
+                if chave is None:
+                    raise ConsultaInvalida(f"relação não suportada pelo backend local: {item}")
+                relacionada = self._indice(tabela).get(linha.get(chave))
+                saida[alias.strip()] = (self._projetar(relacionada, _dividir(colunas.rstrip(')')))
+                                        if relacionada else None)
+            else:
+                alias, _, coluna = item.partition(':')
+                coluna = (coluna or alias).split('::')[0].strip()
+                saida[alias.strip()] = linha.get(coluna)
+        return saida
+
+    def _filtrar(self, tabela, parametros):
+        filtros = []
+        for coluna, expressao in parametros:
+            if coluna in PARAMETROS_RESERVADOS:
+                continue
+            if coluna in ('or', 'and', 'not.or', 'not.and'):
+                raise ConsultaInvalida(f"filtro lógico não suportado pelo backend local: {coluna}")
+            filtros.append(_filtro(coluna, expressao))
+        return [l for l in self.tabelas.get(tabela, []) if all(f(l) for f in filtros)]
+
+    def _rest(self, tabela, request, consulta):
+        if request.method == 'OPTIONS':
+            return 204, {}, None, 0
+        parametros = parse_qsl(consulta, keep_blank_values=True)
+        opcoes = dict(parametros)
+        prefer = request.headers.get('prefer', '')
+        itens = _dividir(opcoes.get('select', '*'))
+        representacao = 'return=representation' in prefer
+
+        def escrita(status, afetadas):
+            if representacao:
+                return status, {}, [self._projetar(l, itens) for l in afetadas], len(afetadas)
+            return 204 if status == 200 else status, {}, None, len(afetadas)
+
+        if request.method == 'POST':
+            novas = request.post_data_json
+            novas = novas if isinstance(novas, list) else [novas]
+            existentes = self._indice(tabela)
+            for nova in novas:
+                nova.setdefault('id', str(uuid.uuid4()))
+                nova.setdefault('criado_em', _agora_iso())
+                if nova['id'] in existentes:
+                    existentes[nova['id']].update(nova)
+                else:
+                    self.tabelas.setdefault(tabela, []).append(nova)
+            self._indices.pop(tabela, None)
+            return escrita(201, novas)
+        if request.method == 'PATCH':
+            alvo = self._filtrar(tabela, parametros)
+            for linha in alvo:
+                linha.update(request.post_data_json or {})
+            return escrita(200, alvo)
+        if request.method == 'DELETE':
+            alvo = self._filtrar(tabela, parametros)
+            ids = {id(l) for l in alvo}
+            self.tabelas[tabela] = [l for l in self.tabelas.get(tabela, []) if id(l) not in ids]
+            self._indices.pop(tabela, None)
+            return escrita(200, alvo)
+
+        linhas = self._filtrar(tabela, parametros)
+        if 'order' in opcoes:
+            linhas = _ordenar(linhas, opcoes['order'])
+        total = len(linhas)
+        inicio, fim = int(opcoes.get('offset', 0)), None
+        if 'limit' in opcoes:
+            fim = inicio + int(opcoes['limit'])
+        faixa = re.match(r'(\d+)-(\d*)', request.headers.get('range', ''))
+        if faixa:
+            inicio = int(faixa.group(1))
+            fim = int(faixa.group(2)) + 1 if faixa.group(2) else None
+        linhas = linhas[inicio:fim]
+        cabecalhos = {}
+        if 'count=' in prefer:
+            cabecalhos['content-range'] = (f'{inicio}-{inicio + len(linhas) - 1}/{total}' if linhas else f'*/{total}')
+        corpo = [self._projetar(l, itens) for l in linhas]
+        if 'vnd.pgrst.object' in request.headers.get('accept', ''):
+            if len(corpo) != 1:
+                return 406, cabecalhos, {'code': 'PGRST116', 'details': f'The result contains {len(corpo)} rows',
+                                         'hint': None,
+                                         'message': 'JSON object requested, multiple (or no) rows returned'}, 0
+            corpo = corpo[0]
+        return 200, cabecalhos, corpo, len(linhas)
+
+    def resumo(self):
+        """Requests served, grouped by endpoint: count, rows, bytes each way and time spent building the responses."""
+        por_endpoint = {}
+        for a in self.atendidas:
+            e = por_endpoint.setdefault(a['endpoint'], {'requisicoes': 0, 'linhas': 0, 'bytes_recebidos': 0,
+                                                        'bytes': 0, 'ms': 0.0})
+            e['requisicoes'] += 1
+            e['linhas'] += a['linhas']
+            e['bytes_recebidos'] += a['bytes_recebidos']
+            e['bytes'] += a['bytes']
+            e['ms'] = round(e['ms'] + a['ms'], 2)
+        return por_endpoint
+
+
+def dados_sinteticos(n, semente=0, hoje=None):
+    """Tables with ``n`` leads, ``n`` campaigns and ``n`` weekly ad report rows, plus the lookups they point to.
+
+    Leads are spread over the last year and report rows over the last 52
+    weeks (Monday to Sunday), so the pages' default "this month" periods are
+    never empty. The same ``n`` and ``semente`` always give the same data.
+    """
+    aleatorio = random.Random(semente)
+    hoje = hoje or date.today()
+
+    def ident(prefixo, i):
+        return f'{prefixo:0>8}-0000-4000-8000-{i:012d}'
+
+    marcas = [{'id': ident('1', i), 'nome': f'Marca {i + 1:02d}'} for i in range(12)]
+    plataformas = [{'id': ident('2', 0), 'nome': 'Meta'}, {'id': ident('2', 1), 'nome': 'Google'}]
+    contas = [{'id': ident('3', i), 'nome': f'Conta {i + 1:02d}', 'marca_id': marcas[i % 12]['id'],
+               'plataforma_id': plataformas[i % 2]['id']} for i in range(36)]
+    modelos = [{'id': ident('4', i), 'nome': f'Modelo {i + 1:02d}', 'marca_id': marcas[i % 12]['id']}
+               for i in range(60)]
+    formularios = [{'id': ident('5', i), 'nome': f'Formulário {i + 1:02d}',
+                    'conta_de_anuncio_id': contas[i % 36]['id']} for i in range(72)]
+    modelos_da_marca = {m['id']: [o for o in modelos if o['marca_id'] == m['id']] for m in marcas}
+    por_id = {m['id']: m for m in marcas}
+    visao = [{'marca_id': c['marca_id'], 'marca': por_id[c['marca_id']]['nome'], 'plataforma_id': c['plataforma_id'],
+              'plataforma': 'Meta' if c['plataforma_id'] == plataformas[0]['id'] else 'Google',
+              'conta_id': c['id'], 'conta_nome': c['nome']} for c in contas]
+    anuncios = [{'id': ident('6', i), 'nome': f'Anúncio {i + 1:04d}', 'status': 'ACTIVE', 'preview_midia': None}
+                for i in range(max(50, min(n // 20, 2000)))]
+
+    leads = []
+    for i in range(n):
+        formulario = aleatorio.choice(formularios)
+        criado = datetime.combine(hoje, datetime.min.time(), timezone.utc) - timedelta(
+            seconds=aleatorio.randrange(365 * 24 * 3600))
+        leads.append({
+            'id': ident('7', i), 'nome': f'Lead {i + 1}', 'email': f'lead{i + 1}@exemplo.com',
+            'telefone': f'(11) 9{aleatorio.randrange(10 ** 8):08d}', 'estagio': aleatorio.choice(ESTAGIOS),
+            'conta_de_anuncio_id': formulario['conta_de_anuncio_id'], 'formulario_id': formulario['id'],
+            'nome_formulario': formulario['nome'],
+            'criado_em': criado.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        })
+
+    campanhas = []
+    for i in range(n):
+        conta = aleatorio.choice(contas)
+        modelo = aleatorio.choice(modelos_da_marca[conta['marca_id']])
+        inicio = hoje - timedelta(days=aleatorio.randrange(365))
+        campanhas.append({
+            'id': ident('8', i), 'nome': f'Campanha {i + 1}', 'external_id': str(10 ** 12 + i),
+            'status': aleatorio.choice(STATUS_CAMPANHA), 'marca_id': conta['marca_id'],
+            'conta_de_anuncio_id': conta['id'], 'modelo_id': modelo['id'],
+            'orcamento': {'valor': aleatorio.randrange(500, 50000), 'tipo': 'diario'},
+            'data_inicio': inicio.isoformat(), 'data_fim': (inicio + timedelta(days=30)).isoformat(),
+        })
+
+    segunda = hoje - timedelta(days=hoje.weekday())
+    relatorio = []
+    for i in range(n):
+        conta = contas[i % 36]
+        semana = segunda - timedelta(weeks=aleatorio.randrange(52))
+        cliques = aleatorio.randrange(10, 2000)
+        impressoes = cliques * aleatorio.randrange(20, 80)
+        spend = round(cliques * aleatorio.uniform(0.3, 4.0), 2)
+        relatorio.append({
+            'id': ident('9', i), 'anuncio_id': anuncios[i % len(anuncios)]['id'], 'marca_id': conta['marca_id'],
+            'plataforma_id': conta['plataforma_id'], 'conta_de_anuncio_id': conta['id'],
+            'modelo_id': modelos[i % 60]['id'], 'data_inicio': semana.isoformat(),
+            'data_fim': (semana + timedelta(days=6)).isoformat(), 'impressoes': impressoes, 'cliques': cliques,
+            'spend': spend, 'conversao': aleatorio.randrange(0, cliques // 10 + 1),
+            'ctr': round(cliques / impressoes * 100, 2), 'cpc': round(spend / cliques, 2),
+        })
+
+    return {
+        'marcas': marcas, 'plataformas': plataformas, 'contas_de_anuncio': contas, 'modelos': modelos,
+        'formularios': formularios, 'relatorio_completo_marcas': visao, 'anuncios': anuncios,
+        'leads': leads, 'campanhas': campanhas, 'relatorio_anuncios': relatorio,
+    }
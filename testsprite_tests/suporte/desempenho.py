@@ -0,0 +1,203 @@
+"""Per-route performance capture and budgets for the test runner.
+
+An init script added to every test context keeps, for each route the page
+shows (a document load or a ``history.pushState`` to another path):
+
+* navigation timing of the document (TTFB, DOMContentLoaded, load, bytes);
+* LCP, for routes that start with a document load (the browser does not
+  report it for client-side navigations);
+* long tasks: count, longest and total blocking time (time over 50 ms);
+* ``performance.memory.usedJSHeapSize`` when the route is left.
+
+Segments are kept in ``sessionStorage`` so a full reload does not lose the
+previous route. Supabase requests are counted from the Python side, by the
+route of the frame that made them, with their latency from Playwright's
+resource timing.
+
+``verificar`` compares every route against ``orcamentos_desempenho.json``
+(a ``padrao`` budget plus per-route overrides); the runner writes the report
+and fails the run on any breach. ``TESTSPRITE_DESEMPENHO=0`` (``--sem-desempenho``)
+turns the capture off.
+"""
+import json
+import math
+import os
+from urllib.parse import urlsplit
+
+from suporte.esperas import e_supabase
+
+PASTA_TESTES = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARQUIVO_ORCAMENTOS = os.path.join(PASTA_TESTES, 'orcamentos_desempenho.json')
+
+SCRIPT = """
+(() => {
+  if (window.__desempenho) return;
+  const CHAVE = '__desempenho';
+  let atual = null;
+  const abrir = (documento) => {
+    atual = { rota: location.pathname, documento, inicio: performance.now(), lcp_ms: null,
+              tarefas_longas: 0, tarefa_mais_longa_ms: 0, bloqueio_ms: 0 };
+  };
+  const fechar = () => {
+    if (!atual) return;
+    atual.duracao_ms = performance.now() - atual.inicio;
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (atual.documento && nav) {
+      atual.ttfb_ms = nav.responseStart;
+      atual.dom_content_loaded_ms = nav.domContentLoadedEventEnd || null;
+      atual.load_ms = nav.loadEventEnd || null;
+      atual.bytes_documento = nav.transferSize;
+    }
+    if (performance.memory) atual.heap_bytes = performance.memory.usedJSHeapSize;
+    const lista = JSON.parse(sessionStorage.getItem(CHAVE) || '[]');
+    lista.push(atual);
+    sessionStorage.setItem(CHAVE, JSON.stringify(lista));
+    atual = null;
+  };
+  const trocar = (antes) => { if (location.pathname !== antes) { fechar(); abrir(false); } };
+  abrir(true);
+  try {
+    new PerformanceObserver((lista) => {
+      for (const e of lista.getEntries()) if (atual && atual.documento) atual.lcp_ms = e.startTime;
+    }).observe({ type: 'largest-contentful-paint', buffered: true });
+    new PerformanceObserver((lista) => {
+      for (const e of lista.getEntries()) {
+        if (!atual) continue;
+        atual.tarefas_longas += 1;
+        atual.tarefa_mais_longa_ms = Math.max(atual.tarefa_mais_longa_ms, e.duration);
+        atual.bloqueio_ms += Math.max(0, e.duration - 50);
+      }
+    }).observe({ type: 'longtask', buffered: true });
+  } catch (e) { /* observer types not supported */ }
+  for (const metodo of ['pushState', 'replaceState']) {
+    const original = history[metodo];
+    history[metodo] = function (...args) {
+      const antes = location.pathname;
+      const r = original.apply(this, args);
+      trocar(antes);
+      return r;
+    };
+  }
+  let anterior = location.pathname;
+  addEventListener('popstate', () => { trocar(anterior); anterior = location.pathname; });
+  addEventListener('pagehide', fechar);
+  window.__desempenho = {
+    coletar: () => {
+      fechar();
+      const lista = JSON.parse(sessionStorage.getItem(CHAVE) || '[]');
+      sessionStorage.removeItem(CHAVE);
+      abrir(false);
+      return lista;
+    },
+  };
+})();
+"""
+
+
+def medir_desempenho():
+    return os.environ.get('TESTSPRITE_DESEMPENHO', '1') != '0'
+
+
+def percentil(valores, p):
+    """Nearest-rank percentile; None for an empty list."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+class Desempenho:
+    """Collects the route segments of one test context."""
+
+    def __init__(self):
+        self.latencias = {}
+
+    async def instalar(self, context):
+        await context.add_init_script(SCRIPT)
+        context.on('requestfinished', self._requisicao)
+
+    def _requisicao(self, request):
+        if not e_supabase(request.url):
+            return
+        try:
+            rota = urlsplit(request.frame.url).path or '/'
+        except Exception:
+            rota = '?'
+        latencia = request.timing.get('responseEnd', -1)
+        self.latencias.setdefault(rota, []).append(latencia if latencia >= 0 else None)
+
+    async def coletar(self, context):
+        """Route segments of every open page, each with its Supabase counts; call before closing the context."""
+        brutos = []
+        for page in context.pages:
+            try:
+                brutos += await page.evaluate('() => window.__desempenho ? window.__desempenho.coletar() : []')
+            except Exception:
+                continue
+        segmentos, vistas = [], set()
+        for bruto in brutos:
+            segmento = {k: (round(v, 1) if isinstance(v, float) else v) for k, v in bruto.items() if k != 'inicio'}
+            # Supabase requests are known per route, so they go to the first visit of each route.
+            if segmento['rota'] not in vistas:
+                vistas.add(segmento['rota'])
+                latencias = self.latencias.get(segmento['rota'], [])
+                medidas = [l for l in latencias if l is not None]
+                segmento['supabase_requisicoes'] = len(latencias)
+                segmento['supabase_p50_ms'] = percentil(medidas, 50)
+                segmento['supabase_p95_ms'] = percentil(medidas, 95)
+            segmentos.append(segmento)
+        return segmentos
+
+
+def carregar_orcamentos(path=ARQUIVO_ORCAMENTOS):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def orcamento_da_rota(orcamentos, rota):
+    return {**orcamentos.get('padrao', {}), **orcamentos.get('rotas', {}).get(rota, {})}
+
+
+def verificar(resultados, orcamentos):
+    """Budget breaches of every route segment in the test results: ``[{id, rota, medida, valor, limite}]``."""
+    violacoes = []
+    for resultado in resultados:
+        for segmento in resultado.get('desempenho', []):
+            for medida, limite in orcamento_da_rota(orcamentos, segmento['rota']).items():
+                valor = segmento.get(medida)
+                if medida == 'heap_mb' and segmento.get('heap_bytes') is not None:
+                    valor = round(segmento['heap_bytes'] / 2 ** 20, 1)
+                if valor is not None and valor > limite:
+                    violacoes.append({'id': resultado['id'], 'rota': segmento['rota'], 'medida': medida,
+                                      'valor': valor, 'limite': limite})
+    return violacoes
+
+
+def gerar_relatorio(resultados, orcamentos, path):
+    """Writes the per-run report (segments grouped by route, plus breaches) and returns the breaches."""
+    por_rota = {}
+    for resultado in resultados:
+        for segmento in resultado.get('desempenho', []):
+            por_rota.setdefault(segmento['rota'], []).append({'id': resultado['id'], **segmento})
+    violacoes = verificar(resultados, orcamentos)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'rotas': {
+                rota: {
+                    'visitas': len(segmentos),
+                    'orcamento': orcamento_da_rota(orcamentos, rota),
+                    'lcp_p75_ms': percentil([s['lcp_ms'] for s in segmentos if s.get('lcp_ms')], 75),
+                    'bloqueio_max_ms': max(s.get('bloqueio_ms') or 0 for s in segmentos),
+                    'segmentos': segmentos,
+                }
+                for rota, segmentos in sorted(por_rota.items())
+            },
+            'violacoes': violacoes,
+        }, f, ensure_ascii=False, indent=2)
+    return violacoes
+
+
+def caminho_relatorio(saida):
+    """Report path next to a results file: ``tmp/execucao.json`` -> ``tmp/execucao.desempenho.json``."""
+    return os.path.splitext(saida)[0] + '.desempenho.json'
@@ -0,0 +1,114 @@
+"""Condition-based waits for the testsprite scripts.
+
+The generated scripts slept a fixed 3 s before every fill and click and 3-5 s
+at the end. These helpers wait on what the app is actually doing instead:
+
+* ``acompanhar(context)`` counts the Supabase requests (REST, RPC, auth,
+  storage, functions) in flight in a browser context;
+* ``preencher`` and ``clicar`` wait until no Supabase request has been in
+  flight for a short quiet period, then rely on Playwright's actionability
+  checks (attached, visible, enabled, stable) for the element itself;
+* ``abrir`` navigates and waits for the DOM plus the first round of data;
+* ``rolar`` scrolls and waits for the next paints and any lazy loading.
+"""
+import asyncio
+import time
+import weakref
+
+ROTAS_SUPABASE = ('/rest/v1/', '/auth/v1/', '/storage/v1/', '/functions/v1/')
+# A request has to start within this window after an action to be waited on.
+SILENCIO_MS = 150
+TIMEOUT_REDE_MS = 10000
+TIMEOUT_ACAO_MS = 5000
+
+_redes = weakref.WeakKeyDictionary()
+
+
+def e_supabase(url):
+    return any(rota in url for rota in ROTAS_SUPABASE)
+
+
+class RedeSupabase:
+    """Supabase requests in flight in one browser context."""
+
+    def __init__(self, context):
+        self.pendentes = set()
+        self.ultima_mudanca = time.monotonic()
+        self.mudou = asyncio.Event()
+        context.on('request', self._inicio)
+        context.on('requestfinished', self._fim)
+        context.on('requestfailed', self._fim)
+
+    def _inicio(self, request):
+        if e_supabase(request.url):
+            self.pendentes.add(request)
+            self.tocar()
+
+    def _fim(self, request):
+        if request in self.pendentes:
+            self.pendentes.discard(request)
+            self.tocar()
+
+    def tocar(self):
+        """Restarts the quiet period (a request changed state or the test just acted)."""
+        self.ultima_mudanca = time.monotonic()
+        self.mudou.set()
+
+    async def ociosa(self, silencio_ms=SILENCIO_MS, timeout_ms=TIMEOUT_REDE_MS):
+        """Waits until no Supabase request has been in flight for ``silencio_ms``.
+
+        Returns False after ``timeout_ms`` instead of raising: a page that polls
+        must not hang the test, and a page that is really stuck makes the next
+        action fail on its own timeout.
+        """
+        limite = time.monotonic() + timeout_ms / 1000
+        while True:
+            agora = time.monotonic()
+            if agora >= limite:
+                return False
+            espera = limite - agora
+            if not self.pendentes:
+                restante = self.ultima_mudanca + silencio_ms / 1000 - agora
+                if restante <= 0:
+                    return True
+                espera = min(espera, restante)
+            self.mudou.clear()
+            try:
+                await asyncio.wait_for(self.mudou.wait(), espera)
+            except asyncio.TimeoutError:
+                pass
+
+
+def acompanhar(context):
+    """Starts tracking Supabase requests in ``context``; call before opening pages."""
+    if context not in _redes:
+        _redes[context] = RedeSupabase(context)
+    return _redes[context]
+
+
+async def abrir(page, url, timeout=10000):
+    await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+    await acompanhar(page.context).ociosa()
+
+
+async def preencher(elem, valor, timeout=TIMEOUT_ACAO_MS):
+    rede = acompanhar(elem.page.context)
+    await rede.ociosa()
+    await elem.fill(valor, timeout=timeout)
+    rede.tocar()
+
+
+async def clicar(elem, timeout=TIMEOUT_ACAO_MS):
+    rede = acompanhar(elem.page.context)
+    await rede.ociosa()
+    await elem.click(timeout=timeout)
+    rede.tocar()
+
+
+async def rolar(page, delta_y):
+    await page.mouse.wheel(0, delta_y)
+    # Two animation frames: the scroll has been applied and painted.
+    await page.evaluate('() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))')
+    rede = acompanhar(page.context)
+    rede.tocar()
+    await rede.ociosa()
@@ -0,0 +1,206 @@
+"""Running the TC scripts: one shared browser, a fresh context per test.
+
+Each ``TC0xx_*.py`` exposes ``async def run_test(context)`` and only drives the
+page. Starting Playwright, launching Chromium and creating the context is done
+here, so the suite pays the browser startup once:
+
+* ``executar_suite`` launches one browser and runs the tests concurrently in
+  the same event loop, each in its own ``BrowserContext``, at most
+  ``concorrencia`` at a time;
+* ``executar_isolado`` keeps ``python testsprite_tests/TC001_...py`` working
+  by doing the same for a single test.
+
+Tests that declare a ``PAPEL`` get a context created from that role's saved
+login (``suporte.sessao``). Supabase record/replay and asset blocking
+(``suporte.gravacao``) and the performance capture (``suporte.desempenho``)
+are set up on every context.
+"""
+import asyncio
+import glob
+import importlib.util
+import json
+import os
+import time
+import traceback
+from datetime import datetime, timezone
+
+from playwright.async_api import async_playwright
+
+from suporte.desempenho import (Desempenho, caminho_relatorio, carregar_orcamentos, gerar_relatorio,
+                                 medir_desempenho)
+from suporte.esperas import acompanhar
+from suporte.gravacao import MODOS, Gravacao, bloquear_recursos, modo_rede
+from suporte.sessao import Sessoes
+
+PASTA_TESTES = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARQUIVO_RESULTADOS = os.path.join(PASTA_TESTES, 'tmp', 'execucao.json')
+ARGS_CHROMIUM = ['--window-size=1280,720', '--disable-dev-shm-usage']
+TIMEOUT_PADRAO_MS = 5000
+CONCORRENCIA_PADRAO = 4
+
+
+def descobrir(filtros=None, pasta=PASTA_TESTES):
+    """``[(id, path)]`` of the TC scripts, e.g. ``('TC001', '.../TC001_User_...py')``, optionally filtered by id prefix."""
+    testes = []
+    for path in sorted(glob.glob(os.path.join(pasta, 'TC[0-9][0-9][0-9]_*.py'))):
+        teste_id = os.path.basename(path).split('_', 1)[0]
+        if not filtros or any(teste_id.startswith(f) for f in filtros):
+            testes.append((teste_id, path))
+    return testes
+
+
+def carregar_teste(path):
+    """Imports a TC script by path; the module has ``run_test`` and optionally ``PAPEL``."""
+    nome = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(nome, path)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+async def lancar_navegador(playwright, headless=True):
+    return await playwright.chromium.launch(headless=headless, args=ARGS_CHROMIUM)
+
+
+async def novo_contexto(browser, **opcoes):
+    context = await browser.new_context(**opcoes)
+    context.set_default_timeout(TIMEOUT_PADRAO_MS)
+    acompanhar(context)
+    return context
+
+
+async def executar_teste(browser, teste_id, path, sessoes):
+    """Runs one test in a fresh context; returns its result dict (never raises on test failure)."""
+    inicio = time.perf_counter()
+    resultado = {'id': teste_id, 'arquivo': os.path.basename(path), 'status': 'PASSED', 'erro': None}
+    context = None
+    gravacao = Gravacao(teste_id, modo_rede(), bloquear_recursos())
+    desempenho = Desempenho() if medir_desempenho() else None
+    try:
+        modulo = carregar_teste(path)
+        opcoes = {}
+        papel = getattr(modulo, 'PAPEL', None)
+        if papel:
+            resultado['papel'] = papel
+            # A replay reuses the session stored with the recording instead of logging in.
+            opcoes['storage_state'] = gravacao.sessao or await sessoes.obter(papel)
+        context = await novo_contexto(browser, **opcoes)
+        await gravacao.instalar(context, opcoes.get('storage_state'))
+        if desempenho:
+            await desempenho.instalar(context)
+        await modulo.run_test(context)
+    except Exception as e:
+        resultado['status'] = 'FAILED'
+        resultado['erro'] = f"{type(e).__name__}: {e}".strip()
+        resultado['traceback'] = traceback.format_exc()
+    finally:
+        if context is not None:
+            if desempenho:
+                resultado['desempenho'] = await desempenho.coletar(context)
+            await context.close()
+            gravacao.salvar()
+    if gravacao.ativa:
+        resultado['rede'] = gravacao.resumo()
+    resultado['duracao_s'] = round(time.perf_counter() - inicio, 2)
+    return resultado
+
+
+async def executar_em_navegador(browser, testes, concorrencia=CONCORRENCIA_PADRAO, ao_terminar=None,
+                                renovar_sessoes=False):
+    """Runs ``[(id, path)]`` in ``browser`` with at most ``concorrencia`` tests at a time, in discovery order."""
+    limite = asyncio.Semaphore(max(1, concorrencia))
+    sessoes = Sessoes(browser, renovar_sessoes)
+
+    async def um(teste_id, path):
+        async with limite:
+            resultado = await executar_teste(browser, teste_id, path, sessoes)
+        if ao_terminar:
+            ao_terminar(resultado)
+        return resultado
+
+    return list(await asyncio.gather(*(um(teste_id, path) for teste_id, path in testes)))
+
+
+async def executar_suite(testes, concorrencia=CONCORRENCIA_PADRAO, headless=True, ao_terminar=None,
+                         renovar_sessoes=False, ws_endpoint=None):
+    """Launches a browser (or connects to a Playwright browser server at ``ws_endpoint``) and runs ``testes``."""
+    async with async_playwright() as playwright:
+        if ws_endpoint:
+            browser = await playwright.chromium.connect(ws_endpoint)
+        else:
+            browser = await lancar_navegador(playwright, headless)
+        try:
+            return await executar_em_navegador(browser, testes, concorrencia, ao_terminar, renovar_sessoes)
+        finally:
+            await browser.close()
+
+
+def executar_isolado(run_test, papel=None, headless=True):
+    """Entry point of a TC script run directly: its own browser and context, exceptions propagate."""
+    teste_id = os.path.basename(run_test.__code__.co_filename).split('_', 1)[0]
+
+    async def principal():
+        async with async_playwright() as playwright:
+            browser = await lancar_navegador(playwright, headless)
+            gravacao = Gravacao(teste_id, modo_rede(), bloquear_recursos())
+            opcoes = {}
+            if papel:
+                opcoes['storage_state'] = gravacao.sessao or await Sessoes(browser).obter(papel)
+            context = await novo_contexto(browser, **opcoes)
+            try:
+                await gravacao.instalar(context, opcoes.get('storage_state'))
+                await run_test(context)
+            finally:
+                await context.close()
+                gravacao.salvar()
+                await browser.close()
+
+    asyncio.run(principal())
+
+
+def adicionar_opcoes_rede(parser):
+    parser.add_argument('--rede', choices=MODOS, help='Supabase real, gravando ou reproduzindo respostas '
+                                                      '(padrão: TESTSPRITE_REDE ou real)')
+    parser.add_argument('--carregar-recursos', action='store_true', help='Não bloqueia fontes e imagens externas')
+    parser.add_argument('--sem-desempenho', action='store_true', help='Não mede desempenho nem verifica orçamentos')
+
+
+def aplicar_opcoes_rede(args):
+    """Passes the network options through the environment, so worker processes inherit them."""
+    if args.rede:
+        os.environ['TESTSPRITE_REDE'] = args.rede
+    if args.carregar_recursos:
+        os.environ['TESTSPRITE_RECURSOS'] = 'carregar'
+    if args.sem_desempenho:
+        os.environ['TESTSPRITE_DESEMPENHO'] = '0'
+
+
+def gravar_resultados(resultados, path=ARQUIVO_RESULTADOS, **extras):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'gerado_em': datetime.now(timezone.utc).isoformat(),
+            **extras,
+            'resultados': sorted(resultados, key=lambda r: r['id']),
+        }, f, ensure_ascii=False, indent=2)
+
+
+def concluir(resultados, saida, total_s, **extras):
+    """Writes the results and the performance report, prints the summary and returns the exit code."""
+    gravar_resultados(resultados, saida, duracao_total_s=round(total_s, 2), **extras)
+    falhas = sum(r['status'] != 'PASSED' for r in resultados)
+    violacoes = []
+    if medir_desempenho():
+        relatorio = caminho_relatorio(saida)
+        violacoes = gerar_relatorio(resultados, carregar_orcamentos(), relatorio)
+        for v in violacoes:
+            print(f"orçamento estourado: {v['id']} {v['rota']} {v['medida']} = {v['valor']} (limite {v['limite']})")
+        print(f"desempenho por rota em {relatorio}")
+    print(f"{len(resultados) - falhas} passaram, {falhas} falharam, {len(violacoes)} orçamento(s) estourado(s) "
+          f"em {total_s:.1f}s; resultados em {saida}")
+    return 1 if falhas or violacoes else 0
+
+
+def imprimir(resultado):
+    print(f"{resultado['id']} {resultado['status']:6} {resultado['duracao_s']:6.1f}s"
+          + (f"  {resultado['erro'].splitlines()[0]}" if resultado['erro'] else ''), flush=True)
@@ -0,0 +1,92 @@
+"""Splitting the suite into shards balanced by historical duration.
+
+Durations come from the last runs of the local runner (``tmp/execucao.json``,
+``duracao_s``) and, for tests that never ran locally, from the TestSprite
+results (``tmp/test_results.json``, ``modified - created``). Tests with no
+history at all get the median of the known ones.
+
+``lpt`` is the longest-processing-time-first heuristic: tests are taken from
+the longest down and each goes to the shard with the smallest load so far,
+which keeps the slowest shard within 4/3 of the optimum.
+"""
+import heapq
+import json
+import os
+import statistics
+from datetime import datetime
+
+from suporte.execucao import ARQUIVO_RESULTADOS, PASTA_TESTES
+
+ARQUIVO_TESTSPRITE = os.path.join(PASTA_TESTES, 'tmp', 'test_results.json')
+DURACAO_PADRAO_S = 60.0
+
+
+def _ler_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _duracoes_testsprite(path):
+    duracoes = {}
+    for teste in _ler_json(path) or []:
+        teste_id = (teste.get('title') or '').split('-', 1)[0]
+        try:
+            inicio = datetime.fromisoformat(teste['created'].replace('Z', '+00:00'))
+            fim = datetime.fromisoformat(teste['modified'].replace('Z', '+00:00'))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if teste_id and fim > inicio:
+            duracoes[teste_id] = (fim - inicio).total_seconds()
+    return duracoes
+
+
+def duracoes_historicas(testes, execucao=ARQUIVO_RESULTADOS, testsprite=ARQUIVO_TESTSPRITE):
+    """``{id: seconds}`` for every id in ``testes``, plus ``{id: source}`` ('execucao', 'testsprite' or 'estimada')."""
+    locais = {r['id']: r['duracao_s'] for r in (_ler_json(execucao) or {}).get('resultados', [])
+              if r.get('duracao_s')}
+    remotas = _duracoes_testsprite(testsprite)
+    duracoes, origens = {}, {}
+    for teste_id in testes:
+        if teste_id in locais:
+            duracoes[teste_id], origens[teste_id] = locais[teste_id], 'execucao'
+        elif teste_id in remotas:
+            duracoes[teste_id], origens[teste_id] = remotas[teste_id], 'testsprite'
+    estimada = statistics.median(duracoes.values()) if duracoes else DURACAO_PADRAO_S
+    for teste_id in testes:
+        if teste_id not in duracoes:
+            duracoes[teste_id], origens[teste_id] = estimada, 'estimada'
+    return duracoes, origens
+
+
+def lpt(duracoes, fragmentos):
+    """Splits ``{id: seconds}`` into ``fragmentos`` lists; returns ``[(previsto_s, [ids])]`` (empty shards dropped)."""
+    cargas = [(0.0, i) for i in range(max(1, fragmentos))]
+    grupos = [[] for _ in cargas]
+    for teste_id in sorted(duracoes, key=lambda t: (-duracoes[t], t)):
+        carga, i = heapq.heappop(cargas)
+        grupos[i].append(teste_id)
+        heapq.heappush(cargas, (carga + duracoes[teste_id], i))
+    return [(round(sum(duracoes[t] for t in grupo), 1), sorted(grupo)) for grupo in grupos if grupo]
+
+
+def mesclar(paths, plano):
+    """Merges the shard result files; ``plano`` is the ``lpt`` output in the same order as ``paths``.
+
+    A shard that wrote no file (its worker crashed) marks its tests as FAILED.
+    """
+    resultados, fragmentos = [], []
+    for numero, (path, (previsto, ids)) in enumerate(zip(paths, plano), 1):
+        conteudo = _ler_json(path) or {}
+        obtidos = {r['id']: r for r in conteudo.get('resultados', [])}
+        for teste_id in ids:
+            resultado = obtidos.get(teste_id) or {
+                'id': teste_id, 'status': 'FAILED', 'erro': 'o processo do fragmento não gravou resultado',
+                'duracao_s': 0.0,
+            }
+            resultados.append({**resultado, 'fragmento': numero})
+        fragmentos.append({'fragmento': numero, 'testes': ids, 'previsto_s': previsto,
+                           'real_s': conteudo.get('duracao_total_s')})
+    return resultados, fragmentos
@@ -0,0 +1,181 @@
+"""Record/replay of Supabase responses and blocking of non-essential assets.
+
+``TESTSPRITE_REDE`` picks how a test talks to Supabase:
+
+* ``real`` (default): the live backend, untouched;
+* ``gravar``: requests go to the backend and every REST/RPC/auth/functions
+  response is stored in ``tmp/gravacoes/<TC id>.json``;
+* ``reproduzir``: responses are served from that file and nothing reaches
+  Supabase. A request with no recording gets a 503 and is listed in the test
+  result (``rede.sem_gravacao``), so a stale recording is easy to spot.
+
+A request is identified by method, path, sorted query string and, for writes
+outside ``/auth/``, a hash of the body. The same request seen several times
+(a list reloaded after an insert) keeps its responses in order and they are
+replayed in that order. When the exact key is missing, the first recording of
+the same method and path is used.
+
+The recording also keeps the moment it was made and the logged-in
+``storage_state`` of the test. A replay starts from that same session, without
+logging in, and installs the browser clock at that moment, so the session has
+not expired and queries built from "today" produce the recorded keys.
+
+Independently, ``TESTSPRITE_RECURSOS=bloquear`` (default) aborts font
+requests and images and media not served by the app itself, which only cost
+time in a functional run; ``carregar`` lets them through for visual runs and
+for measuring the performance budgets. Only the Supabase routes and the URLs
+that can be such an asset are routed; still, Playwright turns the HTTP cache
+off in a context that has any route, so budgets meant to reflect cached loads
+need ``carregar`` with ``real``.
+"""
+import base64
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from suporte.esperas import ROTAS_SUPABASE
+from suporte.sessao import URL_APP
+
+PASTA_GRAVACOES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tmp', 'gravacoes')
+MODOS = ('real', 'gravar', 'reproduzir')
+# Storage objects are media, handled as assets rather than recorded.
+ROTAS_GRAVADAS = tuple(r for r in ROTAS_SUPABASE if r != '/storage/v1/')
+# Hop-by-hop or encoding headers that do not apply to a body replayed from disk.
+CABECALHOS_DESCARTADOS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'date'}
+EXTENSOES_FONTE = ('.woff2', '.woff', '.ttf', '.otf', '.eot')
+
+
+def modo_rede():
+    modo = os.environ.get('TESTSPRITE_REDE', 'real')
+    if modo not in MODOS:
+        raise ValueError(f"TESTSPRITE_REDE inválido: {modo!r} (use {', '.join(MODOS)})")
+    return modo
+
+
+def bloquear_recursos():
+    return os.environ.get('TESTSPRITE_RECURSOS', 'bloquear') != 'carregar'
+
+
+def chave_requisicao(request):
+    """``(exact key, method + path)`` of a request."""
+    partes = urlsplit(request.url)
+    base = f"{request.method} {partes.path}"
+    chave = base + ('?' + urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True))) if partes.query else '')
+    corpo = request.post_data_buffer
+    if corpo and '/auth/' not in partes.path:
+        chave += ' #' + hashlib.sha1(corpo).hexdigest()[:16]
+    return chave, base
+
+
+def _pode_ser_dispensavel(url):
+    """URLs that may be a blocked asset; the resource type is only known once routed."""
+    if urlsplit(url).path.lower().endswith(EXTENSOES_FONTE):
+        return True
+    return not url.startswith(URL_APP) and not any(r in url for r in ROTAS_GRAVADAS)
+
+
+def _e_recurso_dispensavel(request):
+    if request.resource_type == 'font':
+        return True
+    return request.resource_type in ('image', 'media') and not request.url.startswith(URL_APP)
+
+
+class Gravacao:
+    """Intercepts one browser context; ``resumo()`` goes into the test result."""
+
+    def __init__(self, teste_id, modo, bloquear):
+        self.path = os.path.join(PASTA_GRAVACOES, f'{teste_id}.json')
+        self.modo = modo
+        self.bloquear = bloquear
+        self.respostas = {}
+        self.sessao = None
+        self.gravado_em = None
+        self.servidas = {}
+        self.sem_gravacao = []
+        self.contagem = {'gravadas': 0, 'reproduzidas': 0, 'aproximadas': 0, 'bloqueadas': 0}
+        if modo == 'reproduzir':
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+            except FileNotFoundError:
+                raw = {}
+            self.respostas = raw.get('respostas', {})
+            self.sessao = raw.get('sessao')
+            self.gravado_em = raw.get('gravado_em')
+
+    @property
+    def ativa(self):
+        return self.modo != 'real' or self.bloquear
+
+    async def instalar(self, context, storage_state=None):
+        """Routes ``context``; ``storage_state`` (path or dict) is the session the test was given."""
+        if self.modo == 'gravar':
+            self.gravado_em = datetime.now(timezone.utc).isoformat()
+            if isinstance(storage_state, str):
+                with open(storage_state, 'r', encoding='utf-8') as f:
+                    storage_state = json.load(f)
+            self.sessao = storage_state
+        elif self.modo == 'reproduzir' and self.gravado_em:
+            await context.clock.install(time=datetime.fromisoformat(self.gravado_em))
+        if self.bloquear:
+            await context.route(_pode_ser_dispensavel, self._interceptar)
+        if self.modo != 'real':
+            for rota in ROTAS_GRAVADAS:
+                await context.route(f'**{rota}**', self._interceptar)
+
+    async def _interceptar(self, route):
+        request = route.request
+        if self.bloquear and _e_recurso_dispensavel(request):
+            self.contagem['bloqueadas'] += 1
+            await route.abort('blockedbyclient')
+        elif self.modo != 'real' and any(r in request.url for r in ROTAS_GRAVADAS):
+            await (self._gravar(route) if self.modo == 'gravar' else self._reproduzir(route))
+        else:
+            await route.fallback()
+
+    async def _gravar(self, route):
+        response = await route.fetch()
+        corpo = await response.body()
+        chave, _ = chave_requisicao(route.request)
+        self.respostas.setdefault(chave, []).append({
+            'status': response.status,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in CABECALHOS_DESCARTADOS},
+            'corpo': base64.b64encode(corpo).decode('ascii'),
+        })
+        self.contagem['gravadas'] += 1
+        await route.fulfill(response=response, body=corpo)
+
+    async def _reproduzir(self, route):
+        chave, base = chave_requisicao(route.request)
+        if chave not in self.respostas:
+            chave = next((k for k in self.respostas if k == base or k.startswith(base + '?') or k.startswith(base + ' #')), None)
+            if chave is not None:
+                self.contagem['aproximadas'] += 1
+        if chave is None:
+            self.sem_gravacao.append(base)
+            await route.fulfill(status=503, content_type='application/json',
+                                body=json.dumps({'message': 'sem gravação para ' + base}))
+            return
+        gravadas = self.respostas[chave]
+        ordem = self.servidas.get(chave, 0)
+        self.servidas[chave] = ordem + 1
+        resposta = gravadas[min(ordem, len(gravadas) - 1)]
+        self.contagem['reproduzidas'] += 1
+        await route.fulfill(status=resposta['status'], headers=resposta['headers'],
+                            body=base64.b64decode(resposta['corpo']))
+
+    def salvar(self):
+        if self.modo != 'gravar':
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'gravado_em': self.gravado_em, 'sessao': self.sessao, 'respostas': self.respostas},
+                      f, ensure_ascii=False, separators=(',', ':'))
+
+    def resumo(self):
+        resumo = {'modo': self.modo, **{k: v for k, v in self.contagem.items() if v}}
+        if self.sem_gravacao:
+            resumo['sem_gravacao'] = sorted(set(self.sem_gravacao))
+        return resumo
@@ -0,0 +1,151 @@
+"""Chrome performance traces over CDP, and the numbers the benchmarks take from them.
+
+``Rastreamento(page)`` records a DevTools timeline trace of one page (the same
+categories the Performance panel uses); the JSON it returns can be saved and
+opened there as is. A benchmark splits the trace into steps with user timing
+marks: ``iniciar_etapa`` marks ``<etapa>:inicio`` before the action and
+``encerrar_etapa`` marks ``<etapa>:fim`` once the page has settled. The first
+render after a ``goto`` has no start mark and starts at the document's
+``navigationStart`` (``observar_render`` covers it).
+
+Settling is detected by the caller (network quiet, next paint), which always
+comes some time after the last visible change. So, during a step, a
+``MutationObserver`` also marks ``<etapa>:pintado`` at the animation frame of
+every DOM change, and the step ends at the last of those marks.
+
+``analisar`` reports, for one step, on the page's renderer main thread:
+
+* ``duracao_ms``: start to the last change painted (render time, filter
+  latency), or to ``<etapa>:fim`` when nothing changed (a scroll);
+* ``tarefas_longas``, ``tarefa_mais_longa_ms`` and ``bloqueio_ms`` (time over
+  50 ms of every task, as in Total Blocking Time);
+* ``layout_ms``: style recalculation plus layout;
+* ``quadros``, ``intervalo_max_ms`` and ``quadros_perdidos``: frames drawn
+  and the gaps between them, where every 16.7 ms missed in a gap is a frame
+  lost (scroll jank).
+"""
+import asyncio
+import base64
+import json
+
+CATEGORIAS = (
+    'devtools.timeline', 'disabled-by-default-devtools.timeline', 'disabled-by-default-devtools.timeline.frame',
+    'blink.user_timing', 'loading', 'toplevel', 'v8.execute',
+)
+QUADRO_MS = 1000 / 60
+TAREFA_LONGA_MS = 50
+TAREFAS = {'RunTask', 'ThreadControllerImpl::RunTask'}
+TAREFAS_LAYOUT = {'Layout', 'UpdateLayoutTree'}
+TIMEOUT_RASTRO_S = 120
+# Resolves after the next two animation frames: whatever the last action changed has been painted.
+APOS_PINTURA = '() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))'
+OBSERVAR = """
+(etapa) => {
+  if (window.__etapa) window.__etapa.disconnect();
+  let pendente = false;
+  const observador = new MutationObserver(() => {
+    if (pendente) return;
+    pendente = true;
+    requestAnimationFrame(() => { pendente = false; performance.mark(etapa + ':pintado'); });
+  });
+  observador.observe(document, { childList: true, subtree: true, characterData: true, attributes: true });
+  window.__etapa = observador;
+}
+"""
+
+
+async def observar_render(context):
+    """Observes DOM changes from the start of every document of ``context``, as the ``render`` step."""
+    await context.add_init_script(f'({OBSERVAR})("render")')
+
+
+async def iniciar_etapa(page, etapa):
+    await page.evaluate(OBSERVAR, etapa)
+    await page.evaluate('n => performance.mark(n)', f'{etapa}:inicio')
+
+
+async def encerrar_etapa(page, etapa):
+    """Marks the end of the step after the next paint and stops observing."""
+    await page.evaluate(APOS_PINTURA)
+    await page.evaluate('e => { if (window.__etapa) window.__etapa.disconnect(); performance.mark(e + ":fim"); }',
+                        etapa)
+
+
+class Rastreamento:
+    """A CDP timeline trace of one page: ``iniciar()`` before the first action, ``encerrar()`` returns the events."""
+
+    def __init__(self, page):
+        self.page = page
+        self.cdp = None
+
+    async def iniciar(self):
+        self.cdp = await self.page.context.new_cdp_session(self.page)
+        await self.cdp.send('Tracing.start', {'categories': ','.join(CATEGORIAS), 'transferMode': 'ReturnAsStream'})
+
+    async def encerrar(self):
+        concluido = asyncio.get_running_loop().create_future()
+        self.cdp.on('Tracing.tracingComplete', lambda p: concluido.done() or concluido.set_result(p))
+        await self.cdp.send('Tracing.end')
+        stream = (await asyncio.wait_for(concluido, TIMEOUT_RASTRO_S))['stream']
+        partes = []
+        while True:
+            bloco = await self.cdp.send('IO.read', {'handle': stream, 'size': 1 << 20})
+            partes.append(base64.b64decode(bloco['data']) if bloco.get('base64Encoded') else bloco['data'].encode())
+            if bloco.get('eof'):
+                break
+        await self.cdp.send('IO.close', {'handle': stream})
+        await self.cdp.detach()
+        dados = json.loads(b''.join(partes))
+        return dados['traceEvents'] if isinstance(dados, dict) else dados
+
+
+def salvar(eventos, path):
+    """Writes the events in the format the DevTools Performance panel loads."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': eventos}, f)
+
+
+def _marca(eventos, nome, antes_de=None):
+    """Last user timing event called ``nome`` (before ``antes_de`` microseconds, if given)."""
+    candidatos = [e for e in eventos if e.get('name') == nome and 'blink.user_timing' in e.get('cat', '')
+                  and (antes_de is None or e['ts'] <= antes_de)]
+    return max(candidatos, key=lambda e: e['ts']) if candidatos else None
+
+
+def analisar(eventos, etapa):
+    """Metrics of the step between ``<etapa>:inicio`` (or ``navigationStart``) and ``<etapa>:fim``; None if unmarked."""
+    fim = _marca(eventos, f'{etapa}:fim')
+    if fim is None:
+        return None
+    inicio = _marca(eventos, f'{etapa}:inicio', fim['ts'])
+    if inicio is None:
+        inicio = next((e for e in sorted(eventos, key=lambda e: -e.get('ts', 0))
+                       if e.get('name') == 'navigationStart' and e.get('pid') == fim['pid'] and e['ts'] <= fim['ts']),
+                      None)
+    if inicio is None:
+        return None
+    de, ate, pid, tid = inicio['ts'], fim['ts'], fim['pid'], fim['tid']
+    pintados = [e['ts'] for e in eventos if e.get('name') == f'{etapa}:pintado' and e.get('pid') == pid
+                and de <= e['ts'] <= ate]
+
+    def na_janela(e):
+        return e.get('ph') == 'X' and e['ts'] < ate and e['ts'] + e.get('dur', 0) > de
+
+    principal = [e for e in eventos if e.get('pid') == pid and e.get('tid') == tid and na_janela(e)]
+    tarefas = [e['dur'] / 1000 for e in principal if e['name'] in TAREFAS]
+    longas = [d for d in tarefas if d > TAREFA_LONGA_MS]
+
+    desenhos = [e for e in eventos if e.get('name') == 'DrawFrame' and de <= e['ts'] <= ate]
+    # DrawFrame comes from the page's compositor, or only from the GPU process on some builds.
+    quadros = sorted(e['ts'] for e in desenhos if e.get('pid') == pid) or sorted(e['ts'] for e in desenhos)
+    intervalos = [(b - a) / 1000 for a, b in zip(quadros, quadros[1:])]
+    return {
+        'duracao_ms': round((max(pintados, default=ate) - de) / 1000, 1),
+        'tarefas_longas': len(longas),
+        'tarefa_mais_longa_ms': round(max(tarefas, default=0), 1),
+        'bloqueio_ms': round(sum(d - TAREFA_LONGA_MS for d in longas), 1),
+        'layout_ms': round(sum(e['dur'] for e in principal if e['name'] in TAREFAS_LAYOUT) / 1000, 1),
+        'quadros': len(quadros),
+        'intervalo_max_ms': round(max(intervalos, default=0), 1),
+        'quadros_perdidos': sum(max(0, round(i / QUADRO_MS) - 1) for i in intervalos),
+    }
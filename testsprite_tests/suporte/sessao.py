@@ -0,0 +1,115 @@
+"""Logged-in ``storage_state`` per role, so tests start already authenticated.
+
+A TC script declares the role it runs as with a module constant,
+``PAPEL = 'usuario'``, ``'admin'`` or ``'marketing'``; scripts without it (the
+auth tests themselves) start logged out. The first test of a role logs in once
+through ``/auth`` and saves the context's ``storage_state`` (the Supabase
+session lives in ``localStorage``) under ``tmp/sessoes/<papel>.json``; every
+other test of that role gets a new context created from that file.
+
+A saved state younger than ``VALIDADE_S`` is reused across runs, well inside
+the lifetime of the Supabase access token. Credentials come from the
+environment:
+
+=====================  ==========================  ========================
+Role                   Variables                   Default
+=====================  ==========================  ========================
+``usuario``            ``TESTSPRITE_USUARIO_*``    testuser@example.com
+``admin``              ``TESTSPRITE_ADMIN_*``      (none, must be set)
+``marketing``          ``TESTSPRITE_MARKETING_*``  (none, must be set)
+=====================  ==========================  ========================
+
+with ``_EMAIL`` and ``_SENHA`` suffixes.
+"""
+import asyncio
+import os
+import time
+
+from suporte.esperas import abrir, acompanhar
+
+URL_APP = os.environ.get('TESTSPRITE_URL', 'http://localhost:5173')
+PASTA_SESSOES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tmp', 'sessoes')
+VALIDADE_S = 30 * 60
+TIMEOUT_LOGIN_MS = 15000
+# papel -> (environment prefix, default email, default password)
+PAPEIS = {
+    'usuario': ('TESTSPRITE_USUARIO', 'testuser@example.com', 'TestPassword123'),
+    'admin': ('TESTSPRITE_ADMIN', None, None),
+    'marketing': ('TESTSPRITE_MARKETING', None, None),
+}
+
+
+class SessaoIndisponivel(Exception):
+    """The role has no credentials or its login did not reach the app."""
+
+
+def credenciais(papel):
+    if papel not in PAPEIS:
+        raise SessaoIndisponivel(f"papel desconhecido: {papel!r}")
+    prefixo, email, senha = PAPEIS[papel]
+    email = os.environ.get(f'{prefixo}_EMAIL', email)
+    senha = os.environ.get(f'{prefixo}_SENHA', senha)
+    if not email or not senha:
+        raise SessaoIndisponivel(f"defina {prefixo}_EMAIL e {prefixo}_SENHA para os testes com papel {papel!r}")
+    return email, senha
+
+
+def caminho_sessao(papel):
+    return os.path.join(PASTA_SESSOES, f'{papel}.json')
+
+
+async def entrar(browser, papel, path):
+    """Logs in as ``papel`` through the login form and saves the storage state to ``path``."""
+    email, senha = credenciais(papel)
+    context = await browser.new_context()
+    acompanhar(context)
+    try:
+        page = await context.new_page()
+        await abrir(page, f'{URL_APP}/auth')
+        await page.locator('#login-form input[type="email"]').fill(email)
+        await page.locator('#login-form input[type="password"]').fill(senha)
+        await page.locator('#login-form button[type="submit"]').click()
+        try:
+            await page.wait_for_url(lambda url: '/auth' not in url, timeout=TIMEOUT_LOGIN_MS)
+        except Exception:
+            mensagem = page.locator('.auth-message.error')
+            detalhe = await mensagem.inner_text() if await mensagem.count() else 'sem redirecionamento'
+            raise SessaoIndisponivel(f"login como {papel!r} ({email}) falhou: {detalhe.strip()}") from None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        await context.storage_state(path=path)
+    finally:
+        await context.close()
+
+
+class Sessoes:
+    """Storage state per role for one run: each role logs in at most once, even with tests running concurrently."""
+
+    def __init__(self, browser, renovar=False):
+        self.browser = browser
+        self.renovar = renovar
+        self.travas = {}
+        self.prontas = {}
+
+    async def obter(self, papel):
+        """Path of the role's storage state; raises ``SessaoIndisponivel`` (the same error for every test of a failed role)."""
+        trava = self.travas.setdefault(papel, asyncio.Lock())
+        async with trava:
+            if papel not in self.prontas:
+                path = caminho_sessao(papel)
+                try:
+                    recente = time.time() - os.path.getmtime(path) < VALIDADE_S
+                except OSError:
+                    recente = False
+                try:
+                    if self.renovar or not recente:
+                        await entrar(self.browser, papel, path)
+                    self.prontas[papel] = path
+                except SessaoIndisponivel as e:
+                    self.prontas[papel] = e
+                except Exception as e:
+                    # Browser or network errors are kept too, so the role is not retried by every test.
+                    self.prontas[papel] = SessaoIndisponivel(f"login como {papel!r} falhou: {type(e).__name__}: {e}")
+        pronta = self.prontas[papel]
+        if isinstance(pronta, Exception):
+            raise pronta
+        return pronta